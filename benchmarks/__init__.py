@@ -0,0 +1,11 @@
+"""
+Бенчмарки парсера.
+
+Запускаются модулями из корня репозитория, например
+`python -m benchmarks.bench_extract`: при импорте пакета `setup`
+добавляет src в пути импорта, поэтому бенчмарки импортируют модули
+парсера так же, как main.
+"""
+from benchmarks.common import setup
+
+setup()
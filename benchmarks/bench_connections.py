@@ -0,0 +1,82 @@
+"""
+Бенчмарк переиспользования соединений.
+
+Локальный сервер отдает небольшие страницы, запросы идут по одному.
+Сравниваются задержки запроса (среднее, медиана, 95-й перцентиль) и
+количество открытых соединений: сессия с keep-alive, та же сессия с
+`Connection: close`, новая сессия на каждый запрос и, если установлен
+httpx[http2], адаптер `Http2Adapter`. Сервер слушает обычный HTTP, так
+что httpx работает по HTTP/1.1 и замер показывает только накладные
+расходы адаптера; у локального сервера нет TLS, поэтому выигрыш от
+keep-alive на реальном HTTPS заметно больше.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_connections [--requests N]
+"""
+from argparse import ArgumentParser
+import statistics
+import time
+
+import requests
+
+from exceptions import MissingDependencyError
+from tests.fixture_data.server import StandInServer
+from transport import Http2Adapter, TimeoutAdapter
+
+PAGE = '<p>Lorem ipsum dolor sit amet.</p>' * 100
+
+
+def make_session(adapter=None, keep_alive=True) -> requests.Session:
+    session = requests.Session()
+    session.mount('http://', adapter or TimeoutAdapter())
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def shared(factory):
+    session = factory()
+    return lambda: session
+
+
+def bench(name: str, get_session, count: int) -> None:
+    server = StandInServer(
+        {f'/page-{number}/': PAGE for number in range(count)}
+    ).start()
+    latencies = []
+    try:
+        for number in range(count):
+            session = get_session()
+            start = time.perf_counter()
+            session.get(f'{server.url}page-{number}/').content
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        server.stop()
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(
+        f'{name:<22} среднее {statistics.mean(latencies):>6.3f} мс  '
+        f'медиана {statistics.median(latencies):>6.3f} мс  '
+        f'p95 {p95:>6.3f} мс  соединений {server.connections:>5}'
+    )
+
+
+def run(count: int) -> None:
+    bench('keep-alive', shared(make_session), count)
+    bench(
+        'Connection: close',
+        shared(lambda: make_session(keep_alive=False)),
+        count,
+    )
+    bench('новая сессия', make_session, count)
+    try:
+        adapter = Http2Adapter()
+    except MissingDependencyError:
+        print('httpx                  пропущен: не установлен httpx[http2]')
+        return
+    bench('httpx keep-alive', shared(lambda: make_session(adapter)), count)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=1000)
+    run(parser.parse_args().requests)
@@ -0,0 +1,68 @@
+"""
+Бенчмарк извлечения данных со страниц PEP и статей о нововведениях.
+
+Сравнивает построение полного дерева BeautifulSoup (прежний подход)
+с потоковым разбором lxml из `extractors.py` на синтетических страницах
+реалистичного размера: время разбора одной страницы и пиковый объем
+памяти Python-объектов (tracemalloc не видит память самой libxml2).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_extract
+"""
+import timeit
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import extractors
+from tests.fixture_data.pages import pep_page, whats_new_page
+
+# Реальные страницы PEP и What's New весят 50-300 КБ.
+PARAGRAPHS = 3000
+REPEAT = 50
+
+
+def soup_pep_status(content: bytes) -> str:
+    soup = BeautifulSoup(content.decode('utf-8'), features='lxml')
+    return soup.find(string='Status').parent.find_next_sibling().text
+
+
+def soup_whats_new(content: bytes) -> tuple:
+    soup = BeautifulSoup(content.decode('utf-8'), features='lxml')
+    return soup.find('h1').text, soup.find('dl').text
+
+
+def peak_memory(function, content: bytes) -> int:
+    tracemalloc.start()
+    function(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def report(name: str, function, content: bytes) -> None:
+    seconds = timeit.timeit(lambda: function(content), number=REPEAT)
+    peak = peak_memory(function, content)
+    print(
+        f'{name:<32} {seconds / REPEAT * 1000:>9.2f} ms/page '
+        f'{peak / 1024:>10.0f} KiB peak'
+    )
+
+
+def main():
+    pep = pep_page(1, PARAGRAPHS).encode('utf-8')
+    whats_new = whats_new_page('3.12', PARAGRAPHS).encode('utf-8')
+    print(f'PEP page: {len(pep) // 1024} KiB, '
+          f'What\'s New page: {len(whats_new) // 1024} KiB')
+    report('pep: BeautifulSoup', soup_pep_status, pep)
+    report('pep: lxml pull parser', extractors.get_pep_fields, pep)
+    report('whats-new: BeautifulSoup', soup_whats_new, whats_new)
+    report(
+        'whats-new: lxml pull parser',
+        extractors.get_whats_new_fields,
+        whats_new,
+    )
+
+
+if __name__ == '__main__':
+    main()
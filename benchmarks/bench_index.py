@@ -0,0 +1,85 @@
+"""
+Бенчмарк разбора общего списка PEP.
+
+Сравнивает прежний разбор таблицы численного индекса через дерево
+BeautifulSoup (поиск abbr и a в каждой строке, словарь на строку)
+с однопроходным потоковым разбором lxml из `extractors.py` на
+синтетических списках до 50 000 строк: время разбора, время на строку
+(должно быть постоянным - рост линейный) и пиковый объем памяти
+Python-объектов, включая результат.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_index [--rows N ...]
+"""
+from argparse import ArgumentParser
+import time
+import tracemalloc
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from constants import EXPECTED_STATUS, PEP_DOC_URL
+import extractors
+from tests.fixture_data.pages import pep_index_page
+
+ROWS = (5000, 10000, 25000, 50000)
+
+
+def soup_pep_rows(content: bytes, base_url: str) -> list[tuple]:
+    soup = BeautifulSoup(content.decode('utf-8'), features='lxml')
+    section = soup.find('section', attrs={'id': 'numerical-index'})
+    table = section.find(
+        'table', attrs={'class': 'pep-zero-table docutils align-default'}
+    )
+    pep_rows = []
+    for row in table.find('tbody').find_all('tr'):
+        type_status = row.find('abbr').text
+        status_index = type_status[1] if len(type_status) == 2 else ''
+        a_tag = row.find('a')
+        pep_link = urljoin(base_url, a_tag['href'])
+        cells = row.find_all('td')
+        entry = {
+            'number': int(a_tag.text),
+            'title': cells[2].text if len(cells) > 2 else None,
+            'index_status': type_status,
+            'url': pep_link,
+        }
+        pep_rows.append((pep_link, EXPECTED_STATUS[status_index], entry))
+    return pep_rows
+
+
+def measure(function, content: bytes) -> tuple[float, int]:
+    start = time.perf_counter()
+    function(content, PEP_DOC_URL)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    rows = function(content, PEP_DOC_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return seconds, peak
+
+
+def run(rows_counts: tuple) -> None:
+    for rows in rows_counts:
+        content = pep_index_page(rows).encode('utf-8')
+        print(f'{rows} строк, {len(content) // 1024} KiB')
+        for name, function in (
+            ('BeautifulSoup', soup_pep_rows),
+            ('lxml, один проход', extractors.get_pep_index_rows),
+        ):
+            seconds, peak = measure(function, content)
+            print(
+                f'  {name:<20} {seconds:>8.3f} s '
+                f'{seconds / rows * 1e6:>7.2f} us/row '
+                f'{peak / 1024 ** 2:>8.1f} MiB peak'
+            )
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--rows', type=int, nargs='+', default=ROWS,
+        help='Размеры синтетического списка PEP'
+    )
+    run(parser.parse_args().rows)
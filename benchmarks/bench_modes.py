@@ -0,0 +1,136 @@
+"""
+Бенчмарк всех режимов парсера без сети.
+
+Страницы docs.python.org и peps.python.org генерируются и отдаются
+транспортным адаптером из памяти. Для каждого режима и масштаба
+замеряются: время холодного (пустой кэш) и теплого (повторный запуск
+на той же сессии) прогона, запросы в секунду, время разбора страниц
+по метрикам (`get_soup`, `find_tag`, `extract`) и пиковый объем
+памяти Python-объектов отдельным прогоном под tracemalloc.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_modes [--scaled]
+"""
+from argparse import ArgumentParser
+from collections import deque
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import make_session
+import main
+from metrics import METRICS
+from tests.fixture_data.pages import (
+    DOWNLOAD_FORMATS, docs_site, main_doc_page, pep_pages, whats_new_pages
+)
+
+PARSE_STAGES = ('get_soup', 'find_tag', 'extract')
+
+
+def consume(results) -> None:
+    """Режимы отдают строки генератором, download возвращает None."""
+    if results is not None:
+        deque(results, maxlen=0)
+
+
+# (реалистичный, увеличенный) размер каждого сценария.
+SCALES = {
+    'whats-new': (25, 500),
+    'latest-versions': (20, 2000),
+    'download': (64 * 1024, 16 * 1024 * 1024),
+    'pep': (700, 10000),
+}
+
+
+def whats_new_scenario(size: int) -> tuple:
+    versions = tuple(f'3.{minor}' for minor in range(size))
+    return whats_new_pages(versions), main.whats_new, {}
+
+
+def latest_versions_scenario(size: int) -> tuple:
+    versions = tuple((f'3.{minor}', 'stable') for minor in range(size))
+    pages = {main.MAIN_DOC_URL: main_doc_page(versions)}
+    return pages, main.latest_versions, {}
+
+
+def download_scenario(size: int) -> tuple:
+    site = docs_site('https://docs.python.org/', archive_size=size)
+    pages = {
+        f'https://docs.python.org{path}': page for path, page in site.items()
+    }
+    options = {'formats': list(DOWNLOAD_FORMATS), 'workers': 4}
+    return pages, main.download, options
+
+
+def pep_scenario(size: int) -> tuple:
+    return pep_pages(size), main.pep, {}
+
+
+SCENARIOS = {
+    'whats-new': whats_new_scenario,
+    'latest-versions': latest_versions_scenario,
+    'download': download_scenario,
+    'pep': pep_scenario,
+}
+
+
+def parse_seconds() -> float:
+    stages = METRICS.as_dict()['stages']
+    return sum(stages.get(stage, {}).get('total', 0) for stage in PARSE_STAGES)
+
+
+def timed_run(session, mode_function, options) -> tuple:
+    METRICS.reset()
+    requests_before = session.site_adapter.call_count
+    start = time.perf_counter()
+    consume(mode_function(session, **options))
+    wall = time.perf_counter() - start
+    network = session.site_adapter.call_count - requests_before
+    data = METRICS.as_dict()
+    pages = data['cache_hits'] + data['cache_misses']
+    return wall, pages, network, parse_seconds()
+
+
+def peak_memory(pages, mode_function, options) -> int:
+    session = make_session(pages)
+    tracemalloc.start()
+    consume(mode_function(session, **options))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def report(mode: str, size: int, run: str, wall, pages, network, parse):
+    print(
+        f'{mode:<16} {size:>9} {run:<5} {wall:>8.3f} s '
+        f'{pages:>6} pages {pages / wall:>9.1f} pages/s '
+        f'{network:>6} network req  parse {parse:>7.3f} s'
+    )
+
+
+def bench(mode: str, size: int) -> None:
+    pages, mode_function, options = SCENARIOS[mode](size)
+    session = make_session(pages)
+    report(mode, size, 'cold', *timed_run(session, mode_function, options))
+    report(mode, size, 'warm', *timed_run(session, mode_function, options))
+    peak = peak_memory(pages, mode_function, options)
+    print(f'{"":<16} {"":>9} peak {peak / 1024 / 1024:>8.1f} MiB')
+
+
+def run(scaled: bool) -> None:
+    with tempfile.TemporaryDirectory() as base_dir:
+        main.BASE_DIR = Path(base_dir)
+        for mode, sizes in SCALES.items():
+            for size in sizes[:2 if scaled else 1]:
+                bench(mode, size)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--scaled',
+        action='store_true',
+        help='Добавить увеличенные сценарии (10 000 PEP и т.д.)'
+    )
+    run(parser.parse_args().scaled)
@@ -0,0 +1,60 @@
+"""
+Бенчмарк форматов вывода результатов в файл.
+
+Для каждого формата (CSV, JSON Lines, Parquet, Feather) записываются
+одни и те же синтетические строки режима latest-versions и замеряются
+время записи, строки в секунду и размер файла. Parquet и Feather
+пропускаются, если не установлен pyarrow.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_outputs [--rows N]
+"""
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+import tempfile
+import time
+
+from constants import FEATHER, FILE, JSONL, PARQUET
+from exceptions import MissingDependencyError
+import outputs
+
+FORMATS = (FILE, JSONL, PARQUET, FEATHER)
+STATUSES = ('stable', 'security-fixes', 'EOL', 'in development')
+
+
+def rows(count: int):
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
+    for index in range(count):
+        version = f'{index // 100}.{index % 100}'
+        yield (
+            f'https://docs.python.org/{version}/',
+            version,
+            STATUSES[index % len(STATUSES)],
+        )
+
+
+def bench(output: str, count: int) -> None:
+    with tempfile.TemporaryDirectory() as base_dir:
+        outputs.BASE_DIR = Path(base_dir)
+        cli_args = Namespace(mode='latest-versions', output=output)
+        start = time.perf_counter()
+        try:
+            outputs.control_output(rows(count), cli_args)
+        except MissingDependencyError:
+            print(f'{output:<8} пропущен: не установлен pyarrow')
+            return
+        wall = time.perf_counter() - start
+        (path,) = (Path(base_dir) / 'results').iterdir()
+        size = path.stat().st_size
+    print(
+        f'{output:<8} {wall:>7.3f} s {count / wall:>10.0f} rows/s '
+        f'{size / 1024:>9.1f} KiB'
+    )
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    count = parser.parse_args().rows
+    for output in FORMATS:
+        bench(output, count)
@@ -0,0 +1,54 @@
+"""
+Бенчмарк разбора страниц PEP в пуле процессов.
+
+Страницы берутся из теплого кэша, поэтому время прогона - это почти
+только разбор HTML. Чтобы разбор не прекращался в начале страницы,
+перед полями PEP добавляется объемный текст. Сравниваются прогоны
+с 1, 2 и 4 процессами; результаты всех прогонов должны совпадать.
+Выигрыш от процессов виден только на машине с несколькими ядрами.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_processes
+"""
+import os
+import time
+
+from benchmarks.common import make_session
+import fetchers
+import main
+from memo import clear_memo
+from tests.fixture_data.pages import pep_pages
+
+PEP_COUNT = 300
+PADDING = '<p>Lorem ipsum dolor sit amet.</p>' * 5000
+PROCESSES = (1, 2, 4)
+
+
+def heavy_pep_pages(count: int) -> dict:
+    pages = pep_pages(count)
+    for url, page in pages.items():
+        if url != main.PEP_DOC_URL:
+            pages[url] = PADDING + page
+    return pages
+
+
+def run() -> None:
+    session = make_session(heavy_pep_pages(PEP_COUNT))
+    expected = list(main.pep(session, fetchers.SyncFetcher(session)))
+    print(f'CPU: {os.cpu_count()}, PEP: {PEP_COUNT}')
+    for processes in PROCESSES:
+        fetcher = fetchers.SyncFetcher(session, processes=processes)
+        # Иначе поля берутся из памяти процесса без разбора.
+        clear_memo()
+        start = time.perf_counter()
+        results = list(main.pep(session, fetcher))
+        wall = time.perf_counter() - start
+        assert results == expected
+        print(
+            f'{processes} процесс(ов): {wall:>7.3f} s '
+            f'{PEP_COUNT / wall:>8.1f} pages/s'
+        )
+
+
+if __name__ == '__main__':
+    run()
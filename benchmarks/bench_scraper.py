@@ -0,0 +1,102 @@
+"""
+Бенчмарк повторных запусков режимов через `Scraper`.
+
+Сравниваются два способа выполнить режим N раз подряд без сети:
+- как при запуске из командной строки: для каждого запуска заново
+  создаются sqlite-кэш сессии, хранилище извлеченных данных и загрузчик;
+- долгоживущий `Scraper`: сессия, кэш и загрузчик создаются один раз.
+В обоих случаях кэш общий между запусками, поэтому разница - стоимость
+подготовки. Замеряются запуски в секунду для каждого режима.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_scraper [--runs N]
+"""
+from argparse import ArgumentParser
+from collections import deque
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from benchmarks.common import ROOT_DIR
+from configs import configure_cache, configure_fetcher, configure_session
+import main
+from scraper import Scraper
+from storage import PageStore
+from tests.fixture_data.adapter import SiteAdapter
+from tests.fixture_data.pages import (
+    main_doc_page, pep_pages, PYTHON_VERSIONS, whats_new_pages
+)
+
+PEP_COUNT = 700
+MODES = ('whats-new', 'latest-versions', 'pep')
+
+
+def site_pages() -> dict:
+    versions = tuple(f'3.{minor}' for minor in range(25))
+    return {
+        **pep_pages(PEP_COUNT),
+        **whats_new_pages(versions),
+        main.MAIN_DOC_URL: main_doc_page(PYTHON_VERSIONS),
+    }
+
+
+def setup(pages: dict):
+    """Подготовка, которую main() выполняет при каждом запуске."""
+    session = configure_session(cache=configure_cache())
+    adapter = SiteAdapter(pages)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    store = PageStore(Path('pages.sqlite'))
+    return session, configure_fetcher(session, store=store)
+
+
+def consume(results) -> None:
+    if results is not None:
+        deque(results, maxlen=0)
+
+
+def per_invocation(pages: dict, mode: str, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        session, fetcher = setup(pages)
+        consume(Scraper(session, fetcher).results(mode))
+        fetcher.store.save()
+    return time.perf_counter() - start
+
+
+def long_lived(pages: dict, mode: str, runs: int) -> float:
+    start = time.perf_counter()
+    with Scraper(*setup(pages)) as scraper:
+        for _ in range(runs):
+            consume(scraper.results(mode))
+    return time.perf_counter() - start
+
+
+def run(runs: int) -> None:
+    pages = site_pages()
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.chdir(base_dir)
+        main.PEP_INDEX_PATH = Path(base_dir) / 'pep_index.sqlite'
+        # Прогрев кэша, чтобы оба способа работали с теплым кэшем.
+        for mode in MODES:
+            per_invocation(pages, mode, 1)
+        for mode in MODES:
+            for name, bench in (
+                ('каждый раз заново', per_invocation),
+                ('Scraper', long_lived),
+            ):
+                seconds = bench(pages, mode, runs)
+                print(
+                    f'{mode:<16} {name:<18} {seconds:>8.3f} s '
+                    f'{runs / seconds:>8.1f} runs/s'
+                )
+        os.chdir(ROOT_DIR)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--runs', type=int, default=5, help='Запусков каждого режима'
+    )
+    run(parser.parse_args().runs)
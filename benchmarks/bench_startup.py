@@ -0,0 +1,82 @@
+"""
+Бенчмарк времени запуска парсера по `python -X importtime`.
+
+Каждый сценарий выполняется в отдельном интерпретаторе из директории
+src, из вывода -X importtime берется накопленное время импорта
+модулей парсера и количество загруженных модулей. Для сравнения
+замеряется прежний запуск, при котором все зависимости загружались
+вместе с main.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_startup [--repeat N]
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+HELP = (
+    'import configs, main\n'
+    'try:\n'
+    '    configs.configure_argument_parser(main.MODE_TO_FUNCTION.keys())'
+    '.parse_args(["--help"])\n'
+    'except SystemExit:\n'
+    '    pass\n'
+)
+SCENARIOS = {
+    'import main': 'import main',
+    '--help': HELP,
+    'pep -q': (
+        'import main, storage\n'
+        'main.control_output(storage.PepIndex().query(["Final"]), '
+        'main.Namespace(mode="pep", query=True, output=None))\n'
+    ),
+    'сессия и разбор': (
+        'import configs, main\n'
+        'configs.configure_session(cache=configs.configure_cache("memory"))\n'
+        'main.get_soup(type("R", (), {"text": "<p></p>"})())\n'
+        'from tqdm import tqdm\n'
+    ),
+    'прежний import main': (
+        'import requests_cache, bs4, lxml.etree, tqdm, prettytable\n'
+        'import main\n'
+    ),
+}
+
+
+def import_time(code: str) -> tuple[float, int]:
+    """Суммарное время импорта верхнего уровня, мс, и число модулей."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, count = 0, 0
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        count += 1
+        # Вложенные импорты уже учтены во времени модуля верхнего уровня.
+        if not name.startswith('  '):
+            total += int(cumulative)
+    return total / 1000, count
+
+
+def run(repeat: int) -> None:
+    for name, code in SCENARIOS.items():
+        results = [import_time(code) for _ in range(repeat)]
+        median = statistics.median(total for total, _ in results)
+        print(f'{name:<22} {median:>8.1f} ms {results[0][1]:>5} modules')
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='Повторов каждого сценария'
+    )
+    run(parser.parse_args().repeat)
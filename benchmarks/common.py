@@ -0,0 +1,37 @@
+"""Общие помощники бенчмарков: пути импорта и сессии без сети."""
+import os
+from pathlib import Path
+import sys
+
+from requests import Response
+from requests_cache import CachedSession
+
+from tests.fixture_data.adapter import SiteAdapter
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup() -> None:
+    """Пути импорта модулей парсера и окружение для замеров."""
+    src_dir = str(ROOT_DIR / 'src')
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+    # Прогресс-бары tqdm только искажают замеры.
+    os.environ.setdefault('TQDM_DISABLE', '1')
+
+
+def make_session(pages: dict, latency: float = 0) -> CachedSession:
+    """Сессия с кэшем в памяти, отвечающая страницами из `pages`."""
+    session = CachedSession(backend='memory')
+    adapter = SiteAdapter(pages, latency)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.site_adapter = adapter
+    return session
+
+
+def make_response(page: str) -> Response:
+    response = Response()
+    response._content = page.encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
@@ -0,0 +1,76 @@
+"""
+Хранение и обслуживание кэша HTTP-ответов.
+
+Тела страниц в кэше сжимаются zlib: HTML сжимается в несколько раз,
+а распаковка занимает доли миллисекунды. Сжатие кэша удаляет
+просроченные и нечитаемые ответы и, при заданном лимите, вытесняет
+самые старые ответы, пока размер тел не уложится в лимит.
+"""
+import importlib
+import logging
+import pickle
+from typing import Optional
+import zlib
+
+from requests_cache import BaseCache, SQLiteCache
+from requests_cache.serializers import SerializerPipeline, Stage
+from requests_cache.serializers.preconf import base_stage
+
+from exceptions import MissingDependencyError
+
+COMPRESSED_SERIALIZER = SerializerPipeline(
+    [
+        base_stage,
+        Stage(pickle),
+        Stage(dumps=zlib.compress, loads=zlib.decompress),
+    ],
+    name='pickle-zlib',
+    is_binary=True,
+)
+
+
+def get_redis_connection(url: str):
+    """Ленивый импорт необязательной зависимости redis и подключение."""
+    try:
+        redis = importlib.import_module('redis')
+    except ImportError as error:
+        raise MissingDependencyError(
+            'Для кэша в redis установите клиент: pip install redis'
+        ) from error
+    return redis.Redis.from_url(url)
+
+
+def get_cache_size(cache: BaseCache) -> int:
+    """Суммарный размер тел ответов в кэше, байт."""
+    return sum(len(response.content) for response in cache.filter())
+
+
+def compact_cache(cache: BaseCache, max_size: Optional[int] = None) -> int:
+    """
+    Сжатие кэша с ограничением размера тел ответов `max_size`, байт.
+
+    Возвращает количество удаленных ответов.
+    """
+    count = len(cache.responses)
+    cache.delete(expired=True, invalid=True)
+    if max_size is not None:
+        responses = sorted(
+            cache.filter(), key=lambda response: response.created_at
+        )
+        size = sum(len(response.content) for response in responses)
+        evicted = []
+        for response in responses:
+            if size <= max_size:
+                break
+            size -= len(response.content)
+            evicted.append(response.cache_key)
+        if evicted:
+            cache.delete(*evicted)
+    if isinstance(cache, SQLiteCache):
+        cache.responses.vacuum()
+    removed = count - len(cache.responses)
+    logging.info(
+        f'Кэш сжат: удалено {removed} ответов, '
+        f'осталось {len(cache.responses)} ({get_cache_size(cache)} байт)'
+    )
+    return removed
@@ -1,8 +1,49 @@
-from argparse import ArgumentParser
+"""
+Разбор командной строки, логирование, сессия и загрузчик страниц.
+
+requests_cache и транспортные адаптеры импортируются только при
+создании сессии, поэтому `--help` и выборка из индекса PEP
+обходятся без них.
+"""
+from __future__ import annotations
+
+from argparse import ArgumentParser, ArgumentTypeError
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from constants import (
+    ASYNC, ASYNC_CONCURRENCY, BASE_DIR, CACHE_BACKENDS, CACHE_NAME,
+    DEFAULT_REDIS_URL, DEFAULT_TIMEOUT, DOWNLOAD_FORMATS, DT_FORMAT, FEATHER,
+    FILE, JSONL, LEASE_TIMEOUT, LOG_FORMAT, PARQUET, PDF_A4, PRETTY,
+    QUEUE_TIMEOUT, RECORD_CACHE_SIZE, REDIS, SOUP_CACHE_SIZE, SQLITE, SYNC,
+    URLS_EXPIRE_AFTER
+)
+from fetchers import AsyncFetcher, Fetcher, SyncFetcher
+from storage import PageStore, RedisWorkQueue, WorkQueue
+from throttling import HostController, RetryPolicy
+
+if TYPE_CHECKING:
+    from requests_cache import BaseCache, CachedSession
+
+    from transport import Timeout
+
+
+def positive_int(value: str) -> int:
+    """Целое число больше нуля для аргументов командной строки."""
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError(f'ожидается целое число больше 0: {value}')
+    return number
 
-from constants import BASE_DIR, DT_FORMAT, LOG_FORMAT
+
+def non_negative_int(value: str) -> int:
+    """Целое число не меньше нуля для аргументов командной строки."""
+    number = int(value)
+    if number < 0:
+        raise ArgumentTypeError(f'ожидается целое число от 0: {value}')
+    return number
 
 
 def configure_argument_parser(available_modes: str) -> ArgumentParser:
@@ -26,6 +67,7 @@ def configure_argument_parser(available_modes: str) -> ArgumentParser:
     # Аргмуенты вызова:
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -34,15 +76,326 @@ def configure_argument_parser(available_modes: str) -> ArgumentParser:
         action='store_true',
         help='Очистка кеша'
     )
+    parser.add_argument(
+        '--cache-backend',
+        choices=CACHE_BACKENDS,
+        default=SQLITE,
+        help='Хранилище кэша HTTP-ответов'
+    )
+    parser.add_argument(
+        '--redis-url',
+        default=DEFAULT_REDIS_URL,
+        help='Адрес redis-совместимого сервера для кэша'
+    )
+    parser.add_argument(
+        '--no-cache-compression',
+        dest='cache_compression',
+        action='store_false',
+        help='Хранить ответы в кэше без сжатия'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=float,
+        help='Сжать кэш до указанного размера тел ответов, МБ'
+    )
+    parser.add_argument(
+        '--compact-cache',
+        action='store_true',
+        help='Только сжать кэш, без парсинга'
+    )
+    parser.add_argument(
+        '-r', '--refresh',
+        action='store_true',
+        help='Перепроверка кеша по ETag / Last-Modified'
+    )
     parser.add_argument(
         '-o', '--output',
-        choices=('pretty', 'file'),
+        choices=(PRETTY, FILE, JSONL, PARQUET, FEATHER),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w', '--workers',
+        type=positive_int,
+        default=1,
+        help='Количество потоков для загрузки страниц'
+    )
+    parser.add_argument(
+        '-f', '--fetcher',
+        choices=(SYNC, ASYNC),
+        default=SYNC,
+        help='Способ загрузки страниц'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=positive_int,
+        default=ASYNC_CONCURRENCY,
+        help='Количество потоков и одновременных запросов (async)'
+    )
+    parser.add_argument(
+        '--per-host',
+        type=positive_int,
+        default=10,
+        help='Максимум одновременных запросов к одному хосту (async)'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=3,
+        help='Количество повторов запроса при ошибках и ответах 429/5xx'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        help='Размер пула соединений к одному хосту'
+    )
+    parser.add_argument(
+        '--no-keep-alive',
+        dest='keep_alive',
+        action='store_false',
+        help='Закрывать соединение после каждого запроса'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=float,
+        default=DEFAULT_TIMEOUT[0],
+        help='Таймаут установки соединения, с'
+    )
+    parser.add_argument(
+        '--read-timeout',
+        type=float,
+        default=DEFAULT_TIMEOUT[1],
+        help='Таймаут чтения ответа, с'
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help='Загрузка по HTTP/2 через httpx (pip install "httpx[http2]")'
+    )
+    parser.add_argument(
+        '-p', '--processes',
+        type=positive_int,
+        default=1,
+        help='Количество процессов для разбора страниц'
+    )
+    parser.add_argument(
+        '--soup-cache-size',
+        type=non_negative_int,
+        default=SOUP_CACHE_SIZE,
+        help='Сколько разобранных страниц держать в памяти, 0 - не держать'
+    )
+    parser.add_argument(
+        '--record-cache-size',
+        type=non_negative_int,
+        default=RECORD_CACHE_SIZE,
+        help='Сколько извлеченных записей держать в памяти, 0 - не держать'
+    )
+    parser.add_argument(
+        '-b', '--bulk',
+        action='store_true',
+        help=(
+            'Загружать только PEP, изменившиеся по списку peps.json '
+            'с прошлого запуска'
+        )
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжить обход PEP с последней контрольной точки'
+    )
+    parser.add_argument(
+        '--queue',
+        help=(
+            'Общая очередь заданий: адрес redis:// для нескольких машин '
+            'или sqlite-файл для одной; этот процесс - координатор'
+        )
+    )
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='Выполнять задания из очереди --queue для режимов'
+    )
+    parser.add_argument(
+        '--lease-timeout',
+        type=float,
+        default=LEASE_TIMEOUT,
+        help='Время аренды заданий воркером, секунд'
+    )
+    parser.add_argument(
+        '--queue-timeout',
+        type=float,
+        default=QUEUE_TIMEOUT,
+        help='Сколько координатор ждет результатов от воркеров, секунд'
+    )
+    parser.add_argument(
+        '-q', '--query',
+        action='store_true',
+        help='Выборка PEP из локального индекса без загрузки страниц'
+    )
+    parser.add_argument(
+        '--status',
+        nargs='+',
+        help='Статусы PEP для выборки из индекса'
+    )
+    parser.add_argument(
+        '--type',
+        dest='pep_type',
+        help='Тип PEP для выборки из индекса'
+    )
+    parser.add_argument(
+        '-m', '--metrics',
+        type=Path,
+        help='Файл для сохранения метрик работы парсера в JSON'
+    )
+    parser.add_argument(
+        '--formats',
+        nargs='+',
+        choices=tuple(DOWNLOAD_FORMATS),
+        default=[PDF_A4],
+        help='Форматы архивов документации (download)'
+    )
+    parser.add_argument(
+        '--versions',
+        nargs='+',
+        help='Версии Python, для которых загружается документация (download)'
+    )
+    parser.add_argument(
+        '--rate-limit',
+        type=positive_int,
+        help='Ограничение скорости загрузки архивов, байт/с (download)'
+    )
 
     return parser
 
 
+def configure_cache(
+    backend: str = SQLITE,
+    compress: bool = True,
+    redis_url: str = DEFAULT_REDIS_URL,
+) -> BaseCache:
+    """
+    Конфигуратор хранилища кэша HTTP-ответов.
+
+    Бэкенд redis подходит и для совместимых с ним серверов; клиент
+     redis - необязательная зависимость. При `compress` ответы
+     хранятся сжатыми zlib.
+    """
+    from requests_cache import init_backend
+
+    from caching import COMPRESSED_SERIALIZER, get_redis_connection
+
+    options = {}
+    if compress:
+        options['serializer'] = COMPRESSED_SERIALIZER
+    if backend == REDIS:
+        options['connection'] = get_redis_connection(redis_url)
+    return init_backend(CACHE_NAME, backend, **options)
+
+
+def configure_session(
+    workers: int = 1,
+    refresh: bool = False,
+    pool_size: Optional[int] = None,
+    keep_alive: bool = True,
+    timeout: Timeout = DEFAULT_TIMEOUT,
+    http2: bool = False,
+    cache: Optional[BaseCache] = None,
+) -> CachedSession:
+    """
+    Конфигуратор кэширующейся сессии.
+
+    Пул соединений адаптера (`pool_size`) по умолчанию не меньше
+     количества потоков загрузки, иначе параллельные запросы не смогут
+     переиспользовать соединения. Без `keep_alive` соединение
+     закрывается после каждого запроса. `timeout` - таймауты соединения
+     и чтения для запросов, у которых они не заданы явно.
+    Ответы хранятся в `cache` (по умолчанию - sqlite со сжатием),
+     время их жизни задается шаблонами URL из `URLS_EXPIRE_AFTER`.
+    В режиме `refresh` каждая закэшированная страница перепроверяется
+     условным запросом (If-None-Match / If-Modified-Since): на ответ 304
+     сервер не передает тело, а сессия возвращает страницу из кэша.
+    """
+    from requests.adapters import DEFAULT_POOLSIZE
+    from requests_cache import CachedSession
+
+    from transport import Http2Adapter, TimeoutAdapter
+
+    session = CachedSession(
+        backend=cache or configure_cache(),
+        always_revalidate=refresh,
+        urls_expire_after=URLS_EXPIRE_AFTER,
+    )
+    pool_size = pool_size or max(workers, DEFAULT_POOLSIZE)
+    if http2:
+        adapter = Http2Adapter(
+            timeout, pool_maxsize=pool_size, keep_alive=keep_alive
+        )
+    else:
+        adapter = TimeoutAdapter(timeout, pool_maxsize=pool_size)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def configure_fetcher(
+    session: CachedSession,
+    fetcher: str = SYNC,
+    workers: int = 1,
+    per_host: int = 10,
+    store: Optional[PageStore] = None,
+    processes: int = 1,
+    retries: int = 3,
+    concurrency: int = ASYNC_CONCURRENCY,
+    modes: int = 1,
+) -> Fetcher:
+    """
+    Конфигуратор загрузчика страниц, по умолчанию синхронного.
+
+    Потоки (`workers`) нужны только синхронному загрузчику, у async
+     свой пул из `concurrency` потоков.
+    Запросы повторяются до `retries` раз, лимит запросов к хосту
+     подстраивается под ответы сервера, не превышая `per_host` для
+     asyncio и `workers` потоков на каждый из `modes` одновременно
+     выполняемых режимов: у каждого режима свой пул потоков, и общий
+     лимит не должен выстраивать режимы в очередь.
+    """
+    options = {
+        'store': store,
+        'processes': processes,
+        'retry': RetryPolicy(attempts=retries + 1),
+    }
+    if fetcher == ASYNC:
+        return AsyncFetcher(
+            session,
+            concurrency=concurrency,
+            per_host=per_host,
+            controller=HostController(maximum=per_host),
+            **options,
+        )
+    return SyncFetcher(
+        session,
+        workers=workers,
+        controller=HostController(maximum=workers * modes),
+        **options,
+    )
+
+
+def configure_queue(queue: str) -> Union[WorkQueue, RedisWorkQueue]:
+    """
+    Очередь распределенного обхода.
+
+    Адрес redis://, rediss:// или unix:// - очередь на redis-совместимом
+     сервере, доступная с нескольких машин; иначе `queue` - путь
+     к sqlite-файлу очереди для процессов одной машины.
+    """
+    if queue.startswith(('redis://', 'rediss://', 'unix://')):
+        from caching import get_redis_connection
+
+        return RedisWorkQueue(get_redis_connection(queue))
+    return WorkQueue(queue)
+
+
 def configure_logging():
     """Конфигуратор логгера."""
     # Создание дирректории и получение имени лог-файла.
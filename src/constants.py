@@ -1,7 +1,28 @@
+from datetime import timedelta
 from pathlib import Path
+import re
 
 
 BASE_DIR = Path(__file__).parent
+PAGE_STORE_PATH = BASE_DIR / 'page_store.sqlite'
+PEP_INDEX_PATH = BASE_DIR / 'pep_index.sqlite'
+PEP_CHECKPOINT_PATH = BASE_DIR / 'pep_checkpoint.json'
+# Через сколько проверенных PEP сохраняется контрольная точка.
+CHECKPOINT_INTERVAL = 50
+# Распределенный обход: аренда задания воркером, секунд; заданий
+# в аренду на поток загрузки; сколько раз выдавать задание, аренда
+# которого истекла; пауза опроса очереди, секунд; сколько координатор
+# ждет очередного результата, секунд.
+LEASE_TIMEOUT = 60.0
+LEASE_BATCH = 8
+LEASE_ATTEMPTS = 3
+QUEUE_POLL_INTERVAL = 0.5
+QUEUE_TIMEOUT = 300.0
+# Размеры кэшей разобранных деревьев, извлеченных полей и ссылок
+# в памяти процесса, записей.
+SOUP_CACHE_SIZE = 32
+RECORD_CACHE_SIZE = 10000
+URL_CACHE_SIZE = 10000
 
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
@@ -20,8 +41,49 @@ EXPECTED_STATUS = {
 
 
 PEP_DOC_URL = 'https://peps.python.org/'
+# Машиночитаемый список всех PEP относительно PEP_DOC_URL.
+PEP_LISTING_PATH = 'api/peps.json'
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 # Шаблон поиска версии и статуса python
-PATTERN = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+PATTERN = re.compile(r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)')
+
+# Шаблоны ссылок на архивы документации по форматам
+DOWNLOAD_FORMATS = {
+    'pdf-a4': r'.+pdf-a4\.zip$',
+    'pdf-letter': r'.+pdf-letter\.zip$',
+    'html': r'.+docs-html\.zip$',
+    'text': r'.+docs-text\.zip$',
+    'epub': r'.+\.epub$',
+}
+PDF_A4 = 'pdf-a4'
 
 FILE, PRETTY = 'file', 'pretty'
+JSONL, PARQUET, FEATHER = 'jsonl', 'parquet', 'feather'
+# Имена результатов выборки из индекса PEP и отчета о расхождениях
+# статусов PEP.
+PEP_QUERY = 'pep-query'
+PEP_MISMATCHES = 'pep-mismatches'
+SYNC, ASYNC = 'sync', 'async'
+# Сколько страниц загрузчик на asyncio загружает одновременно.
+ASYNC_CONCURRENCY = 100
+# Таймауты соединения и чтения по умолчанию, в секундах.
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# Бэкенды кэша HTTP-ответов.
+SQLITE, FILESYSTEM, MEMORY, REDIS = 'sqlite', 'filesystem', 'memory', 'redis'
+CACHE_BACKENDS = (SQLITE, FILESYSTEM, MEMORY, REDIS)
+CACHE_NAME = 'http_cache'
+DEFAULT_REDIS_URL = 'redis://localhost:6379/0'
+# Время жизни ответов в кэше по шаблонам URL, действует первое
+# совпадение. Общие списки меняются часто, страницы PEP - редко.
+# Статьи о нововведениях текущей и разрабатываемой версий дописываются,
+# а по URL их не отличить от прошлых, поэтому все статьи живут день,
+# как и их список: устаревшая страница перепроверяется условным
+# запросом, и неизменная не загружается заново. Остальные ответы не
+# устаревают.
+URLS_EXPIRE_AFTER = {
+    re.compile(r'^https://peps\.python\.org/$'): timedelta(hours=1),
+    'peps.python.org/pep-': timedelta(days=7),
+    'peps.python.org/api/': timedelta(hours=1),
+    re.compile(r'/whatsnew/([\d.]+\.html)?$'): timedelta(days=1),
+}
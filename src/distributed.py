@@ -0,0 +1,184 @@
+"""
+Распределенный обход: координатор и воркеры с общей очередью заданий.
+
+Координатор выполняет режим как обычно, но страницы для извлечения
+данных не загружает сам, а кладет в очередь и ждет результатов:
+`RedisWorkQueue` на redis-совместимом сервере для нескольких машин или
+`WorkQueue` в sqlite-файле для процессов одной машины. Воркеры
+берут задания в аренду, загружают и разбирают страницы своим
+загрузчиком (со своим кэшем, потоками и процессами) и возвращают
+извлеченные поля. Задания упавшего воркера после истечения аренды
+достаются другим воркерам.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import closing
+import logging
+import os
+import socket
+import time
+from typing import (
+    TYPE_CHECKING, Callable, Iterable, Iterator, Optional, Union
+)
+
+from constants import (
+    LEASE_BATCH, LEASE_TIMEOUT, QUEUE_POLL_INTERVAL, QUEUE_TIMEOUT
+)
+from exceptions import QueueTimeoutError
+from fetchers import Fetcher
+from memo import get_extractor_name
+from storage import RedisWorkQueue, WorkQueue
+
+if TYPE_CHECKING:
+    from requests import Response
+
+
+class QueueFetcher(Fetcher):
+    """
+    Загрузчик координатора.
+
+    Отдельные страницы (общий список PEP, peps.json и т.п.) загружаются
+     локальным загрузчиком `fetcher`, а страницы для `extract_many`
+     загружают и разбирают воркеры через очередь `queue`. Результаты
+     отдаются в порядке `urls`, как у локальных загрузчиков.
+    Если за `timeout` секунд не пришло ни одного результата (воркеры
+     не запущены или упали), поднимается `QueueTimeoutError`.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        queue: Union[WorkQueue, RedisWorkQueue],
+        poll_interval: float = QUEUE_POLL_INTERVAL,
+        timeout: float = QUEUE_TIMEOUT,
+    ) -> None:
+        super().__init__(
+            fetcher.session,
+            store=fetcher.store,
+            retry=fetcher.retry,
+            controller=fetcher.controller,
+        )
+        self.fetcher = fetcher
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def _fetch_many(
+        self, urls: Iterable[str]
+    ) -> Iterator[Optional[Response]]:
+        return self.fetcher._fetch_many(urls)
+
+    def extract_many(
+        self, urls: list[str], extract: Callable[[bytes], dict]
+    ) -> Iterator[Optional[dict]]:
+        name = get_extractor_name(extract)
+        job_ids = self.queue.put_many(urls, name)
+        if not job_ids:
+            return
+        logging.info(f'В очередь добавлено заданий {name}: {len(job_ids)}')
+        finished = {}
+        try:
+            for job_id in job_ids:
+                if job_id not in finished:
+                    self._wait(job_id, job_ids[-1], finished)
+                yield finished.pop(job_id)
+        finally:
+            # Если потребитель не дочитал результаты, задания не нужны.
+            self.queue.cancel(job_ids[0], job_ids[-1])
+
+    def _wait(self, job_id: int, last_id: int, finished: dict) -> None:
+        """Ожидание результата задания `job_id`, пока идут результаты."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # Аренды истекают и без воркеров, иначе задания упавших
+            # воркеров ждали бы новых воркеров бесконечно.
+            self.queue.expire_leases()
+            taken = self.queue.take_finished(job_id, last_id)
+            finished.update(taken)
+            if job_id in finished:
+                return
+            if taken:
+                deadline = time.monotonic() + self.timeout
+            elif time.monotonic() > deadline:
+                raise QueueTimeoutError(
+                    f'Нет результатов от воркеров {self.timeout} секунд, '
+                    f'не выполнено заданий: {last_id - job_id + 1}'
+                )
+            time.sleep(self.poll_interval)
+
+
+def get_worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def process_jobs(
+    fetcher: Fetcher,
+    queue: Union[WorkQueue, RedisWorkQueue],
+    jobs: list[tuple],
+    extracts: dict[str, Callable[[bytes], dict]],
+) -> None:
+    """
+    Загрузка и разбор арендованных страниц, результаты - в очередь.
+
+    Если разбор страницы упал, задание считается неудачным, а
+     оставшиеся задания группы возвращаются в очередь.
+    """
+    groups = defaultdict(list)
+    for job_id, url, extractor in jobs:
+        groups[extractor].append((job_id, url))
+    for extractor, group in groups.items():
+        job_ids = [job_id for job_id, _ in group]
+        urls = [url for _, url in group]
+        results = []
+        try:
+            with closing(
+                fetcher.extract_many(urls, extracts[extractor])
+            ) as pages:
+                for job_id, fields in zip(job_ids, pages):
+                    results.append((job_id, fields))
+        except Exception:
+            logging.exception(f'Ошибка разбора страниц {extractor}')
+            failed = job_ids[len(results):len(results) + 1]
+            results.extend((job_id, None) for job_id in failed)
+            queue.release(job_ids[len(results):])
+        queue.complete(results)
+
+
+def run_worker(
+    fetcher: Fetcher,
+    queue: Union[WorkQueue, RedisWorkQueue],
+    extracts: dict[str, Callable[[bytes], dict]],
+    batch: int = LEASE_BATCH,
+    lease_timeout: float = LEASE_TIMEOUT,
+    poll_interval: float = QUEUE_POLL_INTERVAL,
+) -> int:
+    """
+    Цикл воркера до закрытия очереди координатором.
+
+    Задания с функциями `extracts` берутся в аренду по `batch` штук;
+     ключи `extracts` - имена функций с версией полей, как у
+     `memo.get_extractor_name`, и воркер прежней версии не берет
+     задания новой.
+     Воркер, запущенный раньше координатора, не завершается из-за
+     закрытого прошлого обхода. `lease_timeout` должен с запасом
+     покрывать обработку `batch` страниц, иначе задания достанутся
+     другим воркерам повторно.
+     Возвращает количество обработанных заданий.
+    """
+    worker = get_worker_name()
+    logging.info(f'Воркер {worker} ждет заданий')
+    processed = 0
+    stale_run, stale_closed = queue.get_state()
+    while True:
+        jobs = queue.lease(worker, list(extracts), batch, lease_timeout)
+        if jobs:
+            process_jobs(fetcher, queue, jobs, extracts)
+            processed += len(jobs)
+            continue
+        run, closed = queue.get_state()
+        if closed and not (stale_closed and run == stale_run):
+            break
+        time.sleep(poll_interval)
+    logging.info(f'Воркер {worker} обработал заданий: {processed}')
+    return processed
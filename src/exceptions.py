@@ -6,3 +6,18 @@ class ParserFindTagException(Exception):
 class ResponseIsNone(Exception):
     """Поднимается когда 'requests_cache' возвращает None-type."""
     pass
+
+
+class DownloadError(Exception):
+    """Поднимается когда загруженный файл не прошел проверку."""
+    pass
+
+
+class QueueTimeoutError(Exception):
+    """Поднимается когда воркеры долго не возвращают результаты."""
+    pass
+
+
+class MissingDependencyError(Exception):
+    """Поднимается когда не установлена необязательная зависимость."""
+    pass
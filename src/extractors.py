@@ -0,0 +1,243 @@
+"""
+Извлечение данных со страниц без построения полного дерева документа.
+
+Страница разбирается потоковым парсером lxml кусками по `CHUNK_SIZE`
+байт, из событий берутся только нужные теги, а разбор прекращается,
+как только все поля найдены. Функции извлечения принимают байты
+страницы и возвращают словарь, поэтому их можно выполнять в
+дочерних процессах.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+import logging
+import sys
+from typing import (
+    TYPE_CHECKING, Callable, Iterator, NamedTuple, NoReturn, Optional
+)
+from urllib.parse import urljoin
+
+from constants import EXPECTED_STATUS, PATTERN
+from exceptions import ParserFindTagException
+from metrics import timed
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+CHUNK_SIZE = 16 * 1024
+PEP_FIELDS = ('Status', 'Type', 'Author', 'Created')
+PEP_INDEX_SECTION = {'id': 'numerical-index'}
+PEP_INDEX_TABLE = {'class': 'pep-zero-table docutils align-default'}
+VERSIONS_SIDEBAR = {'class': 'sphinxsidebarwrapper'}
+
+
+def schema(version: int) -> Callable:
+    """
+    Декоратор версии набора полей функции извлечения.
+
+    Версию нужно увеличивать при изменении полей: сохраненные прежней
+     версией поля перестают браться из хранилища и памяти процесса.
+    """
+    def decorator(function: Callable) -> Callable:
+        function.schema = version
+        return function
+    return decorator
+
+
+class PepRow(NamedTuple):
+    """Строка общего списка PEP."""
+    number: int
+    url: str
+    index_status: str
+    title: Optional[str]
+    expected: tuple
+
+
+def iter_events(
+    content: bytes, tags: tuple, events: tuple = ('end',)
+) -> Iterator[tuple[str, etree._Element]]:
+    """
+    События `events` тегов `tags` в порядке их появления в документе.
+
+    Если потребитель перестает читать генератор, оставшаяся часть
+     страницы не разбирается. В пустой странице событий нет.
+    """
+    from lxml import etree
+
+    if not content:
+        return
+    parser = etree.HTMLPullParser(events=events, tag=tags, encoding='utf-8')
+    for start in range(0, len(content), CHUNK_SIZE):
+        parser.feed(content[start:start + CHUNK_SIZE])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def iter_elements(content: bytes, tags: tuple) -> Iterator[etree._Element]:
+    """Закрытые теги `tags` в порядке их окончания в документе."""
+    for _, element in iter_events(content, tags):
+        yield element
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(path: str) -> etree.XPath:
+    """
+    Скомпилированное выражение XPath.
+
+    Результаты - обычные строки: строки lxml по умолчанию держат
+     ссылку на тег, а с ним и все дерево документа.
+    """
+    from lxml import etree
+
+    return etree.XPath(path, smart_strings=False)
+
+
+def get_text(element: etree._Element) -> str:
+    return compile_xpath('string()')(element)
+
+
+def has_attrs(element: etree._Element, attrs: dict) -> bool:
+    return all(element.get(name) == value for name, value in attrs.items())
+
+
+def raise_not_found(tag: str, attrs: dict) -> NoReturn:
+    error_msg = f'Не найден тег {tag} {attrs}'
+    logging.error(error_msg, stack_info=True)
+    raise ParserFindTagException(error_msg)
+
+
+def forget_previous(element: etree._Element) -> None:
+    """Освобождает уже разобранный тег и предшествующие ему."""
+    element.clear()
+    parent = element.getparent()
+    while element.getprevious() is not None:
+        del parent[0]
+
+
+@timed('extract')
+def get_whats_new_fields(content: bytes) -> dict:
+    """Заголовок и редакторы статьи о нововведениях."""
+    fields = {}
+    for element in iter_elements(content, ('h1', 'dl')):
+        # Вложенный dl закрывается раньше внешнего, нужен внешний.
+        if element.tag in fields or (
+            element.tag == 'dl' and next(element.iterancestors('dl'), None)
+        ):
+            continue
+        fields[element.tag] = get_text(element)
+        if len(fields) == 2:
+            return {
+                'title': fields['h1'],
+                'editors': fields['dl'].replace('\n', ' '),
+            }
+
+    missing = 'dl' if 'h1' in fields else 'h1'
+    error_msg = f'Не найден тег {missing} None'
+    logging.error(error_msg, stack_info=True)
+    raise ParserFindTagException(error_msg)
+
+
+@schema(2)
+@timed('extract')
+def get_pep_fields(content: bytes) -> dict:
+    """
+    Статус, тип, авторы, дата создания и заголовок со страницы PEP.
+
+    Отсутствующие на странице поля равны None, `digest` - хэш
+     содержимого страницы для индекса PEP.
+    """
+    fields = dict.fromkeys(('status', 'type', 'author', 'created', 'title'))
+    for element in iter_elements(content, ('h1', 'dd')):
+        if element.tag == 'h1':
+            if fields['title'] is None:
+                fields['title'] = get_text(element)
+        else:
+            dt_tag = element.getprevious()
+            if dt_tag is not None and dt_tag.text in PEP_FIELDS:
+                fields[dt_tag.text.lower()] = get_text(element)
+        if None not in fields.values():
+            break
+    fields['digest'] = hashlib.sha1(content).hexdigest()
+    return fields
+
+
+def get_pep_row(row: etree._Element, base_url: str) -> PepRow:
+    # Ожидаемые статусы - общие для всех строк кортежи EXPECTED_STATUS.
+    type_status = sys.intern(get_text(next(row.iter('abbr'))))
+    status_index = type_status[1] if len(type_status) == 2 else ''
+    a_tag = next(row.iter('a'))
+    cells = row.findall('td')
+    return PepRow(
+        number=int(a_tag.text),
+        url=urljoin(base_url, a_tag.get('href')),
+        index_status=type_status,
+        title=get_text(cells[2]) if len(cells) > 2 else None,
+        expected=EXPECTED_STATUS[status_index],
+    )
+
+
+@timed('get_pep_index_rows')
+def get_pep_index_rows(content: bytes, base_url: str) -> list[PepRow]:
+    """
+    Строки таблицы численного индекса со страницы общего списка PEP.
+
+    Таблица разбирается за один проход: каждая строка превращается в
+     `PepRow` сразу после закрытия тега и удаляется из дерева, а разбор
+     прекращается на конце таблицы.
+    """
+    rows = []
+    in_section = in_table = False
+    for event, element in iter_events(
+        content, ('section', 'table', 'tr'), ('start', 'end')
+    ):
+        if element.tag == 'section':
+            if has_attrs(element, PEP_INDEX_SECTION):
+                in_section = event == 'start'
+        elif element.tag == 'table':
+            if in_section and has_attrs(element, PEP_INDEX_TABLE):
+                if event == 'end':
+                    return rows
+                in_table = True
+        elif (
+            event == 'end' and in_table
+            and element.getparent().tag == 'tbody'
+        ):
+            rows.append(get_pep_row(element, base_url))
+            forget_previous(element)
+    raise_not_found('table', PEP_INDEX_TABLE)
+
+
+@timed('get_version_links')
+def get_version_links(content: bytes) -> list[tuple]:
+    """
+    Ссылка, версия и статус документации всех версий Python.
+
+    Берется список боковой панели со ссылкой All versions; у ссылок,
+     не подходящих под `PATTERN`, версия - текст ссылки.
+    """
+    for element in iter_elements(content, ('ul', 'div')):
+        if element.tag == 'div':
+            if has_attrs(element, VERSIONS_SIDEBAR):
+                raise ValueError(
+                    'Необходимый список с версиями Python не найден.'
+                )
+            continue
+        in_sidebar = any(
+            has_attrs(div, VERSIONS_SIDEBAR)
+            for div in element.iterancestors('div')
+        )
+        if not in_sidebar or 'All versions' not in get_text(element):
+            continue
+        links = []
+        for a_tag in element.iter('a'):
+            text = get_text(a_tag)
+            text_match = PATTERN.search(text)
+            if text_match is not None:
+                version, status = text_match.groups()
+            else:
+                version, status = text, ''
+            links.append((a_tag.get('href'), version, status))
+        return links
+    raise_not_found('div', VERSIONS_SIDEBAR)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+from constants import ASYNC_CONCURRENCY
+from memo import RECORD_CACHE, get_extractor_name, get_page_key
+from storage import PageStore
+from throttling import HostController, RetryPolicy
+from utils import get_digest, get_response, get_responses, is_not_modified
+
+if TYPE_CHECKING:
+    from requests import Response
+    from requests_cache import CachedSession
+
+# Сколько страниц на процесс может ждать разбора в пуле процессов.
+PROCESS_WINDOW = 4
+
+
+@dataclass
+class Page:
+    """Загруженная страница на пути к извлечению данных."""
+    url: str
+    digest: Optional[str]
+    content: bytes
+    fields: Optional[dict] = None
+    future: Optional[Future] = None
+
+
+class Fetcher(ABC):
+    """
+    Базовый загрузчик страниц.
+
+    Все режимы парсера получают страницы через загрузчик, поэтому
+     способ загрузки можно менять, не трогая сами парсеры.
+    Если задано хранилище `store`, данные со страниц, содержимое которых
+     не изменилось, берутся из него без разбора HTML.
+    При `processes` > 1 страницы разбираются в пуле процессов.
+    Неудачные запросы повторяются по политике `retry`, нагрузку на
+     хосты ограничивает `controller`. Подклассы задают способ загрузки
+     в `_fetch_many`.
+    """
+
+    def __init__(
+        self,
+        session: CachedSession,
+        store: Optional[PageStore] = None,
+        processes: int = 1,
+        retry: Optional[RetryPolicy] = None,
+        controller: Optional[HostController] = None,
+    ) -> None:
+        self.session = session
+        self.store = store
+        self.processes = processes
+        self.retry = retry
+        self.controller = controller
+
+    def fetch(self, url: str) -> Optional[Response]:
+        return get_response(self.session, url, self.retry, self.controller)
+
+    def fetch_many(
+        self, urls: Iterable[str]
+    ) -> Iterator[Optional[Response]]:
+        """Загрузка нескольких страниц, ответы в порядке `urls`."""
+        responses = self._fetch_many(urls)
+        if not self.session.settings.always_revalidate:
+            return responses
+        return self._count_not_modified(responses)
+
+    @abstractmethod
+    def _fetch_many(
+        self, urls: Iterable[str]
+    ) -> Iterator[Optional[Response]]:
+        """Ответы на запросы `urls` в том же порядке."""
+
+    def extract_many(
+        self, urls: list[str], extract: Callable[[bytes], dict]
+    ) -> Iterator[Optional[dict]]:
+        """
+        Загрузка страниц и извлечение из них данных функцией `extract`.
+
+        Для незагруженных страниц отдается None, порядок - как в `urls`.
+        """
+        try:
+            pages = self._lookup_many(urls, extract)
+            if self.processes > 1:
+                yield from self._extract_in_processes(pages, extract)
+            else:
+                for page in pages:
+                    yield self._get_fields(page, extract)
+        finally:
+            if self.store is not None:
+                self.store.save()
+
+    def _lookup_many(
+        self, urls: list[str], extract: Callable
+    ) -> Iterator[Optional[Page]]:
+        """
+        Загруженные страницы с полями из хранилища, если они есть.
+
+        Ответы с ошибкой (404 и т.п.) считаются незагруженными страницами,
+         страница ошибки не передается функции извлечения.
+        """
+        for url, response in zip(urls, self.fetch_many(urls)):
+            if response is None:
+                yield None
+                continue
+            if not response.ok:
+                logging.warning(
+                    f'Страница {url} не загружена: '
+                    f'ответ {response.status_code}'
+                )
+                yield None
+                continue
+            page = Page(url, None, response.content)
+            if self.store is not None or RECORD_CACHE.maxsize:
+                page.digest = get_digest(response)
+                page.fields = self._lookup_fields(page, extract)
+            yield page
+
+    def _lookup_fields(
+        self, page: Page, extract: Callable
+    ) -> Optional[dict]:
+        """Поля из хранилища или из памяти процесса, если они есть."""
+        name = get_extractor_name(extract)
+        if self.store is not None:
+            fields = self.store.get(page.url, name, page.digest)
+            if fields is not None:
+                return fields
+        fields = RECORD_CACHE.get(get_page_key(page.url, name, page.digest))
+        if fields is not None and self.store is not None:
+            self.store.put(page.url, name, page.digest, fields)
+        return fields
+
+    def _extract_in_processes(
+        self, pages: Iterator[Optional[Page]], extract: Callable
+    ) -> Iterator[Optional[dict]]:
+        """
+        Разбор страниц в пуле процессов.
+
+        В дочерние процессы передаются только байты страниц, обратно -
+         извлеченные поля; загрузка остается в основном процессе.
+         Результаты отдаются в порядке страниц.
+        """
+        window = deque()
+        # Пул процессов тянет multiprocessing, он нужен только с -p.
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        # fork копировал бы блокировки потоков загрузки и пула соединений
+        # в произвольном состоянии, forkserver и spawn запускают чистые
+        # процессы (forkserver есть не на всех платформах).
+        method = 'forkserver' if 'forkserver' in (
+            multiprocessing.get_all_start_methods()
+        ) else 'spawn'
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context(method),
+        ) as executor:
+            for page in pages:
+                if page is not None and page.fields is None:
+                    page.future = executor.submit(extract, page.content)
+                window.append(page)
+                while window and (
+                    len(window) > self.processes * PROCESS_WINDOW
+                    or window[0] is None
+                    or window[0].future is None
+                    or window[0].future.done()
+                ):
+                    yield self._get_fields(window.popleft(), extract)
+            while window:
+                yield self._get_fields(window.popleft(), extract)
+
+    def _get_fields(
+        self, page: Optional[Page], extract: Callable
+    ) -> Optional[dict]:
+        if page is None or page.fields is not None:
+            return page and page.fields
+        if page.future is not None:
+            fields = page.future.result()
+        else:
+            fields = extract(page.content)
+        name = get_extractor_name(extract)
+        if self.store is not None:
+            self.store.put(page.url, name, page.digest, fields)
+        if page.digest is not None:
+            RECORD_CACHE.put(get_page_key(page.url, name, page.digest), fields)
+        return fields
+
+    @staticmethod
+    def _count_not_modified(
+        responses: Iterator[Optional[Response]]
+    ) -> Iterator[Optional[Response]]:
+        total = not_modified = 0
+        try:
+            for response in responses:
+                total += 1
+                not_modified += is_not_modified(response)
+                yield response
+        finally:
+            # Потребитель может не дочитать генератор до StopIteration
+            # (например, zip), поэтому итог логируется при закрытии.
+            logging.info(
+                f'Не изменились с прошлого запуска: {not_modified} '
+                f'из {total} страниц'
+            )
+
+
+class SyncFetcher(Fetcher):
+    """Синхронный загрузчик на пуле из `workers` потоков."""
+
+    def __init__(
+        self, session: CachedSession, workers: int = 1, **options
+    ) -> None:
+        super().__init__(session, **options)
+        self.workers = workers
+
+    def _fetch_many(
+        self, urls: Iterable[str]
+    ) -> Iterator[Optional[Response]]:
+        return get_responses(
+            self.session, urls, self.workers, self.retry, self.controller
+        )
+
+
+class AsyncFetcher(Fetcher):
+    """
+    Загрузчик с диспетчером на asyncio поверх пула потоков.
+
+    Сами запросы блокирующие: их выполняет пул из `concurrency` потоков
+     через ту же сессию, что и у синхронного загрузчика, поэтому кэш,
+     повторы и условные запросы у них общие. Событийный цикл в
+     отдельном потоке только распределяет лимит `per_host` запросов к
+     одному хосту, так что загрузчик работает и из кода, где уже
+     запущен свой цикл. Ответы отдаются по мере готовности в порядке
+     `urls`, вперед загружается не больше `concurrency` страниц.
+    """
+
+    def __init__(
+        self,
+        session: CachedSession,
+        concurrency: int = ASYNC_CONCURRENCY,
+        per_host: int = 10,
+        **options,
+    ) -> None:
+        super().__init__(session, **options)
+        self.concurrency = concurrency
+        self.per_host = per_host
+
+    def _fetch_many(
+        self, urls: Iterable[str]
+    ) -> Iterator[Optional[Response]]:
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        # requests блокирует поток на время запроса, поэтому сетевой
+        # ввод-вывод выполняется в пуле, а цикл распределяет лимиты.
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        window = deque()
+        try:
+            for url in urls:
+                window.append(asyncio.run_coroutine_threadsafe(
+                    self._fetch(url, executor, host_limits), loop
+                ))
+                if len(window) >= self.concurrency:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+        finally:
+            # Потребитель мог не дочитать ответы: лишние запросы отменяются.
+            for future in window:
+                future.cancel()
+            executor.shutdown(cancel_futures=True)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    async def _fetch(
+        self,
+        url: str,
+        executor: ThreadPoolExecutor,
+        host_limits: dict,
+    ) -> Optional[Response]:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        async with host_limits[urlparse(url).netloc]:
+            return await loop.run_in_executor(
+                executor, self.fetch, url
+            )
@@ -1,165 +1,612 @@
+"""
+Парсер документации Python и PEP.
+
+Тяжелые зависимости (requests_cache, BeautifulSoup, lxml, tqdm,
+prettytable) импортируются при первом использовании, поэтому `--help`
+и выборка из индекса PEP запускаются без них.
+"""
+from __future__ import annotations
+
+from argparse import Namespace
+from contextlib import closing
+import hashlib
+from itertools import islice
+import json
 import logging
 import re
-from urllib.parse import urljoin
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from configs import (
+    configure_argument_parser, configure_cache, configure_fetcher,
+    configure_logging, configure_queue, configure_session
+)
+from constants import (
+    ASYNC, BASE_DIR, CHECKPOINT_INTERVAL, DOWNLOAD_FORMATS, LEASE_BATCH,
+    MAIN_DOC_URL, PAGE_STORE_PATH, PDF_A4, PEP_CHECKPOINT_PATH, PEP_DOC_URL,
+    PEP_INDEX_PATH, PEP_LISTING_PATH, PEP_MISMATCHES
+)
+from distributed import QueueFetcher, run_worker
+from extractors import (
+    PepRow, get_pep_fields, get_pep_index_rows, get_version_links,
+    get_whats_new_fields
+)
+from fetchers import Fetcher, SyncFetcher
+from memo import (
+    RECORD_CACHE,
+    configure_memo,
+    get_extractor_name,
+    get_page_key,
+    join_url,
+)
+from metrics import METRICS
+from outputs import control_output
+from scraper import Scraper, get_parsers, register_parser
+from storage import Checkpoint, PageStore, PepIndex
+from utils import download_files, find_tag, get_digest, get_soup
 
-from bs4 import BeautifulSoup
-from requests_cache import CachedResponse, CachedSession
-from tqdm import tqdm
+if TYPE_CHECKING:
+    from requests import Response
+    from requests_cache import CachedResponse, CachedSession
 
-from configs import configure_argument_parser, configure_logging
-from constants import BASE_DIR, EXPECTED_STATUS, MAIN_DOC_URL, PEP_DOC_URL
-from outputs import control_output
-from utils import find_tag, get_response, get_soup
 
+def whats_new(
+    session: CachedResponse, fetcher: Optional[Fetcher] = None
+) -> Iterator[tuple]:
+    from tqdm import tqdm
 
-def whats_new(session: CachedResponse) -> list[tuple]:
-    whats_new_url: str = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    response = get_response(session, whats_new_url)
+    fetcher = fetcher or SyncFetcher(session)
+    whats_new_url: str = join_url(MAIN_DOC_URL, 'whatsnew/')
+    response = fetcher.fetch(whats_new_url)
     soup = get_soup(response)
     main_div = find_tag(soup, 'section', attrs={'id': 'what-s-new-in-python'})
     div_with_ul = find_tag(main_div, 'div', attrs={'class': 'toctree-wrapper'})
     section_by_python = div_with_ul.find_all(
         'li', attrs={'class': 'toctree-l1'}
     )
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-
-    for section in tqdm(
-        section_by_python, desc=f'Открываю ссылки для {whats_new_url}'
+    yield ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+    version_links = [
+        join_url(whats_new_url, section.find('a')['href'])
+        for section in section_by_python
+    ]
+
+    for version_link, fields in tqdm(
+        zip(
+            version_links,
+            fetcher.extract_many(version_links, get_whats_new_fields)
+        ),
+        total=len(version_links),
+        desc=f'Открываю ссылки для {whats_new_url}'
     ):
-        version_a_tag = section.find('a')
-        href = version_a_tag['href']
-        version_link = urljoin(whats_new_url, href)
-        response = get_response(session, version_link)
-        if response is None:
+        if fields is None:
             continue
 
-        soup = BeautifulSoup(response.text, features='lxml')
-        h1 = find_tag(soup, 'h1')
-        dl = find_tag(soup, 'dl')
-        dl_text = dl.text.replace('\n', ' ')
-        results.append(
-            (version_link, h1.text, dl_text)
-        )
+        yield (version_link, fields['title'], fields['editors'])
 
-    return results
 
+def latest_versions(
+    session: CachedResponse, fetcher: Optional[Fetcher] = None
+) -> Iterator[tuple]:
+    from tqdm import tqdm
 
-def latest_versions(session: CachedResponse) -> list[tuple]:
-    response = get_response(session, MAIN_DOC_URL)
-    soup = get_soup(response)
-    sidebar = find_tag(soup, 'div', attrs={'class': 'sphinxsidebarwrapper'})
-    ul_tags = sidebar.find_all('ul')
+    fetcher = fetcher or SyncFetcher(session)
+    response = fetcher.fetch(MAIN_DOC_URL)
+    version_links = get_version_links(response.content)
 
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise ValueError('Необходимый список с версиями Python не найден.')
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
+    yield from tqdm(version_links)
 
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
 
-    for a_tag in tqdm(a_tags):
-        link = a_tag['href']
-        text_match = re.search(pattern, a_tag.text)
-        if text_match is not None:
-            version, status = text_match.groups()
-        else:
-            version, status = a_tag.text, ''
-        results.append((link, version, status))
+def get_doc_urls(
+    session: CachedResponse, fetcher: Fetcher, versions: Optional[list]
+) -> list[str]:
+    """Ссылки на документацию выбранных версий Python."""
+    if not versions:
+        return [MAIN_DOC_URL]
 
-    return results
+    doc_urls = {
+        version: link
+        for link, version, _ in islice(
+            latest_versions(session, fetcher), 1, None
+        )
+    }
+    missing = [version for version in versions if version not in doc_urls]
+    if missing:
+        raise ValueError(f'Не найдена документация для версий: {missing}')
+    return [doc_urls[version] for version in versions]
 
 
-def download(session: CachedResponse) -> None:
-    downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
-    response = get_response(session, downloads_url)
+def get_archive_urls(
+    downloads_url: str, response: Response, formats: Iterable[str]
+) -> list[str]:
+    """Ссылки на архивы выбранных форматов со страницы загрузок."""
     soup = get_soup(response)
-
     div_tag = find_tag(soup, 'div', attrs={'role': 'main'})
     table_tag = find_tag(div_tag, 'table', attrs={'class': 'docutils'})
-    pdf_tag = find_tag(
-        table_tag, 'a', attrs={'href': re.compile(r'.+pdf-a4\.zip$')}
-    )
 
-    pdf_link = pdf_tag['href']
-    archive_url = urljoin(downloads_url, pdf_link)
-    filename = archive_url.split('/')[-1]
+    archive_urls = []
+    for doc_format in formats:
+        a_tag = find_tag(
+            table_tag,
+            'a',
+            attrs={'href': re.compile(DOWNLOAD_FORMATS[doc_format])}
+        )
+        archive_urls.append(join_url(downloads_url, a_tag['href']))
+    return archive_urls
+
+
+def download(
+    session: CachedResponse,
+    fetcher: Optional[Fetcher] = None,
+    formats: Iterable[str] = (PDF_A4,),
+    versions: Optional[list] = None,
+    workers: int = 1,
+    rate_limit: Optional[int] = None,
+) -> None:
+    """
+    Загрузка архивов документации.
+
+    По умолчанию загружается PDF (A4) текущей версии. Архивы выбранных
+     форматов и версий загружаются параллельно в `workers` потоков
+     с общим ограничением скорости `rate_limit`, байт/с.
+    """
+    fetcher = fetcher or SyncFetcher(session)
+    downloads_urls = [
+        join_url(doc_url, 'download.html')
+        for doc_url in get_doc_urls(session, fetcher, versions)
+    ]
+    archive_urls = []
+    for downloads_url, response in zip(
+        downloads_urls, fetcher.fetch_many(downloads_urls)
+    ):
+        archive_urls.extend(
+            get_archive_urls(downloads_url, response, formats)
+        )
+
     downloads_dir = BASE_DIR / 'downloads'
     downloads_dir.mkdir(exist_ok=True)
-    archive_path = downloads_dir / filename
-    response = get_response(session, archive_url)
+    for archive_path in download_files(
+        fetcher.session, archive_urls, downloads_dir, workers, rate_limit
+    ):
+        logging.info(f'Архив был загружен и сохранен: {archive_path}')
+
+
+def get_index_record(row: PepRow, fields: dict) -> dict:
+    """Запись индекса PEP из строки общего списка и полей страницы."""
+    return {
+        'number': row.number,
+        'title': row.title,
+        'index_status': row.index_status,
+        'url': row.url,
+        'type': fields['type'],
+        'status': fields['status'],
+        'authors': fields['author'],
+        'created': fields['created'],
+        'digest': fields['digest'],
+    }
+
+
+def get_pep_rows(fetcher: Fetcher) -> list[PepRow]:
+    """
+    Строки общего списка PEP.
+
+    Разобранный список запоминается в `RECORD_CACHE` по хэшу страницы,
+     строки общие для всех запусков, изменять их нельзя.
+    """
+    response = fetcher.fetch(PEP_DOC_URL)
+    key = get_page_key(
+        response.url or PEP_DOC_URL,
+        get_pep_index_rows.__name__,
+        get_digest(response),
+    )
+    pep_rows = RECORD_CACHE.get(key)
+    if pep_rows is None:
+        pep_rows = get_pep_index_rows(response.content, PEP_DOC_URL)
+        RECORD_CACHE.put(key, pep_rows)
+    return pep_rows
+
+
+def get_listing_digests(fetcher: Fetcher) -> Optional[dict[int, str]]:
+    """
+    Хэши записей всех PEP из списка peps.json, ключ - номер PEP.
+
+    Если список недоступен, возвращает None.
+    """
+    response = fetcher.fetch(join_url(PEP_DOC_URL, PEP_LISTING_PATH))
+    if response is None or not response.ok:
+        logging.warning(
+            'Список peps.json недоступен, загружаются страницы всех PEP'
+        )
+        return None
+    return {
+        int(number): hashlib.sha1(
+            json.dumps(data, sort_keys=True).encode()
+        ).hexdigest()
+        for number, data in response.json().items()
+    }
+
+
+def get_record_fields(record: dict) -> dict:
+    """Поля страницы PEP из записи индекса PEP."""
+    return {
+        'status': record['status'],
+        'type': record['type'],
+        'author': record['authors'],
+        'created': record['created'],
+        'digest': record['digest'],
+    }
+
+
+def iter_pep_fields(
+    fetcher: Fetcher,
+    pep_rows: list[PepRow],
+    index: Optional[PepIndex] = None,
+    bulk: bool = False,
+) -> Iterator[tuple]:
+    """
+    Строки общего списка вместе с полями страниц PEP.
+
+    В быстром режиме `bulk` страница PEP не загружается, если его
+     запись в peps.json не изменилась с прошлого запуска, а статус из
+     индекса PEP совпадает с ожидаемым. Такие поля берутся из `index`,
+     остальные страницы загружаются из сети в обход кэша, и только
+     после этого в индекс записывается хэш их записи в peps.json.
+    """
+    digests = None
+    if bulk and index is not None:
+        digests = get_listing_digests(fetcher)
+    unchanged = index.get_unchanged(digests) if digests else {}
+    known = {}
+    for row in pep_rows:
+        record = unchanged.get(row.number)
+        # PEP с расхождением статусов проверяется по странице каждый раз.
+        if record is not None and record['status'] in row.expected:
+            known[row.number] = record
+    changed = [row.url for row in pep_rows if row.number not in known]
+    if digests:
+        logging.info(
+            f'Изменившихся PEP по peps.json: {len(changed)} '
+            f'из {len(pep_rows)}'
+        )
+        # Страницы PEP живут в кэше сессии неделю: копия изменившегося
+        # PEP в кэше устарела, а новый хэш записи peps.json закрепил бы
+        # ее в индексе навсегда. Такие страницы загружаются из сети.
+        fetcher.session.cache.delete(urls=changed)
+
+    with closing(fetcher.extract_many(changed, get_pep_fields)) as pages:
+        for row in pep_rows:
+            if row.number in known:
+                yield row, get_record_fields(known[row.number])
+                continue
+            fields = next(pages)
+            if fields is not None and digests and row.number in digests:
+                index.put_listing(row.number, digests[row.number])
+            yield row, fields
+
+
+def load_statuses(
+    checkpoint: Checkpoint, pep_rows: list[PepRow]
+) -> dict[int, str]:
+    """Статусы PEP из общего списка, проверенных до контрольной точки."""
+    state = checkpoint.load() or {'statuses': {}}
+    numbers = {row.number for row in pep_rows}
+    statuses = {
+        int(number): status
+        for number, status in state['statuses'].items()
+        if int(number) in numbers
+    }
+    logging.info(
+        f'Продолжение обхода PEP: проверено {len(statuses)} '
+        f'из {len(pep_rows)}'
+    )
+    return statuses
 
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
 
-    logging.info(f'Архив был загружен и сохранен: {archive_path}')
+def save_progress(
+    checkpoint: Checkpoint, pep_rows: list[PepRow], statuses: dict[int, str]
+) -> None:
+    """
+    Контрольная точка обхода PEP.
 
+    Когда проверены все PEP, контрольная точка удаляется. Неудачно
+     загруженные PEP в нее не попадают и проверяются при продолжении.
+    """
+    if len(statuses) == len(pep_rows):
+        checkpoint.clear()
+    else:
+        checkpoint.save({'statuses': statuses})
 
-def pep(session: CachedResponse) -> list[tuple]:
-    """Парсер PEP-документации."""
-    response = get_response(session, PEP_DOC_URL)
-    soup = get_soup(response)
-    main_tag = find_tag(soup, 'section', attrs={'id': 'numerical-index'})
-    table_tag = find_tag(
-        main_tag,
-        'table',
-        attrs={'class': 'pep-zero-table docutils align-default'}
-    )
-    tbody_tag = find_tag(table_tag, 'tbody')
-    rows_by_pep = tbody_tag.find_all('tr')
 
+def count_statuses(
+    pep_rows: list[PepRow], statuses: dict[int, str]
+) -> dict[str, int]:
+    """Количество PEP в каждом статусе в порядке общего списка."""
     temp = {}
+    for row in pep_rows:
+        status = statuses.get(row.number)
+        if status is not None:
+            temp[status] = temp.get(status, 0) + 1
+    return temp
+
+
+def get_mismatches(
+    pep_rows: list[PepRow], statuses: dict[int, str]
+) -> list[tuple]:
+    """
+    Строки отчета о расхождениях статусов в порядке общего списка.
+
+    Строятся по статусам, поэтому в отчет попадают и PEP, проверенные
+     до контрольной точки.
+    """
+    return [
+        (row.number, row.url, statuses[row.number],
+         ', '.join(row.expected), row.index_status)
+        for row in pep_rows
+        if row.number in statuses and statuses[row.number] not in row.expected
+    ]
+
+
+def pep(
+    session: CachedResponse,
+    fetcher: Optional[Fetcher] = None,
+    workers: int = 1,
+    index: Optional[PepIndex] = None,
+    bulk: bool = False,
+    checkpoint: Optional[Checkpoint] = None,
+    resume: bool = False,
+    mismatches: Optional[list[tuple]] = None,
+) -> Iterator[tuple]:
+    """
+    Парсер PEP-документации.
+
+    Страницы PEP загружаются одним запросом к загрузчику (по умолчанию -
+     пул из `workers` потоков), подсчет статусов и логирование
+     расхождений идут в порядке общего списка. Заголовок таблицы
+     отдается сразу, строки с количеством - после проверки всех PEP.
+     Если передан `index`, данные каждого PEP сохраняются в него, а с
+     `bulk` загружаются только PEP, изменившиеся по списку peps.json.
+    Каждые `CHECKPOINT_INTERVAL` PEP и при прерывании статусы
+     проверенных PEP сохраняются в `checkpoint`; с `resume` обход
+     продолжается с контрольной точки без повторной загрузки этих PEP.
+    Расхождения статуса на странице с ожидаемыми, включая PEP из
+     контрольной точки, добавляются в `mismatches` строками отчета
+     `get_mismatches`; в лог пишется только их количество.
+    """
+    from tqdm import tqdm
+
+    fetcher = fetcher or SyncFetcher(session, workers)
+    pep_rows = get_pep_rows(fetcher)
+    statuses = {}
+    if checkpoint is not None and resume:
+        statuses = load_statuses(checkpoint, pep_rows)
+    pending = [row for row in pep_rows if row.number not in statuses]
+    if mismatches is None:
+        mismatches = []
+
+    yield ('Статус', 'Количество')
+
+    try:
+        for row, fields in tqdm(
+            iter_pep_fields(fetcher, pending, index, bulk),
+            total=len(pep_rows),
+            initial=len(pep_rows) - len(pending),
+            desc='Проверка главного списка'
+        ):
+            if fields is None:
+                continue
+
+            # Статус непосредственно из PEP:
+            status_of_page = fields['status']
+
+            statuses[row.number] = status_of_page
+            if index is not None:
+                index.put(get_index_record(row, fields))
+
+            if checkpoint is not None and (
+                len(statuses) % CHECKPOINT_INTERVAL == 0
+            ):
+                if index is not None:
+                    index.save()
+                save_progress(checkpoint, pep_rows, statuses)
+    finally:
+        if index is not None:
+            index.save()
+        if checkpoint is not None:
+            save_progress(checkpoint, pep_rows, statuses)
+        found = get_mismatches(pep_rows, statuses)
+        mismatches.extend(found)
+
+    logging.info(f'Несовпадающих статусов: {len(found)}')
+    temp = count_statuses(pep_rows, statuses)
+    yield from temp.items()
+    yield ('Total', sum(temp.values()))
 
-    for row in tqdm(rows_by_pep, desc='Проверка главного списка'):
-        # Добываем общий статус для дальнейшей проверки:
-        abbr_tag = row.find('abbr')
-        type_status = abbr_tag.text
-        status_index = type_status[1] if len(type_status) == 2 else ''
-        general_status = EXPECTED_STATUS[status_index]
-
-        # Добываем ссылку определенного PEPа:
-        a_tag = row.find('a')
-        href = a_tag['href']
-        pep_link = urljoin(PEP_DOC_URL, href)
-        response = get_response(session, pep_link)
-        if response is None:
-            continue
 
-        # Добываем статус непосредственно из PEP:
-        soup = BeautifulSoup(response.text, features='lxml')
-        status_dt_tag = soup.find(string='Status').parent
-        status_of_page = status_dt_tag.find_next_sibling().text
+MODE_TO_FUNCTION = {
+    'whats-new': whats_new,
+    'latest-versions': latest_versions,
+    'download': download,
+    'pep': pep,
+}
+# Функции извлечения, страницы для которых можно раздать воркерам.
+MODE_TO_EXTRACTOR = {
+    'whats-new': get_whats_new_fields,
+    'pep': get_pep_fields,
+}
+for mode, function in MODE_TO_FUNCTION.items():
+    register_parser(mode, function)
+
+
+def get_mode_options(cli_args: Namespace) -> dict:
+    """Параметры командной строки, относящиеся к отдельным режимам."""
+    if cli_args.mode == 'download':
+        return {
+            'formats': cli_args.formats,
+            'versions': cli_args.versions,
+            'workers': cli_args.workers,
+            'rate_limit': cli_args.rate_limit,
+        }
+    if cli_args.mode == 'pep':
+        return {
+            'index': PepIndex(PEP_INDEX_PATH),
+            'bulk': cli_args.bulk,
+            'checkpoint': Checkpoint(PEP_CHECKPOINT_PATH),
+            'resume': cli_args.resume,
+            'mismatches': [],
+        }
+    return {}
+
+
+def query_pep_index(cli_args: Namespace) -> list[tuple]:
+    """Выборка из локального индекса PEP без обращения к сети."""
+    return PepIndex(PEP_INDEX_PATH).query(cli_args.status, cli_args.pep_type)
+
+
+def get_cache_max_size(cli_args: Namespace) -> Optional[int]:
+    """Лимит размера кэша из мегабайт командной строки в байты."""
+    if cli_args.cache_max_size is None:
+        return None
+    return int(cli_args.cache_max_size * 1024 * 1024)
+
+
+def mismatch_output(mismatches: list[tuple], cli_args: Namespace) -> None:
+    """
+    Отчет о расхождениях статусов PEP.
+
+    Выводится так же, как результаты: в файл того же формата (путь
+     к файлу пишется в лог) или в терминал.
+    """
+    if not mismatches:
+        return
+    control_output(
+        [
+            ('PEP', 'Ссылка', 'Статус в карточке', 'Ожидаемые статусы',
+             'Статус в списке'),
+            *mismatches,
+        ],
+        Namespace(mode=PEP_MISMATCHES, output=cli_args.output),
+    )
 
-        temp[status_of_page] = temp.get(status_of_page, 0) + 1
 
-        if status_of_page not in general_status:
-            info_msg = (
-                f'Несовпадающие статусы:'
-                f'{pep_link}\n'
-                f'Статус в карточке: {status_of_page}\n'
-                f'Ожидаемые статусы: {general_status}\n'
-            )
-            logging.info(info_msg)
+def get_modes(cli_args: Namespace) -> list[Namespace]:
+    """
+    Аргументы командной строки для каждого из режимов.
+
+    Повторно указанный режим выполняется один раз.
+    """
+    return [
+        Namespace(**{**vars(cli_args), 'mode': mode})
+        for mode in dict.fromkeys(cli_args.mode)
+    ]
+
+
+def run_modes(
+    session: CachedSession, fetcher: Fetcher, cli_args: Namespace
+) -> None:
+    """
+    Запуск всех режимов из командной строки.
+
+    Несколько режимов выполняются одновременно с общими сессией, пулом
+     соединений, кэшем и загрузчиком, вывод в терминал идет в порядке
+     режимов в командной строке.
+    """
+    modes = {
+        mode_args.mode: get_mode_options(mode_args)
+        for mode_args in get_modes(cli_args)
+    }
+    try:
+        Scraper(session, fetcher, cli_args.output).run_many(modes)
+    finally:
+        if 'pep' in modes:
+            mismatch_output(modes['pep']['mismatches'], cli_args)
+
+
+def run_distributed(
+    session: CachedSession, fetcher: Fetcher, cli_args: Namespace
+) -> None:
+    """
+    Распределенный обход через очередь `--queue`.
+
+    С `--worker` процесс выполняет задания режимов из очереди, пока
+     координатор не закроет ее; иначе он координатор: запускает режимы,
+     раздавая страницы воркерам, и закрывает очередь по окончании.
+    """
+    queue = configure_queue(cli_args.queue)
+    if cli_args.worker:
+        extracts = [MODE_TO_EXTRACTOR[mode] for mode in cli_args.mode]
+        run_worker(
+            fetcher,
+            queue,
+            {get_extractor_name(extract): extract for extract in extracts},
+            cli_args.workers * LEASE_BATCH,
+            cli_args.lease_timeout,
+        )
+        return
+    queue.open()
+    try:
+        run_modes(
+            session,
+            QueueFetcher(fetcher, queue, timeout=cli_args.queue_timeout),
+            cli_args,
+        )
+    finally:
+        queue.close()
+
+
+def get_fetcher(
+    session: CachedSession,
+    cli_args: Namespace,
+    store: Optional[PageStore] = None,
+) -> Fetcher:
+    """Загрузчик по аргументам командной строки, общий для всех режимов."""
+    return configure_fetcher(
+        session,
+        cli_args.fetcher,
+        cli_args.workers,
+        cli_args.per_host,
+        store,
+        cli_args.processes,
+        cli_args.retries,
+        cli_args.concurrency,
+        modes=len(get_modes(cli_args)),
+    )
 
-    results = [('Статус', 'Количество')]
 
-    for key, value in temp.items():
-        results.append((key, value))
+def run_parser(args: Namespace) -> None:
+    """Запуск режимов из командной строки с кэширующейся сессией."""
+    from caching import compact_cache
 
-    results.append(
-        ('Total', sum(temp.values()))
+    configure_memo(args.soup_cache_size, args.record_cache_size)
+    # Создаем кэширующуюся сессию.
+    session = configure_session(
+        args.per_host if args.fetcher == ASYNC else (
+            args.workers * len(get_modes(args))
+        ),
+        args.refresh,
+        pool_size=args.pool_size,
+        keep_alive=args.keep_alive,
+        timeout=(args.connect_timeout, args.read_timeout),
+        http2=args.http2,
+        cache=configure_cache(
+            args.cache_backend, args.cache_compression, args.redis_url
+        ),
     )
-    return results
+    if args.compact_cache:
+        compact_cache(session.cache, get_cache_max_size(args))
+        return
+    store = PageStore(PAGE_STORE_PATH)
+    if args.clear_cache:
+        session.cache.clear()
+        store.clear()
+    fetcher = get_fetcher(session, args, store)
 
+    # Запускаем парсер - передаем в него режимы работы.
+    if args.queue is None:
+        run_modes(session, fetcher, args)
+    else:
+        run_distributed(session, fetcher, args)
 
-MODE_TO_FUNCTION = {
-    'whats-new': whats_new,
-    'latest-versions': latest_versions,
-    'download': download,
-    'pep': pep,
-}
+    if args.cache_max_size is not None:
+        compact_cache(session.cache, get_cache_max_size(args))
 
 
 def main():
@@ -168,20 +615,27 @@ def main():
     logging.info('Парсинг запущен!')
 
     # Получение режима работы парсера из ввода в консоль.
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser(get_parsers().keys())
     args = arg_parser.parse_args()
+    if args.query and args.mode != ['pep']:
+        arg_parser.error('--query работает только в одном режиме pep')
+    if args.worker and args.queue is None:
+        arg_parser.error('--worker работает только с --queue')
+    if args.worker and not set(args.mode) <= set(MODE_TO_EXTRACTOR):
+        arg_parser.error(
+            f'Воркер выполняет только режимы {", ".join(MODE_TO_EXTRACTOR)}'
+        )
 
-    # Создаем кэширующуюся сессию.
-    session = CachedSession()
-    if args.clear_cache:
-        session.cache.clear()
-
-    # Запускаем парсер - передаем в него режим работы.
-    parse_mode = args.mode
-    results = MODE_TO_FUNCTION[parse_mode](session)
+    # Выборка из индекса PEP не обращается к сети, поэтому сессия
+    # и ее зависимости не создаются.
+    if args.query:
+        control_output(query_pep_index(args), args)
+    else:
+        run_parser(args)
 
-    if results is not None:
-        control_output(results, args)
+    logging.info(METRICS.summary())
+    if args.metrics is not None:
+        METRICS.dump(args.metrics)
 
     # Логирование завершения работы парсера.
     logging.info('Парсинг завершен!')
@@ -0,0 +1,121 @@
+"""
+Память разобранных страниц и ссылок в пределах процесса.
+
+Ограниченные LRU-кэши деревьев BeautifulSoup и извлеченных полей по
+нормализованному URL и хэшу содержимого: страница, полученная
+несколько раз за время жизни процесса (несколько режимов за один
+запуск, повторные запуски `Scraper`), разбирается один раз. Деревья
+и поля общие для всех потребителей, изменять их нельзя. Попадания и
+промахи каждого кэша учитываются в метриках.
+"""
+from collections import OrderedDict
+from functools import lru_cache
+import threading
+from typing import Callable, Hashable, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from constants import RECORD_CACHE_SIZE, SOUP_CACHE_SIZE, URL_CACHE_SIZE
+from metrics import METRICS
+
+
+class LRUCache:
+    """
+    Потокобезопасный кэш на `maxsize` записей.
+
+    При переполнении вытесняется запись, к которой дольше всего не
+     обращались; `maxsize` 0 отключает кэш.
+    """
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+        if self.maxsize:
+            METRICS.record_memo(self.name, value is not None)
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        with self.lock:
+            if not self.maxsize:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            self.evict()
+
+    def resize(self, maxsize: int) -> None:
+        with self.lock:
+            self.maxsize = maxsize
+            self.evict()
+
+    def evict(self) -> None:
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+SOUP_CACHE = LRUCache('soup', SOUP_CACHE_SIZE)
+RECORD_CACHE = LRUCache('record', RECORD_CACHE_SIZE)
+URL_CACHE = LRUCache('urljoin', URL_CACHE_SIZE)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def normalize_url(url: str) -> str:
+    """URL без фрагмента, схема и хост - в нижнем регистре."""
+    parts = urlsplit(url)
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or '/',
+        parts.query,
+        '',
+    ))
+
+
+def join_url(base: str, url: str) -> str:
+    """Запоминающий вариант `urljoin`."""
+    joined = URL_CACHE.get((base, url))
+    if joined is None:
+        joined = urljoin(base, url)
+        URL_CACHE.put((base, url), joined)
+    return joined
+
+
+def get_page_key(url: str, *parts: Optional[str]) -> tuple:
+    """Ключ страницы: нормализованный URL и, например, хэш содержимого."""
+    return (normalize_url(url), *parts)
+
+
+def get_extractor_name(extract: Callable) -> str:
+    """
+    Имя функции извлечения с версией набора ее полей.
+
+    Поля, извлеченные прежней версией функции, хранятся под другим
+     именем и не выдаются за результат текущей.
+    """
+    return f'{extract.__name__}:{getattr(extract, "schema", 1)}'
+
+
+def clear_memo() -> None:
+    for cache in (SOUP_CACHE, RECORD_CACHE, URL_CACHE):
+        cache.clear()
+
+
+def configure_memo(
+    soup_size: int = SOUP_CACHE_SIZE, record_size: int = RECORD_CACHE_SIZE
+) -> None:
+    """Размеры кэшей деревьев и полей страниц, 0 отключает кэш."""
+    SOUP_CACHE.resize(soup_size)
+    RECORD_CACHE.resize(record_size)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from functools import wraps
+import json
+from pathlib import Path
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from requests import Response
+
+# Верхние границы корзин гистограммы задержек, в секундах.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, float('inf'))
+
+
+class Metrics:
+    """
+    Счетчики этапов работы парсера.
+
+    Для каждого этапа хранится количество вызовов, суммарное и
+     максимальное время и гистограмма задержек. Отдельно считаются
+     загруженные из сети байты, попадания/промахи кэша и кэшей
+     разобранных страниц в памяти.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stages = {}
+            self.bytes = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.memo = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            stats = self.stages.setdefault(stage, {
+                'count': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'histogram': [0] * len(LATENCY_BUCKETS),
+            })
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats['histogram'][index] += 1
+                    break
+
+    def add_bytes(self, size: int) -> None:
+        with self.lock:
+            self.bytes += size
+
+    def record_response(self, response: Response, seconds: float) -> None:
+        """Запрос учитывается как этап `cache` или `network`."""
+        if getattr(response, 'from_cache', False):
+            self.observe('cache', seconds)
+            with self.lock:
+                self.cache_hits += 1
+            return
+        self.observe('network', seconds)
+        with self.lock:
+            self.cache_misses += 1
+        # У потоковых ответов тело еще не прочитано.
+        if response._content_consumed:
+            self.add_bytes(len(response.content))
+
+    def record_memo(self, name: str, hit: bool) -> None:
+        """Попадание или промах кэша `name` в памяти процесса."""
+        with self.lock:
+            stats = self.memo.setdefault(name, [0, 0])
+            stats[0 if hit else 1] += 1
+
+    def timed(self, stage: str) -> Callable:
+        """Декоратор, замеряющий время вызовов функции как этап `stage`."""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            requests_count = self.cache_hits + self.cache_misses
+            return {
+                'stages': {
+                    stage: {
+                        **stats,
+                        'histogram': dict(zip(
+                            map(str, LATENCY_BUCKETS), stats['histogram']
+                        )),
+                    }
+                    for stage, stats in self.stages.items()
+                },
+                'bytes': self.bytes,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'cache_hit_ratio': (
+                    self.cache_hits / requests_count if requests_count else 0
+                ),
+                'memo': {
+                    name: {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_ratio': hits / (hits + misses),
+                    }
+                    for name, (hits, misses) in self.memo.items()
+                },
+            }
+
+    def summary(self) -> str:
+        data = self.as_dict()
+        lines = ['Метрики:']
+        for stage, stats in data['stages'].items():
+            lines.append(
+                f'{stage}: {stats["count"]} вызовов, '
+                f'всего {stats["total"]:.3f} с, '
+                f'среднее {stats["total"] / stats["count"] * 1000:.2f} мс, '
+                f'макс {stats["max"] * 1000:.2f} мс'
+            )
+        lines.append(
+            f'Кэш: {data["cache_hits"]} попаданий, '
+            f'{data["cache_misses"]} промахов '
+            f'({data["cache_hit_ratio"]:.1%})'
+        )
+        for name, stats in data['memo'].items():
+            lines.append(
+                f'Память {name}: {stats["hits"]} попаданий, '
+                f'{stats["misses"]} промахов ({stats["hit_ratio"]:.1%})'
+            )
+        lines.append(f'Загружено из сети: {data["bytes"]} байт')
+        return '\n'.join(lines)
+
+    def dump(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.as_dict(), file, ensure_ascii=False, indent=2)
+
+
+METRICS = Metrics()
+timed = METRICS.timed
@@ -1,53 +1,217 @@
 from argparse import Namespace
 import csv
 import datetime as dt
+from itertools import islice
+import json
 import logging
+from pathlib import Path
+import time
+from typing import Iterable, Iterator
 
-from prettytable import PrettyTable
+from constants import (
+    BASE_DIR, DATETIME_FORMAT, FEATHER, FILE, JSONL, PARQUET, PEP_MISMATCHES,
+    PEP_QUERY, PRETTY
+)
+from exceptions import MissingDependencyError
+from metrics import METRICS
 
-from constants import BASE_DIR, DATETIME_FORMAT, FILE, PRETTY
+# Имена и типы Arrow столбцов результатов каждого режима
+# для машиночитаемых форматов вывода.
+COLUMNS = {
+    'whats-new': (('url', 'string'), ('title', 'string'),
+                  ('editors', 'string')),
+    'latest-versions': (('url', 'string'), ('version', 'string'),
+                        ('status', 'string')),
+    'pep': (('status', 'string'), ('count', 'int64')),
+    PEP_QUERY: (('number', 'int64'), ('title', 'string'),
+                ('type', 'string'), ('status', 'string'),
+                ('authors', 'string'), ('created', 'string'),
+                ('url', 'string')),
+    PEP_MISMATCHES: (('number', 'int64'), ('url', 'string'),
+                     ('status', 'string'), ('expected', 'string'),
+                     ('index_status', 'string')),
+}
+# Количество строк в одной группе строк Parquet / пакете Feather.
+BATCH_SIZE = 10000
 
 
-def control_output(results: list[tuple], cli_args: Namespace) -> None:
-    """Контролер вывода результатов парсинга."""
+class TimedRows:
+    """Итератор строк результатов, считающий время их получения."""
+
+    def __init__(self, results: Iterable[tuple]) -> None:
+        self.rows = iter(results)
+        self.seconds = 0.0
+
+    def __iter__(self) -> 'TimedRows':
+        return self
+
+    def __next__(self) -> tuple:
+        start = time.perf_counter()
+        try:
+            return next(self.rows)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def control_output(results: Iterable[tuple], cli_args: Namespace) -> None:
+    """
+    Контролер вывода результатов парсинга.
+
+    Строки выводятся по мере поступления от парсера, копит их только
+     вывод в таблицу PrettyTable. Парсеры - генераторы, поэтому время
+     получения строк от парсера вычитается из этапа `control_output`,
+     в нем остается только запись.
+    """
+    rows = TimedRows(results)
+    start = time.perf_counter()
+    try:
+        write_output(rows, cli_args)
+    finally:
+        METRICS.observe(
+            'control_output', time.perf_counter() - start - rows.seconds
+        )
+
+
+def write_output(results: Iterable[tuple], cli_args: Namespace) -> None:
     output = cli_args.output
 
     if output == PRETTY:
         pretty_output(results)
     elif output == FILE:
         file_output(results, cli_args)
+    elif output == JSONL:
+        jsonl_output(results, cli_args)
+    elif output in (PARQUET, FEATHER):
+        arrow_output(results, cli_args)
     else:
         default_output(results)
 
 
-def pretty_output(results: list[tuple]) -> None:
+def pretty_output(results: Iterable[tuple]) -> None:
     """Вывод данных в терминал в формате PrettyTable."""
+    from prettytable import PrettyTable
+
+    rows = iter(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = next(rows)
     table.align = 'l'
-    table.add_rows(results[1:])
+    for row in rows:
+        table.add_row(row)
     print(table)
 
 
-def default_output(results: list[tuple]) -> None:
+def default_output(results: Iterable[tuple]) -> None:
     """Вывод данных в терминал, построчно."""
     for row in results:
-        print(*row)
+        print(*row, flush=True)
+
 
+def get_results_name(cli_args: Namespace) -> str:
+    """Имя результатов: режим парсера или выборка из индекса PEP."""
+    if getattr(cli_args, 'query', False):
+        return PEP_QUERY
+    return cli_args.mode
 
-def file_output(results: list[tuple], cli_args: Namespace) -> None:
-    """Вывод данных в файл."""
+
+def get_file_path(cli_args: Namespace, extension: str) -> Path:
+    """Путь к файлу результатов: <режим>_<дата>.<расширение>."""
     results_dir = BASE_DIR / 'results'
     results_dir.mkdir(exist_ok=True)
 
-    parser_mode = cli_args.mode
+    parser_mode = get_results_name(cli_args)
     now = dt.datetime.now()
     now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = results_dir / file_name
+    return results_dir / f'{parser_mode}_{now_formatted}.{extension}'
+
+
+def get_columns(cli_args: Namespace, header: tuple) -> tuple:
+    """Столбцы режима; для неизвестных режимов - строки с именами шапки."""
+    return COLUMNS.get(
+        get_results_name(cli_args),
+        tuple((name, 'string') for name in header)
+    )
 
-    with open(file_path, 'w', encoding='utf-8') as file:
-        writer = csv.writer(file, dialect='unix')
-        writer.writerows(results)
 
-    logging.info(f'Файл с результатами сохранен в: {file_path}')
+def file_output(results: Iterable[tuple], cli_args: Namespace) -> None:
+    """
+    Вывод данных в файл.
+
+    Каждая строка сразу сбрасывается на диск, поэтому при прерванном
+     парсинге в файле остаются уже полученные строки.
+    """
+    file_path = get_file_path(cli_args, 'csv')
+    try:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            writer = csv.writer(file, dialect='unix')
+            for row in results:
+                writer.writerow(row)
+                file.flush()
+    finally:
+        logging.info(f'Файл с результатами сохранен в: {file_path}')
+
+
+def jsonl_output(results: Iterable[tuple], cli_args: Namespace) -> None:
+    """
+    Вывод данных в файл JSON Lines: по объекту на строку результатов.
+
+    Шапка таблицы не пишется, ключи объектов - имена из `COLUMNS`.
+    """
+    rows = iter(results)
+    names = [name for name, _ in get_columns(cli_args, next(rows))]
+    file_path = get_file_path(cli_args, 'jsonl')
+    try:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            for row in rows:
+                file.write(
+                    json.dumps(dict(zip(names, row)), ensure_ascii=False)
+                )
+                file.write('\n')
+                file.flush()
+    finally:
+        logging.info(f'Файл с результатами сохранен в: {file_path}')
+
+
+def import_pyarrow():
+    """Ленивый импорт необязательной зависимости pyarrow."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise MissingDependencyError(
+            'Для вывода в parquet и feather установите pyarrow: '
+            'pip install pyarrow'
+        ) from error
+    return pyarrow
+
+
+def iter_batches(rows: Iterator[tuple], size: int) -> Iterator[list]:
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def arrow_output(results: Iterable[tuple], cli_args: Namespace) -> None:
+    """
+    Вывод данных в колоночный файл Parquet или Feather (Arrow IPC).
+
+    Столбцы типизированы по `COLUMNS`, строки пишутся пакетами по
+     `BATCH_SIZE`, поэтому в памяти не накапливаются все результаты.
+    """
+    pa = import_pyarrow()
+    rows = iter(results)
+    schema = pa.schema([
+        (name, pa.type_for_alias(type_name))
+        for name, type_name in get_columns(cli_args, next(rows))
+    ])
+    file_path = get_file_path(cli_args, cli_args.output)
+    if cli_args.output == PARQUET:
+        writer = pa.parquet.ParquetWriter(file_path, schema)
+    else:
+        writer = pa.ipc.new_file(file_path, schema)
+    try:
+        with writer:
+            for batch in iter_batches(rows, BATCH_SIZE):
+                columns = [list(column) for column in zip(*batch)]
+                writer.write_batch(pa.record_batch(columns, schema=schema))
+    finally:
+        logging.info(f'Файл с результатами сохранен в: {file_path}')
@@ -0,0 +1,150 @@
+"""
+Программный интерфейс парсера и реестр режимов.
+
+Режим (парсер) - функция `(session, fetcher, **options)`, которая
+отдает строки результатов, первая строка - заголовок, или возвращает
+None. Режимы регистрируются по имени функцией `register_parser`,
+встроенные режимы регистрирует модуль main. `Scraper` держит сессию,
+загрузчик и способ вывода между запусками, поэтому долгоживущий
+процесс не создает их заново для каждого режима.
+"""
+from __future__ import annotations
+
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from configs import configure_fetcher, configure_session
+from constants import PRETTY
+from outputs import COLUMNS, control_output
+
+if TYPE_CHECKING:
+    from requests_cache import CachedSession
+
+    from fetchers import Fetcher
+
+Parser = Callable[..., Optional[Iterable[tuple]]]
+
+# Зарегистрированные режимы по имени.
+PARSERS: dict[str, Parser] = {}
+# Модуль, при импорте которого регистрируются встроенные режимы.
+BUILTIN_PARSERS_MODULE = 'main'
+
+
+def register_parser(
+    name: str,
+    parser: Optional[Parser] = None,
+    columns: Optional[tuple] = None,
+):
+    """
+    Регистрация режима `name`, можно использовать как декоратор.
+
+    `columns` - имена и типы Arrow столбцов результатов для
+     машиночитаемых форматов вывода, по умолчанию - строки с именами
+     заголовка. Повторная регистрация заменяет режим.
+    """
+    def decorator(parser: Parser) -> Parser:
+        PARSERS[name] = parser
+        if columns is not None:
+            COLUMNS[name] = columns
+        return parser
+
+    return decorator if parser is None else decorator(parser)
+
+
+def get_parsers() -> dict[str, Parser]:
+    """Все зарегистрированные режимы, включая встроенные.
+
+    Модуль встроенных режимов импортируется при каждом вызове: реестр
+    может быть непуст и без них, если свой режим зарегистрирован раньше,
+    а повторный импорт берет модуль из sys.modules.
+    """
+    importlib.import_module(BUILTIN_PARSERS_MODULE)
+    return PARSERS
+
+
+def get_parser(name: str) -> Parser:
+    parsers = get_parsers()
+    if name not in parsers:
+        raise ValueError(
+            f'Режим {name} не зарегистрирован, доступны: {list(parsers)}'
+        )
+    return parsers[name]
+
+
+class Scraper:
+    """
+    Парсер с общими сессией, загрузчиком и способом вывода.
+
+    Без `session` создается кэширующаяся сессия, без `fetcher` -
+     синхронный загрузчик. `output` - способ вывода результатов, как
+     у аргумента командной строки `-o`.
+    """
+
+    def __init__(
+        self,
+        session: Optional[CachedSession] = None,
+        fetcher: Optional[Fetcher] = None,
+        output: Optional[str] = None,
+    ) -> None:
+        self.session = session if session is not None else (
+            configure_session()
+        )
+        self.fetcher = fetcher or configure_fetcher(self.session)
+        self.output = output
+
+    def results(self, mode: str, **options) -> Optional[Iterable[tuple]]:
+        """Результаты режима `mode` без вывода."""
+        return get_parser(mode)(self.session, self.fetcher, **options)
+
+    def run(self, mode: str, **options) -> None:
+        """Запуск режима и вывод его результатов."""
+        results = self.results(mode, **options)
+        if results is not None:
+            control_output(results, self.get_output_args(mode))
+
+    def run_many(self, modes: dict[str, dict]) -> None:
+        """
+        Одновременный запуск нескольких режимов с параметрами `modes`.
+
+        Каждый режим выполняется в своем потоке, поэтому общее время
+         близко ко времени самого долгого режима. Результаты для вывода
+         в терминал копятся и выводятся в порядке `modes`, чтобы строки
+         разных режимов не перемешались, в файлы пишутся сразу.
+        """
+        if len(modes) == 1:
+            for mode, options in modes.items():
+                self.run(mode, **options)
+            return
+        with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+            futures = {
+                mode: executor.submit(self.collect, mode, **options)
+                for mode, options in modes.items()
+            }
+            for mode, future in futures.items():
+                results = future.result()
+                if results is not None:
+                    control_output(results, self.get_output_args(mode))
+
+    def collect(self, mode: str, **options) -> Optional[list[tuple]]:
+        """Запуск режима, результаты для терминала возвращаются списком."""
+        if self.output not in (None, PRETTY):
+            self.run(mode, **options)
+            return None
+        results = self.results(mode, **options)
+        return None if results is None else list(results)
+
+    def get_output_args(self, mode: str) -> Namespace:
+        return Namespace(mode=mode, output=self.output)
+
+    def close(self) -> None:
+        if self.fetcher.store is not None:
+            self.fetcher.store.save()
+        self.session.close()
+
+    def __enter__(self) -> Scraper:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
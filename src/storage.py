@@ -0,0 +1,632 @@
+from contextlib import contextmanager
+from functools import partial
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Union
+
+from constants import LEASE_ATTEMPTS
+
+
+class PageStore:
+    """
+    Хранилище извлеченных со страниц данных.
+
+    Для каждой пары (URL, функция извлечения) хранится хэш содержимого
+     страницы и извлеченные поля. Пока хэш не изменился, поля берутся из
+     хранилища без разбора страницы. Все записи загружаются в словарь
+     при открытии, новые сохраняются в sqlite методом `save`. Одно
+     хранилище можно использовать из нескольких потоков.
+    """
+
+    def __init__(self, path: Union[Path, str] = ':memory:') -> None:
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'url TEXT, extractor TEXT, digest TEXT, fields TEXT, '
+            'PRIMARY KEY (url, extractor))'
+        )
+        self.pages = {
+            (url, extractor): (digest, json.loads(fields))
+            for url, extractor, digest, fields in self.connection.execute(
+                'SELECT url, extractor, digest, fields FROM pages'
+            )
+        }
+        self.changed = set()
+        self.lock = threading.Lock()
+
+    def get(self, url: str, extractor: str, digest: str) -> Optional[dict]:
+        """Поля страницы, если ее содержимое не изменилось."""
+        stored = self.pages.get((url, extractor))
+        if stored is None or stored[0] != digest:
+            return None
+        return stored[1]
+
+    def put(self, url: str, extractor: str, digest: str, fields: dict):
+        with self.lock:
+            self.pages[(url, extractor)] = (digest, fields)
+            self.changed.add((url, extractor))
+
+    def save(self) -> None:
+        with self.lock:
+            rows = []
+            for url, extractor in self.changed:
+                digest, fields = self.pages[(url, extractor)]
+                rows.append((url, extractor, digest, json.dumps(fields)))
+            with self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)', rows
+                )
+            self.changed.clear()
+
+    def clear(self) -> None:
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM pages')
+            self.pages.clear()
+            self.changed.clear()
+
+
+class PepIndex:
+    """
+    Локальный индекс PEP.
+
+    Режим pep сохраняет в индекс номер, заголовок, тип, статусы из
+     общего списка и со страницы, авторов, дату создания, ссылку и хэш
+     содержимого каждого PEP. Выборки по статусу и типу идут по
+     индексам sqlite и не требуют загрузки страниц. Для быстрого
+     режима pep рядом хранятся хэши записей списка peps.json
+     прошлого запуска.
+    """
+
+    COLUMNS = (
+        'number', 'title', 'type', 'status', 'index_status', 'authors',
+        'created', 'url', 'digest'
+    )
+    HEADER = (
+        'PEP', 'Заголовок', 'Тип', 'Статус', 'Авторы', 'Создан', 'Ссылка'
+    )
+
+    def __init__(self, path: Union[Path, str] = ':memory:') -> None:
+        # Индекс открывается до запуска режима, а заполняется в его потоке.
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS peps ('
+                'number INTEGER PRIMARY KEY, title TEXT, type TEXT, '
+                'status TEXT, index_status TEXT, authors TEXT, '
+                'created TEXT, url TEXT, digest TEXT)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS peps_status ON peps (status)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS peps_type ON peps (type)'
+            )
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS listing ('
+                'number INTEGER PRIMARY KEY, digest TEXT)'
+            )
+        self.changed = []
+        self.listing = []
+
+    def put(self, record: dict) -> None:
+        self.changed.append(
+            tuple(record.get(column) for column in self.COLUMNS)
+        )
+
+    def put_listing(self, number: int, digest: str) -> None:
+        self.listing.append((number, digest))
+
+    def save(self) -> None:
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT OR REPLACE INTO peps ({", ".join(self.COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(self.COLUMNS))})',
+                self.changed
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO listing (number, digest) '
+                'VALUES (?, ?)',
+                self.listing
+            )
+        self.changed.clear()
+        self.listing.clear()
+
+    def get_unchanged(self, digests: dict[int, str]) -> dict[int, dict]:
+        """
+        Записи PEP, чей хэш в списке peps.json совпадает с `digests`.
+
+        Ключ - номер PEP, значение - запись с полями `COLUMNS`.
+        """
+        columns = ', '.join(f'peps.{column}' for column in self.COLUMNS)
+        rows = self.connection.execute(
+            f'SELECT listing.digest, {columns} '
+            'FROM peps JOIN listing USING (number)'
+        )
+        return {
+            row[1]: dict(zip(self.COLUMNS, row[1:]))
+            for row in rows if digests.get(row[1]) == row[0]
+        }
+
+    def query(
+        self,
+        statuses: Optional[list[str]] = None,
+        pep_type: Optional[str] = None,
+    ) -> list[tuple]:
+        """PEP с одним из статусов `statuses` и типом `pep_type`."""
+        conditions, params = [], []
+        if statuses:
+            conditions.append(
+                f'status IN ({", ".join("?" * len(statuses))})'
+            )
+            params.extend(statuses)
+        if pep_type is not None:
+            conditions.append('type = ?')
+            params.append(pep_type)
+        where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+        rows = self.connection.execute(
+            'SELECT number, title, type, status, authors, created, url '
+            f'FROM peps {where}ORDER BY number',
+            params
+        )
+        return [self.HEADER, *rows]
+
+
+class Checkpoint:
+    """
+    Контрольная точка обхода в JSON-файле.
+
+    Файл перезаписывается атомарно через временный файл, поэтому
+     прерванная запись не портит предыдущую контрольную точку.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+
+    def load(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text(encoding='utf-8'))
+
+    def save(self, state: dict) -> None:
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        temp_path.write_text(json.dumps(state), encoding='utf-8')
+        os.replace(temp_path, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class WorkQueue:
+    """
+    Очередь заданий распределенного обхода в sqlite.
+
+    Задание - URL страницы и имя функции извлечения. Координатор
+     кладет задания в очередь и забирает результаты, воркеры берут
+     задания в аренду и возвращают извлеченные поля. Задание, аренда
+     которого истекла (воркер упал или завис), снова выдается в аренду,
+     но не больше `attempts` раз, затем считается неудачным.
+    Очередь в sqlite - только для процессов одной машины: блокировки
+     sqlite ненадежны на сетевых файловых системах (NFS, SMB), для
+     нескольких машин нужна `RedisWorkQueue`. Каждый процесс открывает
+     очередь своим соединением; внутри процесса одно соединение можно
+     использовать из нескольких потоков.
+    """
+
+    PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+    def __init__(
+        self, path: Union[Path, str], attempts: int = LEASE_ATTEMPTS
+    ) -> None:
+        self.attempts = attempts
+        # Транзакции открываются явно: аренда должна блокировать базу
+        # для других процессов с момента выборки заданий.
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.lock = threading.Lock()
+        with self.transaction() as connection:
+            connection.execute(
+                # Номера заданий не повторяются и в новых обходах: результат
+                # воркера, опоздавшего к прошлому обходу, не попадет
+                # в чужое задание.
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, '
+                'extractor TEXT, '
+                'state TEXT, worker TEXT, leased_until REAL, '
+                'attempts INTEGER DEFAULT 0, fields TEXT)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS meta ('
+                'key TEXT PRIMARY KEY, value TEXT)'
+            )
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+
+    def open(self) -> None:
+        """
+        Новый обход: старые задания удаляются, воркеры ждут заданий.
+
+        У каждого обхода свой номер, поэтому закрытие прошлого обхода не
+         завершает воркеры, запущенные до начала нового.
+        """
+        with self.transaction() as connection:
+            run, _ = self._get_state(connection)
+            connection.execute('DELETE FROM jobs')
+            connection.executemany(
+                'INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                (('run', str(run + 1)), ('closed', '0'))
+            )
+
+    def close(self) -> None:
+        """Обход окончен: воркеры завершаются."""
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('closed', '1')"
+            )
+
+    @staticmethod
+    def _get_state(connection: sqlite3.Connection) -> tuple[int, bool]:
+        meta = dict(connection.execute('SELECT key, value FROM meta'))
+        return int(meta.get('run', 0)), meta.get('closed') == '1'
+
+    def get_state(self) -> tuple[int, bool]:
+        """Номер последнего обхода и закрыт ли он."""
+        with self.lock:
+            return self._get_state(self.connection)
+
+    def is_closed(self) -> bool:
+        return self.get_state()[1]
+
+    def put_many(self, urls: Iterable[str], extractor: str) -> list[int]:
+        """Задания для `urls`, номера заданий - в порядке `urls`."""
+        with self.transaction() as connection:
+            last_id, = connection.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence "
+                "WHERE name = 'jobs'"
+            ).fetchone()
+            count = connection.executemany(
+                'INSERT INTO jobs (url, extractor, state) VALUES (?, ?, ?)',
+                ((url, extractor, self.PENDING) for url in urls)
+            ).rowcount
+        return list(range(last_id + 1, last_id + count + 1))
+
+    def _expire_leases(self, connection: sqlite3.Connection, now: float):
+        connection.execute(
+            'UPDATE jobs SET state = ?, worker = NULL '
+            'WHERE state = ? AND leased_until < ? AND attempts >= ?',
+            (self.FAILED, self.LEASED, now, self.attempts)
+        )
+
+    def expire_leases(self) -> None:
+        """Задания с истекшей последней арендой считаются неудачными."""
+        with self.transaction() as connection:
+            self._expire_leases(connection, time.time())
+
+    def lease(
+        self,
+        worker: str,
+        extractors: list[str],
+        limit: int,
+        lease_timeout: float,
+    ) -> list[tuple]:
+        """
+        Не больше `limit` заданий с функциями `extractors` в аренду.
+
+        Возвращает номер, URL и имя функции извлечения каждого задания.
+        """
+        now = time.time()
+        names = ', '.join('?' * len(extractors))
+        with self.transaction() as connection:
+            self._expire_leases(connection, now)
+            jobs = connection.execute(
+                'SELECT id, url, extractor FROM jobs '
+                'WHERE (state = ? OR (state = ? AND leased_until < ?)) '
+                f'AND extractor IN ({names}) ORDER BY id LIMIT ?',
+                (self.PENDING, self.LEASED, now, *extractors, limit)
+            ).fetchall()
+            connection.executemany(
+                'UPDATE jobs SET state = ?, worker = ?, leased_until = ?, '
+                'attempts = attempts + 1 WHERE id = ?',
+                (
+                    (self.LEASED, worker, now + lease_timeout, job_id)
+                    for job_id, _, _ in jobs
+                )
+            )
+        return jobs
+
+    def complete(self, results: Iterable[tuple[int, Optional[dict]]]):
+        """
+        Результаты заданий: номер и поля, None - страница не загружена.
+
+        Засчитывается первый результат задания, даже если его аренда
+         уже истекла.
+        """
+        with self.transaction() as connection:
+            connection.executemany(
+                'UPDATE jobs SET state = ?, fields = ?, worker = NULL '
+                'WHERE id = ? AND state != ?',
+                (
+                    (
+                        self.FAILED if fields is None else self.DONE,
+                        json.dumps(fields),
+                        job_id,
+                        self.DONE,
+                    )
+                    for job_id, fields in results
+                )
+            )
+
+    def release(self, job_ids: Iterable[int]) -> None:
+        """Возврат невыполненных заданий в очередь без учета попытки."""
+        with self.transaction() as connection:
+            connection.executemany(
+                'UPDATE jobs SET state = ?, worker = NULL, '
+                'attempts = attempts - 1 WHERE id = ? AND state = ?',
+                ((self.PENDING, job_id, self.LEASED) for job_id in job_ids)
+            )
+
+    def take_finished(
+        self, first_id: int, last_id: int
+    ) -> dict[int, Optional[dict]]:
+        """Выполненные и неудачные задания из диапазона, они удаляются."""
+        with self.transaction() as connection:
+            rows = connection.execute(
+                'SELECT id, fields FROM jobs WHERE id BETWEEN ? AND ? '
+                'AND state IN (?, ?)',
+                (first_id, last_id, self.DONE, self.FAILED)
+            ).fetchall()
+            connection.executemany(
+                'DELETE FROM jobs WHERE id = ?',
+                ((job_id,) for job_id, _ in rows)
+            )
+        return {
+            job_id: json.loads(fields) if fields else None
+            for job_id, fields in rows
+        }
+
+    def cancel(self, first_id: int, last_id: int) -> None:
+        with self.transaction() as connection:
+            connection.execute(
+                'DELETE FROM jobs WHERE id BETWEEN ? AND ?',
+                (first_id, last_id)
+            )
+
+
+class RedisWorkQueue:
+    """
+    Очередь заданий распределенного обхода в redis.
+
+    Тот же интерфейс, что у `WorkQueue`, но координатор и воркеры могут
+     работать на разных машинах, подключаясь к общему redis-совместимому
+     серверу. Ключи очереди начинаются с `prefix`. Задание переходит
+     между списком ожидающих и арендами одной транзакцией MULTI/EXEC:
+     ключи, прочитанные перед ней, отслеживаются WATCH, и при их
+     изменении другим клиентом транзакция повторяется. Задание не
+     теряется, если клиент упал на полпути, и не достается двум
+     воркерам; результат записывает первый HSETNX.
+    """
+
+    def __init__(
+        self,
+        connection,
+        prefix: str = 'bs4-parser-queue',
+        attempts: int = LEASE_ATTEMPTS,
+    ) -> None:
+        self.redis = connection
+        self.prefix = prefix
+        self.attempts = attempts
+
+    def key(self, *parts) -> str:
+        return ':'.join((self.prefix, *map(str, parts)))
+
+    def open(self) -> None:
+        """Новый обход: старые задания удаляются, воркеры ждут заданий."""
+        state = self.key('state')
+        # Номера заданий не сбрасываются, как и в `WorkQueue`.
+        kept = {state, self.key('last_id')}
+        keys = [
+            key for key in self.redis.scan_iter(match=self.key('*'))
+            if key.decode() not in kept
+        ]
+        if keys:
+            self.redis.delete(*keys)
+        self.redis.hincrby(state, 'run', 1)
+        self.redis.hset(state, 'closed', 0)
+
+    def close(self) -> None:
+        self.redis.hset(self.key('state'), 'closed', 1)
+
+    def get_state(self) -> tuple[int, bool]:
+        run, closed = self.redis.hmget(self.key('state'), 'run', 'closed')
+        return int(run or 0), closed == b'1'
+
+    def is_closed(self) -> bool:
+        return self.get_state()[1]
+
+    def put_many(self, urls: Iterable[str], extractor: str) -> list[int]:
+        urls = list(urls)
+        if not urls:
+            return []
+        last_id = self.redis.incrby(self.key('last_id'), len(urls))
+        job_ids = list(range(last_id - len(urls) + 1, last_id + 1))
+        pipeline = self.redis.pipeline()
+        for job_id, url in zip(job_ids, urls):
+            pipeline.hset(
+                self.key('job', job_id),
+                mapping={'url': url, 'extractor': extractor, 'attempts': 0},
+            )
+        pipeline.rpush(self.key('pending', extractor), *job_ids)
+        pipeline.execute()
+        return job_ids
+
+    def expire_leases(self) -> None:
+        """
+        Задания с истекшей арендой возвращаются в очередь.
+
+        Задание, выданное `attempts` раз, считается неудачным.
+        """
+        leases = self.key('leases')
+
+        def expire(pipeline) -> None:
+            job_ids = [
+                int(job_id)
+                for job_id in pipeline.zrangebyscore(leases, 0, time.time())
+            ]
+            jobs = [
+                pipeline.hmget(
+                    self.key('job', job_id), 'attempts', 'extractor'
+                )
+                for job_id in job_ids
+            ]
+            pipeline.multi()
+            if not job_ids:
+                return
+            pipeline.zrem(leases, *job_ids)
+            for job_id, (attempts, extractor) in zip(job_ids, jobs):
+                if extractor is None:
+                    continue
+                if int(attempts) >= self.attempts:
+                    pipeline.hsetnx(self.key('finished'), job_id, 'null')
+                else:
+                    pipeline.lpush(
+                        self.key('pending', extractor.decode()), job_id
+                    )
+
+        self.redis.transaction(expire, leases)
+
+    def lease(
+        self,
+        worker: str,
+        extractors: list[str],
+        limit: int,
+        lease_timeout: float,
+    ) -> list[tuple]:
+        self.expire_leases()
+        jobs = []
+        for extractor in extractors:
+            pending = self.key('pending', extractor)
+            while len(jobs) < limit:
+                taken, leased = self.redis.transaction(
+                    partial(
+                        self._lease_pending,
+                        pending,
+                        extractor,
+                        limit - len(jobs),
+                        lease_timeout,
+                    ),
+                    pending,
+                    value_from_callable=True,
+                )
+                if not taken:
+                    break
+                jobs.extend(leased)
+        return jobs
+
+    def _lease_pending(
+        self,
+        pending: str,
+        extractor: str,
+        limit: int,
+        lease_timeout: float,
+        pipeline,
+    ) -> tuple[int, list[tuple]]:
+        """
+        Аренда до `limit` первых заданий списка `pending` в транзакции.
+
+        Возвращает, сколько заданий снято со списка, и арендованные из
+         них: отмененные и уже выполненные задания пропускаются.
+        """
+        job_ids = pipeline.lrange(pending, 0, limit - 1)
+        jobs = [self.key('job', int(job_id)) for job_id in job_ids]
+        if jobs:
+            pipeline.watch(*jobs)
+            finished = pipeline.hmget(self.key('finished'), job_ids)
+        else:
+            finished = []
+        urls = [pipeline.hget(job, 'url') for job in jobs]
+        pipeline.multi()
+        pipeline.ltrim(pending, len(job_ids), -1)
+        deadline = time.time() + lease_timeout
+        leased = []
+        for job_id, job, url, done in zip(job_ids, jobs, urls, finished):
+            if url is None or done is not None:
+                continue
+            pipeline.hincrby(job, 'attempts', 1)
+            pipeline.zadd(self.key('leases'), {int(job_id): deadline})
+            leased.append((int(job_id), url.decode(), extractor))
+        return len(job_ids), leased
+
+    def complete(self, results: Iterable[tuple[int, Optional[dict]]]):
+        pipeline = self.redis.pipeline()
+        for job_id, fields in results:
+            pipeline.hsetnx(self.key('finished'), job_id, json.dumps(fields))
+            pipeline.zrem(self.key('leases'), job_id)
+        pipeline.execute()
+
+    def release(self, job_ids: Iterable[int]) -> None:
+        job_ids = list(job_ids)
+        leases = self.key('leases')
+
+        def requeue(pipeline) -> None:
+            leased = [
+                job_id for job_id in job_ids
+                if pipeline.zscore(leases, job_id) is not None
+            ]
+            extractors = [
+                pipeline.hget(self.key('job', job_id), 'extractor')
+                for job_id in leased
+            ]
+            pipeline.multi()
+            for job_id, extractor in zip(leased, extractors):
+                pipeline.zrem(leases, job_id)
+                if extractor is None:
+                    continue
+                pipeline.hincrby(self.key('job', job_id), 'attempts', -1)
+                pipeline.lpush(
+                    self.key('pending', extractor.decode()), job_id
+                )
+
+        if job_ids:
+            self.redis.transaction(requeue, leases)
+
+    def take_finished(
+        self, first_id: int, last_id: int
+    ) -> dict[int, Optional[dict]]:
+        job_ids = range(first_id, last_id + 1)
+        finished = {
+            job_id: json.loads(fields)
+            for job_id, fields in zip(
+                job_ids, self.redis.hmget(self.key('finished'), job_ids)
+            )
+            if fields is not None
+        }
+        if finished:
+            self._delete(finished)
+        return finished
+
+    def cancel(self, first_id: int, last_id: int) -> None:
+        self._delete(range(first_id, last_id + 1))
+
+    def _delete(self, job_ids: Iterable[int]) -> None:
+        job_ids = list(job_ids)
+        pipeline = self.redis.pipeline()
+        pipeline.delete(*(self.key('job', job_id) for job_id in job_ids))
+        pipeline.hdel(self.key('finished'), *job_ids)
+        pipeline.zrem(self.key('leases'), *job_ids)
+        pipeline.execute()
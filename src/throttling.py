@@ -0,0 +1,135 @@
+"""
+Повторы запросов и адаптивное ограничение нагрузки на хосты.
+
+`RetryPolicy` решает, какой ответ повторять и сколько ждать перед
+повтором, `HostController` держит для каждого хоста лимит одновременных
+запросов: лимит плавно растет на успешных ответах и уменьшается вдвое
+на ошибках, а пауза из Retry-After действует на все запросы к хосту.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from requests import Response
+
+# 429 Too Many Requests и временные ошибки сервера.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Пауза из заголовка Retry-After: секунды или HTTP-дата."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Политика повторов запросов.
+
+    Запрос выполняется не более `attempts` раз. Пауза перед повтором -
+     значение Retry-After или `backoff * 2 ** попытка` со случайным
+     разбросом, но не больше `max_delay` секунд.
+    """
+    attempts: int = 4
+    backoff: float = 0.5
+    max_delay: float = 60.0
+    statuses: tuple = RETRY_STATUSES
+
+    def is_retryable(self, response: Optional[Response]) -> bool:
+        """Ошибка соединения (None) или код ответа из `statuses`."""
+        return response is None or response.status_code in self.statuses
+
+    def get_delay(self, attempt: int, response: Optional[Response]) -> float:
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(
+                response.headers.get('Retry-After')
+            )
+        if retry_after is None:
+            delay = self.backoff * 2 ** attempt
+            retry_after = random.uniform(delay / 2, delay)
+        return min(retry_after, self.max_delay)
+
+
+@dataclass
+class HostState:
+    limit: float
+    active: int = 0
+    paused_until: float = 0.0
+
+
+class HostController:
+    """
+    Адаптивный лимит одновременных запросов к каждому хосту.
+
+    Лимит начинается с `initial`, растет примерно на единицу за каждые
+     `limit` успешных ответов (до `maximum`) и уменьшается вдвое при
+     ошибке (до `minimum`). Общий для всех потоков.
+    """
+
+    def __init__(
+        self, initial: int = 4, minimum: int = 1, maximum: int = 32
+    ) -> None:
+        self.initial = min(initial, maximum)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.hosts = {}
+        self.condition = threading.Condition()
+
+    def get_state(self, url: str) -> HostState:
+        host = urlsplit(url).netloc
+        return self.hosts.setdefault(host, HostState(self.initial))
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Ожидание свободного места в лимите хоста на время запроса."""
+        with self.condition:
+            state = self.get_state(url)
+            while True:
+                pause = state.paused_until - time.monotonic()
+                if pause <= 0 and state.active < int(state.limit):
+                    break
+                self.condition.wait(pause if pause > 0 else None)
+            state.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                state.active -= 1
+                self.condition.notify_all()
+
+    def speed_up(self, url: str) -> None:
+        with self.condition:
+            state = self.get_state(url)
+            state.limit = min(self.maximum, state.limit + 1 / state.limit)
+            self.condition.notify_all()
+
+    def back_off(self, url: str, delay: float = 0) -> None:
+        """Лимит уменьшается вдвое, запросы к хосту ждут `delay` секунд."""
+        with self.condition:
+            state = self.get_state(url)
+            state.limit = max(self.minimum, state.limit / 2)
+            state.paused_until = max(
+                state.paused_until, time.monotonic() + delay
+            )
+
+    def get_limit(self, url: str) -> int:
+        with self.condition:
+            return int(self.get_state(url).limit)
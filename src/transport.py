@@ -0,0 +1,174 @@
+"""
+Транспортные адаптеры сессии: таймауты по умолчанию и HTTP/2.
+
+requests не поддерживает HTTP/2, поэтому `Http2Adapter` отправляет
+запросы через httpx - необязательную зависимость, которая
+импортируется только при включенном HTTP/2. Ответ httpx
+заворачивается в ответ urllib3, так что кэш сессии и потоковая
+загрузка архивов работают как с обычным адаптером.
+"""
+import importlib
+import io
+import os
+import ssl
+from typing import Optional, Union
+
+from requests import PreparedRequest, Response
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from urllib3 import HTTPResponse
+
+from constants import DEFAULT_TIMEOUT
+from exceptions import MissingDependencyError
+
+# Заголовки соединения HTTP/1.1, запрещенные в HTTP/2.
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding',
+    'upgrade',
+}
+
+Timeout = Union[float, tuple[float, float]]
+
+
+class TimeoutAdapter(HTTPAdapter):
+    """Адаптер с таймаутом для запросов, у которых он не задан."""
+
+    def __init__(self, timeout: Timeout = DEFAULT_TIMEOUT, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.timeout = timeout
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class StreamReader(io.RawIOBase):
+    """Файлоподобная обертка над итератором байтов тела ответа httpx."""
+
+    def __init__(self, response) -> None:
+        self.response = response
+        self.chunks = response.iter_raw()
+        self.buffer = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self.buffer:
+            self.buffer = next(self.chunks, b'')
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+    def close(self) -> None:
+        self.response.close()
+        super().close()
+
+
+def import_httpx():
+    """Ленивый импорт необязательной зависимости httpx с поддержкой h2."""
+    try:
+        httpx = importlib.import_module('httpx')
+        importlib.import_module('h2')
+    except ImportError as error:
+        raise MissingDependencyError(
+            'Для HTTP/2 установите httpx: pip install "httpx[http2]"'
+        ) from error
+    return httpx
+
+
+class Http2Adapter(TimeoutAdapter):
+    """
+    Адаптер, отправляющий запросы через httpx с поддержкой HTTP/2.
+
+    По HTTPS соединение договаривается о HTTP/2, если его поддерживает
+     сервер, иначе используется HTTP/1.1. Прокси и клиентские
+     сертификаты requests не поддерживаются.
+    """
+
+    def __init__(
+        self,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        keep_alive: bool = True,
+        **kwargs,
+    ) -> None:
+        super().__init__(timeout, pool_maxsize=pool_maxsize, **kwargs)
+        self.httpx = import_httpx()
+        self.limits = self.httpx.Limits(
+            max_connections=pool_maxsize,
+            max_keepalive_connections=pool_maxsize if keep_alive else 0,
+        )
+        self.clients = {}
+
+    def get_client(self, verify: Union[bool, str]):
+        # У httpx проверка сертификатов задается при создании клиента,
+        # путь к сертификатам requests передается SSL-контекстом.
+        if verify not in self.clients:
+            context = verify
+            if isinstance(verify, str):
+                context = ssl.create_default_context(
+                    **{'capath' if os.path.isdir(verify) else 'cafile': verify}
+                )
+            self.clients[verify] = self.httpx.Client(
+                http2=True, limits=self.limits, verify=context
+            )
+        return self.clients[verify]
+
+    def get_timeout(self, timeout: Optional[Timeout]):
+        timeout = timeout if timeout is not None else self.timeout
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self.httpx.Timeout(read, connect=connect)
+        return self.httpx.Timeout(timeout)
+
+    def send(
+        self,
+        request: PreparedRequest,
+        timeout: Optional[Timeout] = None,
+        verify: Union[bool, str] = True,
+        **kwargs,
+    ) -> Response:
+        client = self.get_client(verify)
+        try:
+            response = client.send(
+                client.build_request(
+                    request.method,
+                    request.url,
+                    headers={
+                        name: value
+                        for name, value in request.headers.items()
+                        if name.lower() not in HOP_BY_HOP_HEADERS
+                    },
+                    content=request.body,
+                    timeout=self.get_timeout(timeout),
+                ),
+                stream=True,
+            )
+        except self.httpx.ConnectTimeout as error:
+            raise ConnectTimeout(error, request=request)
+        except self.httpx.ReadTimeout as error:
+            raise ReadTimeout(error, request=request)
+        except self.httpx.TransportError as error:
+            raise ConnectionError(error, request=request)
+
+        raw = HTTPResponse(
+            body=StreamReader(response),
+            headers=list(response.headers.multi_items()),
+            status=response.status_code,
+            reason=response.reason_phrase,
+            request_method=request.method,
+            preload_content=False,
+            decode_content=True,
+        )
+        built = self.build_response(request, raw)
+        built.http_version = response.http_version
+        return built
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.close()
+        self.clients.clear()
+        super().close()
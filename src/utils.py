@@ -1,34 +1,155 @@
+from __future__ import annotations
+
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import hashlib
+import json
 import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from exceptions import DownloadError, ParserFindTagException, ResponseIsNone
+from memo import SOUP_CACHE, get_page_key
+from metrics import METRICS, timed
+from throttling import HostController, RetryPolicy
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from requests import Response
+    from requests_cache import CachedResponse, CachedSession
 
-from bs4 import BeautifulSoup
-from requests import RequestException, Response
-from requests_cache import CachedResponse
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Архивы не читаются из кэша HTML-страниц и не сохраняются в него.
+NO_STORE = {'Cache-Control': 'no-store'}
 
-from exceptions import ParserFindTagException, ResponseIsNone
 
+def send_request(
+    session: CachedSession,
+    url: str,
+    controller: Optional[HostController] = None,
+) -> Response:
+    """Один запрос страницы в пределах лимита хоста `controller`."""
+    with controller.slot(url) if controller else nullcontext():
+        start = time.perf_counter()
+        response = session.get(url)
+        response.encoding = 'utf-8'
+        METRICS.record_response(response, time.perf_counter() - start)
+    return response
 
-def get_response(session: CachedResponse, url: str) -> Response:
+
+def get_response(
+    session: CachedResponse,
+    url: str,
+    retry: Optional[RetryPolicy] = None,
+    controller: Optional[HostController] = None,
+) -> Response:
     """
     Вспомогательная функция для получения HTML-кода страницы для парсинга.
+
+    Ошибки соединения и ответы 429/5xx повторяются по политике `retry`
+     с паузой из Retry-After или экспоненциальной задержкой. Если все
+     попытки неудачны, возвращается None.
     """
-    try:
-        response = session.get(url)
-        response.encoding = 'utf-8'
-        return response
+    from requests import RequestException
 
-    except RequestException:
-        logging.exception(
-            f'Возникла ошибка при загрузке страницы {url}',
-            stack_info=True
-        )
+    retry = retry or RetryPolicy()
+    for attempt in range(retry.attempts):
+        try:
+            response = send_request(session, url, controller)
+        except RequestException:
+            response = None
+            if attempt == retry.attempts - 1:
+                logging.exception(
+                    f'Возникла ошибка при загрузке страницы {url}',
+                    stack_info=True
+                )
+                return None
+        if not retry.is_retryable(response):
+            if controller is not None and not getattr(
+                response, 'from_cache', False
+            ):
+                controller.speed_up(url)
+            return response
+
+        delay = retry.get_delay(attempt, response)
+        if controller is not None:
+            controller.back_off(url, delay)
+        if attempt < retry.attempts - 1:
+            reason = 'ошибка соединения' if response is None else (
+                f'ответ {response.status_code}'
+            )
+            logging.warning(
+                f'Повтор запроса {url} через {delay:.1f} с: {reason}'
+            )
+            time.sleep(delay)
+
+    logging.error(
+        f'Страница {url} не загружена за {retry.attempts} попыток: '
+        f'ответ {response.status_code}'
+    )
+    return None
+
+
+def get_responses(
+    session: CachedSession,
+    urls: Iterable[str],
+    workers: int = 1,
+    retry: Optional[RetryPolicy] = None,
+    controller: Optional[HostController] = None,
+) -> Iterator[Optional[Response]]:
+    """
+    Загрузка нескольких страниц пулом из `workers` потоков.
+
+    Ответы отдаются в порядке `urls`, независимо от того, в каком порядке
+    завершились запросы, поэтому результат парсинга детерминирован.
+    """
+    def fetch(url: str) -> Optional[Response]:
+        return get_response(session, url, retry, controller)
 
+    if workers <= 1:
+        yield from map(fetch, urls)
+        return
 
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(fetch, urls)
+
+
+def is_not_modified(response: Optional[Response]) -> bool:
+    """Ответ взят из кэша после ответа сервера 304 Not Modified."""
+    return getattr(response, 'revalidated', False)
+
+
+def get_digest(response: Response) -> str:
+    """Хэш содержимого страницы."""
+    return hashlib.sha1(response.content).hexdigest()
+
+
+@timed('get_soup')
 def get_soup(response: Response) -> BeautifulSoup:
+    """
+    Дерево страницы, уже разобранные страницы берутся из `SOUP_CACHE`.
+
+    Дерево может быть общим для нескольких вызовов, изменять его нельзя.
+    """
     if response is None:
         raise ResponseIsNone('Ответ не может быть None-type!')
-    return BeautifulSoup(response.text, 'lxml')
+    url = getattr(response, 'url', None)
+    key = get_page_key(url, get_digest(response)) if url else None
+    soup = SOUP_CACHE.get(key) if key else None
+    if soup is None:
+        from bs4 import BeautifulSoup
 
+        soup = BeautifulSoup(response.text, 'lxml')
+        if key:
+            SOUP_CACHE.put(key, soup)
+    return soup
 
+
+@timed('find_tag')
 def find_tag(soup: BeautifulSoup, tag: str, attrs=None):
     searched_tag = soup.find(tag, attrs=(attrs or {}))
 
@@ -37,3 +158,197 @@ def find_tag(soup: BeautifulSoup, tag: str, attrs=None):
         logging.error(error_msg, stack_info=True)
         raise ParserFindTagException(error_msg)
     return searched_tag
+
+
+class BandwidthLimiter:
+    """
+    Общее для всех потоков ограничение скорости загрузки, байт/с.
+
+    Каждый загруженный кусок резервирует интервал времени, равный
+     `size / rate`, поток ждет окончания своего интервала.
+    """
+
+    def __init__(self, rate: int) -> None:
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+
+    def consume(self, size: int) -> None:
+        with self.lock:
+            now = time.monotonic()
+            self.next_time = max(self.next_time, now) + size / self.rate
+            delay = self.next_time - now
+        time.sleep(delay)
+
+
+def get_file_digest(path: Path) -> str:
+    """SHA-256 файла, читается кусками по DOWNLOAD_CHUNK_SIZE."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_total_size(response: Response) -> Optional[int]:
+    """Полный размер файла из Content-Range или Content-Length."""
+    content_range = response.headers.get('Content-Range')
+    if content_range is not None:
+        return int(content_range.rsplit('/', 1)[1])
+    content_length = response.headers.get('Content-Length')
+    return int(content_length) if content_length is not None else None
+
+
+def get_remote_size(session: CachedSession, url: str) -> Optional[int]:
+    response = session.head(
+        url, headers=NO_STORE, allow_redirects=True
+    )
+    if not response.ok:
+        return None
+    return get_total_size(response)
+
+
+def get_header_digest(response: Response) -> Optional[str]:
+    """
+    SHA-256 всего файла из заголовка Repr-Digest (RFC 9530) или Digest.
+
+    Возвращается в hex, как у `get_file_digest`, или None, если сервер
+     не сообщает контрольную сумму.
+    """
+    for header in ('Repr-Digest', 'Digest'):
+        for item in response.headers.get(header, '').split(','):
+            algorithm, _, value = item.strip().partition('=')
+            if algorithm.lower() == 'sha-256' and value:
+                try:
+                    return base64.b64decode(value.strip(':')).hex()
+                except ValueError:
+                    return None
+    return None
+
+
+def get_part_state(response: Response) -> dict:
+    """Валидатор, размер и контрольная сумма файла для докачки."""
+    etag = response.headers.get('ETag')
+    return {
+        # Слабый ETag не подходит для If-Range (RFC 9110, 13.1.5).
+        'etag': None if etag is None or etag.startswith('W/') else etag,
+        'last_modified': response.headers.get('Last-Modified'),
+        'size': get_total_size(response),
+        'sha256': get_header_digest(response),
+    }
+
+
+def load_part_state(part_path: Path, state_path: Path) -> dict:
+    """Состояние прерванной загрузки, если его можно продолжить."""
+    if not part_path.exists() or not state_path.exists():
+        return {}
+    try:
+        state = json.loads(state_path.read_text(encoding='utf-8'))
+    except ValueError:
+        return {}
+    if state.get('etag') or state.get('last_modified'):
+        return state
+    return {}
+
+
+def remove_part(*paths: Path) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def download_file(
+    session: CachedSession,
+    url: str,
+    path: Path,
+    sha256: Optional[str] = None,
+    limiter: Optional[BandwidthLimiter] = None,
+) -> Path:
+    """
+    Потоковая загрузка файла с докачкой.
+
+    Если `path` уже существует и его размер совпадает с размером на
+     сервере, файл не загружается повторно.
+    Файл пишется кусками во временный `<имя>.part` в обход кэша сессии,
+     рядом в `<имя>.part.json` сохраняются ETag или Last-Modified,
+     размер и контрольная сумма из первого ответа сервера.
+    Прерванная загрузка продолжается запросом Range с If-Range: если
+     файл на сервере изменился, сервер отдает его целиком (200) и
+     загрузка начинается заново. Без сохраненного валидатора временный
+     файл не докачивается.
+    Перед атомарным переименованием в `path` проверяются размер и
+     SHA-256: переданный в `sha256` или из заголовка Repr-Digest/Digest.
+    """
+    if path.exists() and (
+        path.stat().st_size == get_remote_size(session, url)
+    ):
+        logging.info(f'Файл уже загружен: {path}')
+        return path
+
+    part_path = path.with_name(path.name + '.part')
+    state_path = path.with_name(path.name + '.part.json')
+    state = load_part_state(part_path, state_path)
+    headers = dict(NO_STORE)
+    if state:
+        headers['Range'] = f'bytes={part_path.stat().st_size}-'
+        headers['If-Range'] = state['etag'] or state['last_modified']
+
+    with session.get(url, headers=headers, stream=True) as response:
+        # 416 - валидатор совпал, временный файл уже содержит весь файл.
+        if response.status_code != 416:
+            response.raise_for_status()
+            if response.status_code == 206:
+                mode = 'ab'
+            else:
+                mode = 'wb'
+                state = get_part_state(response)
+                state_path.write_text(json.dumps(state), encoding='utf-8')
+            with open(part_path, mode) as file:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+                    METRICS.add_bytes(len(chunk))
+                    if limiter is not None:
+                        limiter.consume(len(chunk))
+        # Размер берется из ответа, начавшего загрузку: ответ на докачку
+        # должен продолжать тот же файл, а не подтверждать сам себя.
+        total = get_total_size(response) if response.status_code == 416 else (
+            state['size']
+        )
+        # Repr-Digest относится ко всему файлу и в ответах 206 и 416.
+        sha256 = sha256 or get_header_digest(response) or state.get('sha256')
+
+    size = part_path.stat().st_size
+    if total is not None and size != total:
+        if size > total:
+            remove_part(part_path, state_path)
+        raise DownloadError(
+            f'Размер {part_path} ({size}) не совпадает с ожидаемым ({total})'
+        )
+    if sha256 is not None and get_file_digest(part_path) != sha256:
+        remove_part(part_path, state_path)
+        raise DownloadError(f'Не совпадает контрольная сумма {url}')
+
+    os.replace(part_path, path)
+    remove_part(state_path)
+    return path
+
+
+def download_files(
+    session: CachedSession,
+    urls: list[str],
+    directory: Path,
+    workers: int = 1,
+    rate_limit: Optional[int] = None,
+) -> list[Path]:
+    """
+    Параллельная загрузка файлов в `directory` пулом из `workers` потоков.
+
+    `rate_limit` - общее для всех потоков ограничение скорости, байт/с.
+    """
+    limiter = BandwidthLimiter(rate_limit) if rate_limit else None
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        return list(executor.map(
+            lambda url: download_file(
+                session, url, directory / url.split('/')[-1], limiter=limiter
+            ),
+            urls
+        ))
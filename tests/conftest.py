@@ -1,3 +1,4 @@
+import importlib
 import pytest
 import sys
 from pathlib import Path
@@ -14,6 +15,8 @@ SRC_DIR = BASE_DIR / 'src'
 sys.path.append(str(BASE_DIR))
 sys.path.append(str(SRC_DIR))
 
+from tests.fixture_data.adapter import SiteAdapter  # noqa: E402
+
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://www.python.org/dev/peps/'
 
@@ -31,6 +34,14 @@ def pytest_make_parametrize_id(config, val):
     return repr(val)
 
 
+@pytest.fixture(autouse=True)
+def clear_memo():
+    """Разобранные страницы в памяти процесса не переживают тест."""
+    yield
+    # Загрузчики и парсеры используют модуль memo из src.
+    importlib.import_module('memo').clear_memo()
+
+
 @pytest.fixture(scope='function')
 def tempfile_session() -> CachedSession:
     """Get a CachedSession using a temporary SQLite db"""
@@ -110,3 +121,32 @@ def records():
         result = results[mode]
         return converting(result)
     return _records
+
+
+@pytest.fixture
+def site_session():
+    def _site_session(pages: dict, latency: float = 0) -> CachedSession:
+        session = CachedSession(backend='memory')
+        adapter = SiteAdapter(pages, latency)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.mock_adapter = adapter
+        return session
+    return _site_session
+
+
+@pytest.fixture
+def local_server():
+    """Фабрика локальных серверов, страницы задаются по пути запроса."""
+    from tests.fixture_data.server import StandInServer
+
+    servers = []
+
+    def _local_server(pages: dict, latency: float = 0) -> StandInServer:
+        server = StandInServer(pages, latency).start()
+        servers.append(server)
+        return server
+
+    yield _local_server
+    for server in servers:
+        server.stop()
@@ -0,0 +1,231 @@
+"""
+Синтетические HTML-страницы docs.python.org и peps.python.org.
+
+Разметка повторяет структуру реальных страниц ровно настолько, насколько
+это нужно парсерам, чтобы тесты и бенчмарки работали без сети.
+"""
+import json
+
+PEP_DOC_URL = 'https://peps.python.org/'
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+
+# (аббревиатура в общем списке, статус на странице PEP, тип PEP)
+PEP_STATUSES = (
+    ('SF', 'Final', 'Standards Track'),
+    ('PA', 'Active', 'Process'),
+    ('IF', 'Final', 'Informational'),
+    ('SR', 'Rejected', 'Standards Track'),
+    ('SW', 'Withdrawn', 'Standards Track'),
+    ('SD', 'Deferred', 'Standards Track'),
+    ('SS', 'Superseded', 'Standards Track'),
+    ('SA', 'Accepted', 'Standards Track'),
+    ('S', 'Draft', 'Standards Track'),
+    ('SP', 'Provisional', 'Standards Track'),
+    # Намеренное расхождение статусов.
+    ('SF', 'Draft', 'Standards Track'),
+)
+
+PYTHON_VERSIONS = (
+    ('3.14', 'in development'),
+    ('3.13', 'pre-release'),
+    ('3.12', 'stable'),
+    ('3.11', 'security-fixes'),
+    ('2.7', 'EOL'),
+)
+
+DOWNLOAD_FORMATS = {
+    'pdf-a4': 'docs-pdf-a4.zip',
+    'pdf-letter': 'docs-pdf-letter.zip',
+    'html': 'docs-html.zip',
+    'text': 'docs-text.zip',
+    'epub': 'docs.epub',
+}
+
+
+def pep_href(number: int) -> str:
+    return f'pep-{number:04d}/'
+
+
+def pep_record(number: int) -> tuple:
+    return PEP_STATUSES[number % len(PEP_STATUSES)]
+
+
+def mismatched(count: int) -> list[int]:
+    """Номера PEP с намеренным расхождением статусов."""
+    return [
+        number for number in range(1, count + 1)
+        if number % len(PEP_STATUSES) == len(PEP_STATUSES) - 1
+    ]
+
+
+def pep_index_page(count: int) -> str:
+    rows = []
+    for number in range(1, count + 1):
+        abbr, _, _ = pep_record(number)
+        href = pep_href(number)
+        rows.append(
+            '<tr class="row-even">'
+            f'<td><abbr title="{abbr}">{abbr}</abbr></td>'
+            f'<td><a class="pep reference internal" href="{href}">'
+            f'{number}</a></td>'
+            f'<td><a class="pep reference internal" href="{href}">'
+            f'Synthetic PEP {number}</a></td>'
+            f'<td>Author {number}, Co-Author</td>'
+            '</tr>'
+        )
+    return (
+        '<html><body><section id="numerical-index">'
+        '<h2>Numerical Index</h2>'
+        '<table class="pep-zero-table docutils align-default">'
+        '<thead><tr><th>PEP</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody>'
+        '</table></section></body></html>'
+    )
+
+
+def pep_page(number: int, paragraphs: int = 50) -> str:
+    _, status, pep_type = pep_record(number)
+    padding = '<p>Lorem ipsum dolor sit amet.</p>' * paragraphs
+    return (
+        '<html><body><section id="pep-content">'
+        f'<h1 class="page-title">PEP {number} – Synthetic PEP {number}</h1>'
+        '<dl class="rfc2822 field-list simple">'
+        '<dt class="field-odd">Author<span class="colon">:</span></dt>'
+        f'<dd class="field-odd">Author {number}, Co-Author</dd>'
+        '<dt class="field-even">Status<span class="colon">:</span></dt>'
+        f'<dd class="field-even"><abbr title="{status}">{status}</abbr></dd>'
+        '<dt class="field-odd">Type<span class="colon">:</span></dt>'
+        f'<dd class="field-odd"><abbr title="{pep_type}">{pep_type}</abbr>'
+        '</dd>'
+        '<dt class="field-even">Created<span class="colon">:</span></dt>'
+        '<dd class="field-even">13-Jun-2000</dd>'
+        f'</dl>{padding}</section></body></html>'
+    )
+
+
+def pep_listing(count: int, base_url: str = PEP_DOC_URL) -> str:
+    """Машиночитаемый список всех PEP в формате api/peps.json."""
+    listing = {}
+    for number in range(1, count + 1):
+        _, status, pep_type = pep_record(number)
+        listing[str(number)] = {
+            'number': number,
+            'title': f'Synthetic PEP {number}',
+            'authors': f'Author {number}, Co-Author',
+            'status': status,
+            'type': pep_type,
+            'created': '13-Jun-2000',
+            'url': base_url + pep_href(number),
+        }
+    return json.dumps(listing)
+
+
+def pep_pages(count: int, base_url: str = PEP_DOC_URL) -> dict:
+    """
+    Страницы общего списка, всех PEP и список peps.json,
+     ключ - абсолютный URL.
+    """
+    pages = {
+        base_url: pep_index_page(count),
+        base_url + 'api/peps.json': pep_listing(count, base_url),
+    }
+    for number in range(1, count + 1):
+        pages[base_url + pep_href(number)] = pep_page(number)
+    return pages
+
+
+def expected_pep_results(count: int) -> dict:
+    """Ожидаемое количество PEP в каждом статусе."""
+    expected = {}
+    for number in range(1, count + 1):
+        _, status, _ = pep_record(number)
+        expected[status] = expected.get(status, 0) + 1
+    return expected
+
+
+def whats_new_index_page(versions: tuple) -> str:
+    items = ''.join(
+        '<li class="toctree-l1">'
+        f'<a class="reference internal" href="{version}.html">'
+        f'What’s New In Python {version}</a></li>'
+        for version in versions
+    )
+    return (
+        '<html><body><section id="what-s-new-in-python">'
+        '<h1>What’s New in Python</h1>'
+        f'<div class="toctree-wrapper compound"><ul>{items}</ul></div>'
+        '</section></body></html>'
+    )
+
+
+def whats_new_page(version: str, paragraphs: int = 50) -> str:
+    padding = '<p>Lorem ipsum dolor sit amet.</p>' * paragraphs
+    return (
+        '<html><body><section>'
+        f'<h1>What’s New In Python {version}<a class="headerlink">¶</a></h1>'
+        '<dl class="field-list simple">'
+        '<dt class="field-odd">Editor<span class="colon">:</span></dt>'
+        f'<dd class="field-odd"><p>Editor {version}</p></dd>'
+        f'</dl>{padding}</section></body></html>'
+    )
+
+
+def whats_new_pages(versions: tuple, base_url: str = MAIN_DOC_URL) -> dict:
+    whats_new_url = base_url + 'whatsnew/'
+    pages = {whats_new_url: whats_new_index_page(versions)}
+    for version in versions:
+        pages[f'{whats_new_url}{version}.html'] = whats_new_page(version)
+    return pages
+
+
+def main_doc_page(
+    versions: tuple = PYTHON_VERSIONS,
+    base_url: str = 'https://docs.python.org/',
+) -> str:
+    items = ''.join(
+        f'<li><a href="{base_url}{version}/">'
+        f'Python {version} ({status})</a></li>'
+        for version, status in versions
+    )
+    return (
+        '<html><body><div class="sphinxsidebarwrapper">'
+        '<ul><li><a href="#">Navigation</a></li></ul>'
+        f'<ul>{items}<li><a href="https://www.python.org/doc/versions/">'
+        'All versions</a></li></ul>'
+        '</div></body></html>'
+    )
+
+
+def archive_name(version: str, doc_format: str) -> str:
+    return f'python-{version}-{DOWNLOAD_FORMATS[doc_format]}'
+
+
+def download_page(version: str = '3.12') -> str:
+    rows = ''.join(
+        f'<tr><td>{doc_format}</td><td><a class="reference external" '
+        f'href="archives/{archive_name(version, doc_format)}">'
+        'Download</a></td></tr>'
+        for doc_format in DOWNLOAD_FORMATS
+    )
+    return (
+        '<html><body><div role="main">'
+        f'<table class="docutils align-default">{rows}</table>'
+        '</div></body></html>'
+    )
+
+
+def docs_site(base_url: str, archive_size: int = 64 * 1024) -> dict:
+    """
+    Главная страница, страницы загрузок и архивы для всех версий.
+
+    Ключ - путь на сервере, архивы заполнены байтами по номеру формата.
+    """
+    pages = {'/3/': main_doc_page(base_url=base_url)}
+    for version, _ in PYTHON_VERSIONS + (('3', ''),):
+        pages[f'/{version}/download.html'] = download_page(version)
+        for number, doc_format in enumerate(DOWNLOAD_FORMATS):
+            name = archive_name(version, doc_format)
+            pages[f'/{version}/archives/{name}'] = (
+                bytes([number]) * archive_size
+            )
+    return pages
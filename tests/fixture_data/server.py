@@ -0,0 +1,162 @@
+"""Локальный HTTP-сервер, подменяющий docs.python.org и peps.python.org."""
+import base64
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import threading
+import time
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Сервер, отдающий заданные страницы по пути запроса.
+
+    Считает запросы, принятые соединения, ответы 304 и максимальное
+     количество одновременно обрабатываемых запросов, чтобы тесты могли
+     проверять лимиты и переиспользование соединений.
+    Каждая страница отдается с ETag, по которому сервер отвечает
+     на условные запросы, и с контрольной суммой в Repr-Digest.
+     Поддерживается докачка заголовком Range, в том числе с If-Range.
+    Метод `fail` делает страницу нестабильной: первые запросы к ней
+     получают ответ с ошибкой.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pages: dict, latency: float = 0) -> None:
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.pages = pages
+        self.latency = latency
+        self.requests = []
+        self.connections = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f'http://{host}:{port}/'
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        # Клиент, не дождавшийся ответа (таймаут), - не ошибка сервера.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def fail(
+        self,
+        path: str,
+        times: int,
+        status: int = 503,
+        retry_after: str = None,
+    ) -> None:
+        """Первые `times` запросов к `path` получат ответ `status`."""
+        self.failures[path] = [times, status, retry_after]
+
+    def take_failure(self, path: str):
+        with self.lock:
+            failure = self.failures.get(path)
+            if failure is None or failure[0] == 0:
+                return None
+            failure[0] -= 1
+            return failure[1:]
+
+    def start(self) -> 'StandInServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело уходят разными пакетами, без TCP_NODELAY каждый
+    # ответ ждал бы отложенного подтверждения клиента (~40 мс).
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        # Как и настоящие серверы, сообщаем клиенту о закрытии соединения.
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(
+                server.max_in_flight, server.in_flight
+            )
+        try:
+            time.sleep(server.latency)
+            failure = server.take_failure(self.path)
+            if failure is not None:
+                self.send_failure(*failure)
+            else:
+                self.send_page(server.pages.get(self.path), head)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_failure(self, status, retry_after=None):
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header('Retry-After', retry_after)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_page(self, page, head=False):
+        if page is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = page.encode('utf-8') if isinstance(page, str) else page
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        digest = base64.b64encode(hashlib.sha256(body).digest()).decode()
+        status, body, content_range = self.select_range(body, etag)
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Repr-Digest', f'sha-256=:{digest}:')
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if content_range is not None:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def select_range(self, body, etag):
+        """Поддерживаются только диапазоны вида `bytes=N-`."""
+        requested = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if requested is None or if_range not in (None, etag):
+            return 200, body, None
+        start = int(requested.removeprefix('bytes=').rstrip('-'))
+        if start >= len(body):
+            return 416, b'', f'bytes */{len(body)}'
+        content_range = f'bytes {start}-{len(body) - 1}/{len(body)}'
+        return 206, body[start:], content_range
@@ -0,0 +1,88 @@
+import json
+
+from src import main, storage
+from tests.fixture_data.pages import mismatched, pep_pages
+
+PEP_COUNT = 30
+LISTING_URL = 'https://peps.python.org/api/peps.json'
+
+
+def run_bulk(site_session, pages: dict, path) -> tuple:
+    session = site_session(pages)
+    results = list(
+        main.pep(session, index=storage.PepIndex(path), bulk=True)
+    )
+    return results, session.mock_adapter.call_count
+
+
+def test_bulk_skips_unchanged_peps(site_session, tmp_path):
+    path = tmp_path / 'pep_index.sqlite'
+    pages = pep_pages(PEP_COUNT)
+    expected = list(main.pep(site_session(pages)))
+
+    first, requests_count = run_bulk(site_session, pages, path)
+    assert first == expected
+    assert requests_count == PEP_COUNT + 2
+
+    second, requests_count = run_bulk(site_session, pages, path)
+    assert second == expected
+    assert requests_count == 2 + len(mismatched(PEP_COUNT)), (
+        'Повторный быстрый запуск должен загружать только общий список, '
+        'peps.json и PEP с расхождением статусов.'
+    )
+
+
+def test_bulk_fetches_changed_peps(site_session, tmp_path):
+    path = tmp_path / 'pep_index.sqlite'
+    pages = pep_pages(PEP_COUNT)
+    run_bulk(site_session, pages, path)
+
+    # PEP 1 перешел из Active в Draft: это допустимый статус для
+    # аббревиатуры P, расхождения нет.
+    listing = json.loads(pages[LISTING_URL])
+    listing['1']['status'] = 'Draft'
+    pages[LISTING_URL] = json.dumps(listing)
+    pep_url = 'https://peps.python.org/pep-0001/'
+    pages[pep_url] = pages[pep_url].replace('Active', 'Draft')
+
+    results, requests_count = run_bulk(site_session, pages, path)
+    assert requests_count == 3 + len(mismatched(PEP_COUNT))
+    assert results == list(main.pep(site_session(pages)))
+    assert storage.PepIndex(path).query(['Draft'])[1][0] == 1
+
+
+def test_bulk_refetches_cached_changed_pep(site_session, tmp_path):
+    path = tmp_path / 'pep_index.sqlite'
+    pages = pep_pages(PEP_COUNT)
+    # Одна сессия на все запуски: страницы PEP остаются в ее кэше.
+    session = site_session(pages)
+    list(main.pep(session, index=storage.PepIndex(path), bulk=True))
+
+    listing = json.loads(pages[LISTING_URL])
+    listing['1']['status'] = 'Draft'
+    pages[LISTING_URL] = json.dumps(listing)
+    pep_url = 'https://peps.python.org/pep-0001/'
+    pages[pep_url] = pages[pep_url].replace('Active', 'Draft')
+    expected = list(main.pep(site_session(pages)))
+
+    for _ in range(2):
+        # Срок хранения peps.json в кэше истек.
+        session.cache.delete(urls=[LISTING_URL])
+        results = list(
+            main.pep(session, index=storage.PepIndex(path), bulk=True)
+        )
+        assert results == expected, (
+            'Изменившийся PEP не должен читаться из устаревшего кэша.'
+        )
+    assert storage.PepIndex(path).query(['Draft'])[1][0] == 1
+
+
+def test_bulk_without_listing(site_session, tmp_path):
+    path = tmp_path / 'pep_index.sqlite'
+    pages = pep_pages(PEP_COUNT)
+    del pages[LISTING_URL]
+    run_bulk(site_session, pages, path)
+
+    results, requests_count = run_bulk(site_session, pages, path)
+    assert results == list(main.pep(site_session(pages)))
+    assert requests_count == PEP_COUNT + 2
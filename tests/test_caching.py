@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+import importlib
+
+import pytest
+from requests_cache import CachedSession
+from requests_cache.policy import get_url_expiration
+
+from src import caching, configs, constants
+from tests.fixture_data.pages import pep_page
+
+PAGES = {f'/page-{number}/': pep_page(number) for number in range(1, 6)}
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize('backend', constants.CACHE_BACKENDS)
+def test_cache_backends(local_server, cache_dir, monkeypatch, backend):
+    if backend == constants.REDIS:
+        fakeredis = pytest.importorskip('fakeredis')
+        # configs импортирует caching из src при создании кэша.
+        monkeypatch.setattr(
+            importlib.import_module('caching'),
+            'get_redis_connection',
+            lambda url: fakeredis.FakeRedis()
+        )
+    server = local_server(PAGES)
+    session = CachedSession(backend=configs.configure_cache(backend))
+    url = server.url + 'page-1/'
+    assert session.get(url).text == PAGES['/page-1/']
+    response = session.get(url)
+    assert response.from_cache
+    assert response.text == PAGES['/page-1/']
+    assert len(server.requests) == 1
+
+
+def test_cache_compression(local_server, cache_dir):
+    server = local_server(
+        {'/': pep_page(1, paragraphs=2000)}
+    )
+    sizes = {}
+    for compress in (True, False):
+        cache = configs.configure_cache(constants.SQLITE, compress)
+        cache.clear()
+        CachedSession(backend=cache).get(server.url)
+        with cache.responses.connection() as connection:
+            (sizes[compress],) = connection.execute(
+                'SELECT SUM(LENGTH(value)) FROM responses'
+            ).fetchone()
+    assert sizes[True] * 5 < sizes[False]
+
+
+@pytest.mark.parametrize('url, expire_after', [
+    ('https://peps.python.org/', timedelta(hours=1)),
+    ('https://peps.python.org/pep-0008/', timedelta(days=7)),
+    ('https://docs.python.org/3/whatsnew/', timedelta(days=1)),
+    ('https://docs.python.org/3/whatsnew/2.7.html', timedelta(days=1)),
+    ('https://docs.python.org/3/whatsnew/3.14.html', timedelta(days=1)),
+    ('https://docs.python.org/3/', None),
+])
+def test_urls_expire_after(url, expire_after):
+    assert get_url_expiration(url, constants.URLS_EXPIRE_AFTER) == (
+        expire_after
+    )
+
+
+def test_compact_cache(local_server):
+    server = local_server(PAGES)
+    session = CachedSession(backend='memory')
+    for path in PAGES:
+        session.get(server.url + path[1:])
+    expired = session.get(server.url + 'page-1/')
+    session.cache.save_response(
+        expired, expires=datetime.now(timezone.utc) - timedelta(days=1)
+    )
+    newest = [server.url + 'page-4/', server.url + 'page-5/']
+    max_size = sum(len(session.get(url).content) for url in newest)
+
+    assert caching.compact_cache(session.cache) == 1
+    assert caching.compact_cache(session.cache, max_size) == 2
+    assert sorted(session.cache.urls()) == newest, (
+        'Вытесняться должны самые старые ответы.'
+    )
+    assert caching.get_cache_size(session.cache) == max_size
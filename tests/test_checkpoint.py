@@ -0,0 +1,87 @@
+import pytest
+import requests
+
+from src import fetchers, main, storage, throttling
+from tests.fixture_data.pages import PEP_DOC_URL, pep_href, pep_pages
+
+PEP_COUNT = 30
+FAIL_AFTER = 20
+
+
+def interrupt_after(session, count: int) -> None:
+    """Прерывание обхода, как Ctrl-C, на запросе номер `count`."""
+    adapter = session.mock_adapter
+    send = adapter.send
+
+    def interrupting_send(request, **kwargs):
+        if adapter.call_count >= count:
+            raise KeyboardInterrupt
+        return send(request, **kwargs)
+
+    adapter.send = interrupting_send
+
+
+def fail_url(session, url: str) -> None:
+    """Ошибка соединения при каждом запросе `url`."""
+    adapter = session.mock_adapter
+    send = adapter.send
+
+    def failing_send(request, **kwargs):
+        if request.url == url:
+            raise requests.ConnectionError(request=request)
+        return send(request, **kwargs)
+
+    adapter.send = failing_send
+
+
+def test_resume_after_interrupt(site_session, tmp_path):
+    pages = pep_pages(PEP_COUNT)
+    expected = list(main.pep(site_session(pages)))
+    checkpoint = storage.Checkpoint(tmp_path / 'checkpoint.json')
+
+    session = site_session(pages)
+    interrupt_after(session, FAIL_AFTER)
+    with pytest.raises(KeyboardInterrupt):
+        list(main.pep(session, checkpoint=checkpoint))
+    done = FAIL_AFTER - 1
+    assert len(checkpoint.load()['statuses']) == done
+
+    session = site_session(pages)
+    results = list(main.pep(session, checkpoint=checkpoint, resume=True))
+    assert results == expected
+    assert session.mock_adapter.call_count == 1 + PEP_COUNT - done, (
+        'После продолжения должны загружаться только непроверенные PEP.'
+    )
+    assert checkpoint.load() is None, (
+        'После проверки всех PEP контрольная точка удаляется.'
+    )
+
+
+def test_resume_retries_failed_peps(site_session, tmp_path):
+    pages = pep_pages(PEP_COUNT)
+    expected = list(main.pep(site_session(pages)))
+    checkpoint = storage.Checkpoint(tmp_path / 'checkpoint.json')
+
+    session = site_session(pages)
+    fail_url(session, PEP_DOC_URL + pep_href(5))
+    fetcher = fetchers.SyncFetcher(
+        session, retry=throttling.RetryPolicy(attempts=1)
+    )
+    list(main.pep(session, fetcher, checkpoint=checkpoint))
+    assert '5' not in checkpoint.load()['statuses']
+
+    session = site_session(pages)
+    results = list(main.pep(session, checkpoint=checkpoint, resume=True))
+    assert results == expected
+    assert session.mock_adapter.call_count == 2
+
+
+def test_checkpoint_without_resume(site_session, tmp_path):
+    pages = pep_pages(PEP_COUNT)
+    checkpoint = storage.Checkpoint(tmp_path / 'checkpoint.json')
+    checkpoint.save({'statuses': {'1': 'Final'}})
+
+    session = site_session(pages)
+    list(main.pep(session, checkpoint=checkpoint))
+    assert session.mock_adapter.call_count == PEP_COUNT + 1
+    assert checkpoint.load() is None
@@ -0,0 +1,70 @@
+from argparse import Namespace
+import json
+import sys
+
+import pytest
+
+from src import outputs
+
+PEP_ROWS = [
+    ('Статус', 'Количество'), ('Active', 2), ('Final', 3), ('Total', 5)
+]
+VERSION_ROWS = [
+    ('Ссылка на документацию', 'Версия', 'Статус'),
+    ('https://docs.python.org/3.12/', '3.12', 'stable'),
+    ('https://www.python.org/doc/versions/', 'All versions', ''),
+]
+
+
+@pytest.fixture
+def results_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    return tmp_path / 'results'
+
+
+def written_file(results_dir):
+    (path,) = results_dir.iterdir()
+    return path
+
+
+def test_jsonl_output(results_dir):
+    outputs.control_output(
+        iter(VERSION_ROWS), Namespace(mode='latest-versions', output='jsonl')
+    )
+    path = written_file(results_dir)
+    assert path.suffix == '.jsonl'
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'url': url, 'version': version, 'status': status}
+        for url, version, status in VERSION_ROWS[1:]
+    ]
+
+
+@pytest.mark.parametrize('output', ['parquet', 'feather'])
+def test_arrow_output_typed_columns(results_dir, monkeypatch, output):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    monkeypatch.setattr(outputs, 'BATCH_SIZE', 2)
+    outputs.control_output(
+        iter(PEP_ROWS), Namespace(mode='pep', output=output)
+    )
+    path = written_file(results_dir)
+    assert path.suffix == f'.{output}'
+    if output == 'parquet':
+        table = pyarrow.parquet.read_table(path)
+    else:
+        table = pyarrow.feather.read_table(path)
+    assert table.schema.field('count').type == pa.int64()
+    assert table.to_pylist() == [
+        {'status': status, 'count': count} for status, count in PEP_ROWS[1:]
+    ]
+
+
+def test_arrow_output_without_pyarrow(results_dir, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(outputs.MissingDependencyError):
+        outputs.control_output(
+            iter(PEP_ROWS), Namespace(mode='pep', output='parquet')
+        )
@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'parquet', 'feather'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +64,19 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+@pytest.mark.parametrize('args', [
+    ['-w', '0'], ['--per-host', '0'], ['--concurrency', '-5'],
+    ['--retries', '-1'], ['-p', '0'],
+])
+def test_counts_must_be_positive(args, capsys):
+    parser = configs.configure_argument_parser(['pep'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', *args])
+    assert 'ожидается целое число' in capsys.readouterr().err
+
+
+def test_zero_retries_allowed():
+    parser = configs.configure_argument_parser(['pep'])
+    assert parser.parse_args(['pep', '--retries', '0']).retries == 0
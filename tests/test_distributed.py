@@ -0,0 +1,270 @@
+import importlib
+import multiprocessing
+import threading
+import time
+
+import pytest
+from requests_cache import CachedSession
+
+from src import fetchers, main, storage
+from tests.fixture_data.adapter import SiteAdapter
+from tests.fixture_data.pages import pep_pages
+
+PEP_COUNT = 40
+WORKERS = 3
+# Координатор из main использует модуль distributed из src.
+distributed = importlib.import_module('distributed')
+extractors = importlib.import_module('extractors')
+get_extractor_name = importlib.import_module('memo').get_extractor_name
+PEP_FIELDS = get_extractor_name(extractors.get_pep_fields)
+
+
+def serve(path, pages: dict) -> None:
+    """Воркер в отдельном процессе со своей сессией."""
+    session = CachedSession(backend='memory')
+    session.mount('https://', SiteAdapter(pages))
+    distributed.run_worker(
+        fetchers.SyncFetcher(session),
+        storage.WorkQueue(path),
+        {PEP_FIELDS: extractors.get_pep_fields},
+        batch=4,
+        poll_interval=0.01,
+    )
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def make_queue(request, tmp_path):
+    """Фабрика соединений с одной очередью: sqlite или redis."""
+    if request.param == 'sqlite':
+        return lambda **options: storage.WorkQueue(
+            tmp_path / 'queue.sqlite', **options
+        )
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    return lambda **options: storage.RedisWorkQueue(
+        fakeredis.FakeRedis(server=server), **options
+    )
+
+
+def test_lease_expiry(make_queue):
+    queue = make_queue(attempts=2)
+    queue.open()
+    job_ids = queue.put_many(['a', 'b', 'c'], 'extract')
+    assert job_ids == [1, 2, 3]
+    assert len(queue.lease('dead', ['extract'], 2, 0)) == 2
+    assert queue.lease('other', ['other'], 10, 60) == []
+    time.sleep(0.01)
+
+    leased = queue.lease('slow', ['extract'], 10, 0)
+    assert sorted(job_id for job_id, _, _ in leased) == job_ids, (
+        'Задания с истекшей арендой выдаются другим воркерам.'
+    )
+    time.sleep(0.01)
+    assert queue.lease('alive', ['extract'], 10, 60) == [(3, 'c', 'extract')]
+    assert queue.take_finished(1, 3) == {1: None, 2: None}, (
+        'После `attempts` аренд задание считается неудачным.'
+    )
+    queue.complete([(3, {'status': 'Final'})])
+    assert queue.take_finished(1, 3) == {3: {'status': 'Final'}}
+    assert queue.take_finished(1, 3) == {}
+
+    assert not queue.is_closed()
+    queue.close()
+    assert make_queue().is_closed()
+    queue.open()
+    assert queue.put_many(['d'], 'extract') == [4], (
+        'Номера заданий не повторяются в новом обходе.'
+    )
+
+
+def test_concurrent_leases(make_queue):
+    queue = make_queue()
+    queue.open()
+    job_ids = queue.put_many([str(number) for number in range(200)], 'x')
+    leased = []
+
+    def take(worker):
+        worker_queue = make_queue()
+        while jobs := worker_queue.lease(worker, ['x'], 3, 60):
+            leased.extend(job_id for job_id, _, _ in jobs)
+
+    threads = [
+        threading.Thread(target=take, args=(f'worker-{number}',))
+        for number in range(WORKERS * 2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(leased) == job_ids, (
+        'Каждое задание достается ровно одному воркеру.'
+    )
+
+
+def test_redis_lease_is_atomic(monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    queue = storage.RedisWorkQueue(fakeredis.FakeRedis())
+    queue.open()
+    queue.put_many(['a', 'b'], 'x')
+
+    def lost_connection(pipeline, *args, **kwargs):
+        if pipeline.command_stack:
+            raise ConnectionError('Соединение разорвано')
+        return []
+
+    with monkeypatch.context() as patch:
+        patch.setattr(type(queue.redis.pipeline()), 'execute',
+                      lost_connection)
+        with pytest.raises(ConnectionError):
+            queue.lease('dead', ['x'], 1, 60)
+    assert [url for _, url, _ in queue.lease('alive', ['x'], 10, 60)] == [
+        'a', 'b'
+    ], 'Задание не теряется, если аренда не записана.'
+
+
+def test_coordinator_timeout(make_queue, site_session):
+    queue = make_queue()
+    queue.open()
+    session = site_session(pep_pages(3))
+    fetcher = distributed.QueueFetcher(
+        fetchers.SyncFetcher(session), queue, poll_interval=0.01, timeout=0.1
+    )
+    with pytest.raises(distributed.QueueTimeoutError):
+        list(fetcher.extract_many(['a', 'b'], extractors.get_pep_fields))
+    assert queue.take_finished(1, 2) == {}, (
+        'Задания прерванного ожидания удаляются из очереди.'
+    )
+
+
+def test_coordinator_expires_leases(make_queue, site_session):
+    queue = make_queue(attempts=1)
+    queue.open()
+    session = site_session(pep_pages(3))
+    fetcher = distributed.QueueFetcher(
+        fetchers.SyncFetcher(session), queue, poll_interval=0.01, timeout=5
+    )
+
+    def dead_worker():
+        # Воркер взял задание и упал, других воркеров нет.
+        worker_queue = make_queue()
+        while not worker_queue.lease('dead', [PEP_FIELDS], 1, 0):
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=dead_worker)
+    thread.start()
+    assert list(fetcher.extract_many(['a'], extractors.get_pep_fields)) == [
+        None
+    ]
+    thread.join()
+
+
+def test_worker_started_before_coordinator(make_queue, site_session):
+    pages = pep_pages(10)
+    expected = list(main.pep(site_session(pages)))
+    queue = make_queue()
+    queue.open()
+    queue.close()
+
+    def serve_in_thread():
+        session = CachedSession(backend='memory')
+        session.mount('https://', SiteAdapter(pages))
+        distributed.run_worker(
+            fetchers.SyncFetcher(session),
+            make_queue(),
+            {PEP_FIELDS: extractors.get_pep_fields},
+            poll_interval=0.01,
+        )
+
+    worker = threading.Thread(target=serve_in_thread)
+    worker.start()
+    time.sleep(0.05)
+    assert worker.is_alive(), (
+        'Воркер не должен завершаться из-за закрытого прошлого обхода.'
+    )
+    queue.open()
+    session = site_session(pages)
+    fetcher = distributed.QueueFetcher(
+        fetchers.SyncFetcher(session), queue, poll_interval=0.01, timeout=5
+    )
+    try:
+        assert list(main.pep(session, fetcher)) == expected
+    finally:
+        queue.close()
+        worker.join(timeout=5)
+    assert not worker.is_alive()
+
+
+def test_distributed_pep(site_session, tmp_path):
+    pages = pep_pages(PEP_COUNT)
+    expected = list(main.pep(site_session(pages)))
+
+    path = tmp_path / 'queue.sqlite'
+    queue = storage.WorkQueue(path)
+    queue.open()
+    context = multiprocessing.get_context('fork')
+    workers = [
+        context.Process(target=serve, args=(path, pages))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    session = site_session(pages)
+    fetcher = distributed.QueueFetcher(
+        fetchers.SyncFetcher(session), queue, poll_interval=0.01
+    )
+    try:
+        results = list(main.pep(session, fetcher))
+    finally:
+        queue.close()
+        for worker in workers:
+            worker.join(timeout=10)
+
+    assert results == expected
+    assert session.mock_adapter.call_count == 1, (
+        'Координатор загружает только общий список PEP.'
+    )
+    assert [worker.exitcode for worker in workers] == [0] * WORKERS
+
+
+def test_worker_extract_error(site_session, tmp_path):
+    pages = pep_pages(5)
+    urls = sorted(url for url in pages if '/pep-' in url)
+    broken = urls[1]
+    pages[broken] = b'\xff'
+
+    def strict_fields(content: bytes) -> dict:
+        if content == b'\xff':
+            raise ValueError('Битая страница')
+        return {'ok': True}
+
+    queue = storage.WorkQueue(tmp_path / 'queue.sqlite')
+    queue.open()
+    job_ids = queue.put_many(urls, get_extractor_name(strict_fields))
+    session = site_session(pages)
+    distributed.process_jobs(
+        fetchers.SyncFetcher(session),
+        queue,
+        queue.lease('worker', [get_extractor_name(strict_fields)], 10, 60),
+        {get_extractor_name(strict_fields): strict_fields},
+    )
+    finished = queue.take_finished(job_ids[0], job_ids[-1])
+    assert finished == {job_ids[0]: {'ok': True}, job_ids[1]: None}
+    leased = queue.lease('worker', [get_extractor_name(strict_fields)], 10, 60)
+    assert [job_id for job_id, _, _ in leased] == job_ids[2:], (
+        'Необработанные задания возвращаются в очередь.'
+    )
+
+
+def test_configure_queue(monkeypatch, tmp_path):
+    fakeredis = pytest.importorskip('fakeredis')
+    # configs импортирует caching из src при создании очереди.
+    monkeypatch.setattr(
+        importlib.import_module('caching'),
+        'get_redis_connection',
+        lambda url: fakeredis.FakeRedis()
+    )
+    configs = importlib.import_module('configs')
+    queue = configs.configure_queue('redis://queue-host:6379/0')
+    assert type(queue).__name__ == 'RedisWorkQueue'
+    queue = configs.configure_queue(str(tmp_path / 'queue.sqlite'))
+    assert type(queue).__name__ == 'WorkQueue'
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from requests_cache import CachedSession
+
+from src import main
+from tests.fixture_data.pages import archive_name, docs_site
+
+ARCHIVE_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def docs_server(local_server, monkeypatch, tmp_path):
+    server = local_server({})
+    server.pages.update(docs_site(server.url, ARCHIVE_SIZE))
+    monkeypatch.setattr(main, 'MAIN_DOC_URL', server.url + '3/')
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    return server
+
+
+def downloaded(tmp_path) -> set:
+    return {path.name for path in (tmp_path / 'downloads').iterdir()}
+
+
+def test_download_default_pdf_a4(docs_server, tmp_path):
+    got = main.download(CachedSession(backend='memory'))
+    assert got is None
+    assert downloaded(tmp_path) == {archive_name('3', 'pdf-a4')}
+
+
+def test_download_formats_and_versions(docs_server, tmp_path):
+    formats = ['html', 'epub', 'pdf-letter']
+    versions = ['3.12', '3.11']
+    main.download(
+        CachedSession(backend='memory'),
+        formats=formats,
+        versions=versions,
+        workers=4,
+    )
+    assert downloaded(tmp_path) == {
+        archive_name(version, doc_format)
+        for version in versions for doc_format in formats
+    }
+    archive = tmp_path / 'downloads' / archive_name('3.12', 'epub')
+    assert archive.stat().st_size == ARCHIVE_SIZE
+
+
+def test_download_unknown_version(docs_server):
+    with pytest.raises(ValueError):
+        main.download(CachedSession(backend='memory'), versions=['1.0'])
+
+
+def test_download_skips_present_files(docs_server, tmp_path):
+    session = CachedSession(backend='memory')
+    main.download(session, formats=['html', 'text'])
+    requests_before = len(docs_server.requests)
+    main.download(session, formats=['html', 'text'])
+    archive_requests = [
+        path for path in docs_server.requests[requests_before:]
+        if '/archives/' in path
+    ]
+    # Только HEAD-запросы для сравнения размера.
+    assert len(archive_requests) == 2
+
+
+def test_download_rate_limit(docs_server):
+    rate_limit = 4 * ARCHIVE_SIZE
+    start = time.perf_counter()
+    main.download(
+        CachedSession(backend='memory'),
+        formats=['html', 'text', 'epub', 'pdf-a4'],
+        workers=4,
+        rate_limit=rate_limit,
+    )
+    elapsed = time.perf_counter() - start
+    assert elapsed >= 0.8, (
+        'Общая скорость загрузки не должна превышать `rate_limit`.'
+    )
@@ -0,0 +1,119 @@
+import pytest
+from bs4 import BeautifulSoup
+from requests import Response
+
+from src import extractors
+from tests.fixture_data.pages import (
+    main_doc_page, pep_index_page, pep_page, pep_record, PYTHON_VERSIONS,
+    whats_new_page
+)
+
+PEP_DOC_URL = 'https://peps.python.org/'
+
+
+def make_response(page: str) -> Response:
+    response = Response()
+    response._content = page.encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
+
+
+@pytest.mark.parametrize('number', range(1, 12))
+def test_pep_fields_match_soup(number):
+    response = make_response(pep_page(number))
+    soup = BeautifulSoup(response.text, features='lxml')
+    status = soup.find(string='Status').parent.find_next_sibling().text
+    _, expected_status, expected_type = pep_record(number)
+    got = extractors.get_pep_fields(response.content)
+    assert got['status'] == status == expected_status
+    assert got['type'] == expected_type
+    assert got['title'] == soup.find('h1').text
+    assert got['author'] == f'Author {number}, Co-Author'
+    assert got['created'] == '13-Jun-2000'
+
+
+def test_pep_fields_missing():
+    response = make_response('<html><body><p>Empty</p></body></html>')
+    got = extractors.get_pep_fields(response.content)
+    assert got.pop('digest')
+    assert got == {
+        'status': None,
+        'type': None,
+        'author': None,
+        'created': None,
+        'title': None,
+    }
+
+
+def test_empty_page():
+    assert list(extractors.iter_events(b'', ('h1',))) == []
+    assert extractors.get_pep_fields(b'')['status'] is None
+
+
+@pytest.mark.parametrize('paragraphs', [0, 5000])
+def test_whats_new_fields_match_soup(paragraphs):
+    response = make_response(whats_new_page('3.12', paragraphs))
+    soup = BeautifulSoup(response.text, features='lxml')
+    assert extractors.get_whats_new_fields(response.content) == {
+        'title': soup.find('h1').text,
+        'editors': soup.find('dl').text.replace('\n', ' '),
+    }
+
+
+def test_whats_new_fields_missing_tag():
+    response = make_response('<html><body><h1>Title</h1></body></html>')
+    with pytest.raises(extractors.ParserFindTagException) as excinfo:
+        extractors.get_whats_new_fields(response.content)
+    assert 'Не найден тег dl None' in str(excinfo.value)
+
+
+def test_pep_index_rows_match_soup():
+    # Таблицы по категориям с той же разметкой идут перед индексом.
+    category = pep_index_page(5).replace('numerical-index', 'meta-peps')
+    category = category.replace('Synthetic', 'Meta').removesuffix(
+        '</body></html>'
+    )
+    response = make_response(
+        category + pep_index_page(30).removeprefix('<html><body>')
+    )
+    soup = BeautifulSoup(response.text, features='lxml')
+    section = soup.find('section', attrs={'id': 'numerical-index'})
+    expected = []
+    for row in section.find('tbody').find_all('tr'):
+        type_status = row.find('abbr').text
+        expected.append(extractors.PepRow(
+            number=int(row.find('a').text),
+            url=PEP_DOC_URL + row.find('a')['href'],
+            index_status=type_status,
+            title=row.find_all('td')[2].text,
+            expected=extractors.EXPECTED_STATUS[type_status[1:]],
+        ))
+    got = extractors.get_pep_index_rows(response.content, PEP_DOC_URL)
+    assert got == expected
+    assert len(got) == 30
+
+
+def test_pep_index_rows_missing_table():
+    response = make_response(pep_index_page(3).replace('numerical', 'other'))
+    with pytest.raises(extractors.ParserFindTagException):
+        extractors.get_pep_index_rows(response.content, PEP_DOC_URL)
+
+
+def test_version_links():
+    response = make_response(main_doc_page(PYTHON_VERSIONS))
+    got = extractors.get_version_links(response.content)
+    assert got == [
+        (f'https://docs.python.org/{version}/', version, status)
+        for version, status in PYTHON_VERSIONS
+    ] + [('https://www.python.org/doc/versions/', 'All versions', '')]
+
+
+def test_version_links_missing_list():
+    response = make_response(
+        main_doc_page(PYTHON_VERSIONS).replace('All versions', 'Versions')
+    )
+    with pytest.raises(ValueError):
+        extractors.get_version_links(response.content)
+    response = make_response('<html><body><ul></ul></body></html>')
+    with pytest.raises(extractors.ParserFindTagException):
+        extractors.get_version_links(response.content)
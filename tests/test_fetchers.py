@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from requests_cache import CachedSession
+
+from src import fetchers, main
+from tests.fixture_data.pages import pep_pages, whats_new_pages
+
+PEP_COUNT = 30
+VERSIONS = ('3.12', '3.11', '3.10')
+
+
+def test_fetcher_requires_fetch_many():
+    with pytest.raises(TypeError):
+        fetchers.Fetcher(CachedSession(backend='memory'))
+
+
+def test_async_fetcher_keeps_order(local_server):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'))
+    urls = [f'{server.url}pep-{number:04d}/' for number in range(1, 11)]
+    fetcher = fetchers.AsyncFetcher(CachedSession(backend='memory'))
+    got = [response.url for response in fetcher.fetch_many(urls)]
+    assert got == urls
+
+
+def test_async_fetcher_per_host_limit(local_server):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'), latency=0.02)
+    urls = [
+        f'{server.url}pep-{number:04d}/' for number in range(1, PEP_COUNT + 1)
+    ]
+    fetcher = fetchers.AsyncFetcher(
+        CachedSession(backend='memory'), concurrency=20, per_host=4
+    )
+    list(fetcher.fetch_many(urls))
+    assert 1 < server.max_in_flight <= 4, (
+        'Загрузчик должен держать не больше `per_host` запросов к хосту.'
+    )
+
+
+def test_async_fetcher_streams_window(local_server):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'), latency=0.01)
+    urls = [
+        f'{server.url}pep-{number:04d}/' for number in range(1, PEP_COUNT + 1)
+    ]
+    fetcher = fetchers.AsyncFetcher(
+        CachedSession(backend='memory'), concurrency=5
+    )
+    responses = fetcher.fetch_many(urls)
+    assert next(responses).url == urls[0]
+    assert len(server.requests) <= 5, (
+        'Вперед загружается не больше `concurrency` страниц.'
+    )
+    responses.close()
+    assert len(server.requests) < PEP_COUNT
+
+
+def test_async_fetcher_in_running_loop(local_server):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'))
+    urls = [f'{server.url}pep-{number:04d}/' for number in range(1, 6)]
+    fetcher = fetchers.AsyncFetcher(CachedSession(backend='memory'))
+
+    async def fetch_in_loop():
+        return [response.url for response in fetcher.fetch_many(urls)]
+
+    assert asyncio.run(fetch_in_loop()) == urls
+
+
+def test_async_fetcher_shares_cache(local_server):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'))
+    session = CachedSession(backend='memory')
+    urls = [f'{server.url}pep-{number:04d}/' for number in range(1, 6)]
+    list(fetchers.SyncFetcher(session).fetch_many(urls))
+    responses = list(fetchers.AsyncFetcher(session).fetch_many(urls))
+    assert all(response.from_cache for response in responses)
+    assert len(server.requests) == len(urls)
+
+
+def test_pep_async_matches_sync(local_server, monkeypatch):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'))
+    monkeypatch.setattr(main, 'PEP_DOC_URL', server.url)
+    sync_results = list(main.pep(
+        CachedSession(backend='memory'),
+        fetchers.SyncFetcher(CachedSession(backend='memory'))
+    ))
+    async_results = list(main.pep(
+        CachedSession(backend='memory'),
+        fetchers.AsyncFetcher(CachedSession(backend='memory'))
+    ))
+    assert sync_results == async_results
+
+
+def test_whats_new_async_matches_sync(local_server, monkeypatch):
+    server = local_server(whats_new_pages(VERSIONS, base_url='/'))
+    monkeypatch.setattr(main, 'MAIN_DOC_URL', server.url)
+    sync_results = list(main.whats_new(
+        CachedSession(backend='memory'),
+        fetchers.SyncFetcher(CachedSession(backend='memory'))
+    ))
+    async_results = list(main.whats_new(
+        CachedSession(backend='memory'),
+        fetchers.AsyncFetcher(CachedSession(backend='memory'))
+    ))
+    assert sync_results == async_results
+    assert len(async_results) == len(VERSIONS) + 1
+
+
+def test_refresh_revalidates_cached_pages(local_server, monkeypatch, caplog):
+    pages = pep_pages(PEP_COUNT, base_url='/')
+    server = local_server(pages)
+    monkeypatch.setattr(main, 'PEP_DOC_URL', server.url)
+    session = CachedSession(backend='memory', always_revalidate=True)
+
+    first = list(main.pep(session))
+    assert server.not_modified == 0
+
+    pages['/pep-0001/'] = pages['/pep-0001/'].replace('Active', 'Final')
+    with caplog.at_level('INFO'):
+        second = list(main.pep(session))
+    assert server.not_modified == PEP_COUNT, (
+        'Неизмененные страницы должны перепроверяться условным запросом.'
+    )
+    assert f'Не изменились с прошлого запуска: {PEP_COUNT - 1} ' in (
+        caplog.text
+    )
+    assert dict(second)['Total'] == dict(first)['Total']
+    assert dict(second)['Final'] == dict(first)['Final'] + 1
@@ -0,0 +1,72 @@
+import importlib
+from urllib.parse import urljoin
+
+from src import fetchers, main
+from tests.fixture_data.pages import pep_pages
+
+PEP_COUNT = 20
+# Загрузчики и парсеры используют модуль memo из src, а не src.memo.
+memo = importlib.import_module('memo')
+
+
+def test_lru_cache_evicts_least_recent():
+    cache = memo.LRUCache('test', 2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None, 'Вытесняется давно не использованная.'
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+
+    cache.resize(1)
+    assert len(cache) == 1 and cache.get('c') == 3
+    cache.resize(0)
+    cache.put('d', 4)
+    assert len(cache) == 0
+
+
+def test_normalize_and_join_url():
+    assert memo.normalize_url('HTTPS://Peps.Python.org/pep-0001/#intro') == (
+        'https://peps.python.org/pep-0001/'
+    )
+    assert memo.normalize_url('https://peps.python.org') == (
+        'https://peps.python.org/'
+    )
+    base = 'https://peps.python.org/'
+    for href in ('pep-0001/', '../pep-0002/', '/api/peps.json'):
+        assert memo.join_url(base, href) == urljoin(base, href)
+
+
+def test_repeated_run_reuses_parsed_pages(site_session):
+    session = site_session(pep_pages(PEP_COUNT))
+    main.METRICS.reset()
+    first = list(main.pep(session, fetchers.SyncFetcher(session)))
+    extracted = main.METRICS.as_dict()['stages']['extract']['count']
+    assert extracted == PEP_COUNT
+
+    second = list(main.pep(session, fetchers.SyncFetcher(session)))
+    data = main.METRICS.as_dict()
+    assert second == first
+    assert data['stages']['extract']['count'] == PEP_COUNT, (
+        'При повторном запуске поля PEP должны браться из памяти.'
+    )
+    # Общий список PEP тоже запоминается в кэше записей.
+    assert data['memo']['record'] == {
+        'hits': PEP_COUNT + 1, 'misses': PEP_COUNT + 1, 'hit_ratio': 0.5
+    }
+    assert data['stages']['get_pep_index_rows']['count'] == 1
+    assert 'Память record: 21 попаданий' in main.METRICS.summary()
+
+
+def test_disabled_memo(site_session):
+    session = site_session(pep_pages(PEP_COUNT))
+    memo.configure_memo(0, 0)
+    try:
+        main.METRICS.reset()
+        for _ in range(2):
+            list(main.pep(session, fetchers.SyncFetcher(session)))
+        data = main.METRICS.as_dict()
+        assert data['stages']['extract']['count'] == 2 * PEP_COUNT
+        assert 'record' not in data['memo']
+    finally:
+        memo.configure_memo()
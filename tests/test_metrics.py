@@ -0,0 +1,67 @@
+from argparse import Namespace
+import json
+import time
+
+from src import main, metrics, outputs
+from tests.fixture_data.pages import pep_pages
+
+PEP_COUNT = 10
+
+
+def test_metrics_observe():
+    collected = metrics.Metrics()
+    collected.observe('stage', 0.002)
+    collected.observe('stage', 2)
+    stats = collected.as_dict()['stages']['stage']
+    assert stats['count'] == 2
+    assert stats['max'] == 2
+    assert stats['histogram']['0.005'] == 1
+    assert stats['histogram']['5'] == 1
+
+
+def test_metrics_timed():
+    collected = metrics.Metrics()
+
+    @collected.timed('double')
+    def double(value):
+        return value * 2
+
+    assert double(2) == 4
+    assert double.__name__ == 'double'
+    assert collected.as_dict()['stages']['double']['count'] == 1
+
+
+def test_pep_metrics(site_session, tmp_path):
+    session = site_session(pep_pages(PEP_COUNT))
+    main.METRICS.reset()
+    list(main.pep(session))
+    list(main.pep(session))
+
+    data = main.METRICS.as_dict()
+    assert data['cache_misses'] == PEP_COUNT + 1
+    assert data['cache_hits'] == PEP_COUNT + 1
+    assert data['cache_hit_ratio'] == 0.5
+    assert data['bytes'] > 0
+    for stage in ('network', 'cache', 'extract', 'get_pep_index_rows'):
+        assert stage in data['stages'], f'Нет метрик этапа {stage}'
+    assert 'Кэш: 11 попаданий, 11 промахов' in main.METRICS.summary()
+
+    path = tmp_path / 'metrics.json'
+    main.METRICS.dump(path)
+    assert json.loads(path.read_text())['cache_hits'] == PEP_COUNT + 1
+
+
+def test_output_stage_excludes_parser_time(capsys):
+    def slow_parser():
+        for number in range(3):
+            time.sleep(0.05)
+            yield (number,)
+
+    main.METRICS.reset()
+    outputs.control_output(slow_parser(), Namespace(output=None))
+    stats = main.METRICS.as_dict()['stages']['control_output']
+    assert stats['count'] == 1
+    assert stats['total'] < 0.05, (
+        'Время работы парсера-генератора не относится к этапу вывода.'
+    )
+    assert capsys.readouterr().out == '0\n1\n2\n'
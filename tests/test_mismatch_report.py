@@ -0,0 +1,88 @@
+from argparse import Namespace
+import json
+import logging
+import sys
+
+from requests import ConnectionError
+from requests.adapters import HTTPAdapter
+
+from src import main, storage
+from tests.fixture_data.pages import mismatched, pep_href, pep_pages
+
+PEP_COUNT = 30
+
+
+def test_pep_collects_mismatches(site_session, caplog):
+    mismatches = []
+    with caplog.at_level(logging.INFO):
+        list(main.pep(site_session(pep_pages(PEP_COUNT)),
+                      mismatches=mismatches))
+    assert mismatches == expected_mismatches(PEP_COUNT)
+    messages = [record.message for record in caplog.records]
+    assert f'Несовпадающих статусов: {len(mismatches)}' in messages
+    assert not any('Ожидаемые статусы' in message for message in messages), (
+        'Расхождения не должны логироваться по одному.'
+    )
+
+
+class BrokenAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        raise ConnectionError(request=request)
+
+
+def expected_mismatches(count: int) -> list[tuple]:
+    return [
+        (number, f'https://peps.python.org/{pep_href(number)}', 'Draft',
+         'Final', 'SF')
+        for number in mismatched(count)
+    ]
+
+
+def test_resumed_run_keeps_mismatches(site_session, tmp_path):
+    pages = pep_pages(PEP_COUNT)
+    checkpoint = storage.Checkpoint(tmp_path / 'checkpoint.json')
+    # Последний PEP не загрузился, остальные - в контрольной точке.
+    session = site_session(pages)
+    session.mount(
+        f'https://peps.python.org/{pep_href(PEP_COUNT)}', BrokenAdapter()
+    )
+    list(main.pep(session, checkpoint=checkpoint))
+    assert len(checkpoint.load()['statuses']) == PEP_COUNT - 1
+
+    mismatches = []
+    session = site_session(pages)
+    list(main.pep(
+        session, checkpoint=checkpoint, resume=True, mismatches=mismatches
+    ))
+    assert session.mock_adapter.call_count == 2
+    assert mismatches == expected_mismatches(PEP_COUNT), (
+        'Расхождения PEP из контрольной точки попадают в отчет.'
+    )
+
+
+def test_mismatch_report(monkeypatch, tmp_path, capsys):
+    # main выводит результаты через модуль outputs из src, а не src.outputs.
+    monkeypatch.setattr(sys.modules['outputs'], 'BASE_DIR', tmp_path)
+    mismatches = [
+        (10, 'https://peps.python.org/pep-0010/', 'Draft', 'Final', 'SF')
+    ]
+    main.mismatch_output(mismatches, Namespace(output='jsonl'))
+    main.mismatch_output([], Namespace(output='file'))
+
+    jsonl_path, = (tmp_path / 'results').glob('pep-mismatches_*')
+    assert json.loads(jsonl_path.read_text()) == {
+        'number': 10,
+        'url': 'https://peps.python.org/pep-0010/',
+        'status': 'Draft',
+        'expected': 'Final',
+        'index_status': 'SF',
+    }
+
+    main.mismatch_output(mismatches, Namespace(output='pretty'))
+    main.mismatch_output(mismatches, Namespace(output=None))
+    assert len(list((tmp_path / 'results').iterdir())) == 1, (
+        'При выводе в терминал отчет не пишется в файл.'
+    )
+    out = capsys.readouterr().out
+    assert 'Статус в карточке' in out
+    assert out.count('https://peps.python.org/pep-0010/') == 2
@@ -0,0 +1,65 @@
+from argparse import Namespace
+
+from src import main, storage
+from tests.fixture_data.pages import PEP_STATUSES, pep_pages, pep_record
+
+PEP_COUNT = 30
+
+
+def accepted_standards(count: int) -> list[int]:
+    return [
+        number for number in range(1, count + 1)
+        if pep_record(number)[1:] == ('Accepted', 'Standards Track')
+    ]
+
+
+def test_pep_populates_index(site_session, tmp_path):
+    path = tmp_path / 'pep_index.sqlite'
+    session = site_session(pep_pages(PEP_COUNT))
+    list(main.pep(session, index=storage.PepIndex(path)))
+
+    rows = storage.PepIndex(path).query()
+    assert rows[0] == storage.PepIndex.HEADER
+    assert len(rows) == PEP_COUNT + 1
+    number, title, pep_type, status, authors, created, url = rows[1]
+    assert (number, title, authors, created) == (
+        1, 'Synthetic PEP 1', 'Author 1, Co-Author', '13-Jun-2000'
+    )
+    assert (status, pep_type) == pep_record(1)[1:]
+    assert url == 'https://peps.python.org/pep-0001/'
+
+    index_status, digest = storage.PepIndex(path).connection.execute(
+        'SELECT index_status, digest FROM peps WHERE number = 1'
+    ).fetchone()
+    assert index_status == PEP_STATUSES[1][0]
+    assert len(digest) == 40
+
+
+def test_query_pep_index(site_session, monkeypatch, tmp_path):
+    path = tmp_path / 'pep_index.sqlite'
+    session = site_session(pep_pages(PEP_COUNT))
+    list(main.pep(session, index=storage.PepIndex(path)))
+    requests_count = session.mock_adapter.call_count
+
+    monkeypatch.setattr(main, 'PEP_INDEX_PATH', path)
+    rows = main.query_pep_index(
+        Namespace(status=['Accepted'], pep_type='Standards Track')
+    )
+    assert [row[0] for row in rows[1:]] == accepted_standards(PEP_COUNT)
+    assert session.mock_adapter.call_count == requests_count
+
+    rows = main.query_pep_index(
+        Namespace(status=['Final', 'Active'], pep_type=None)
+    )
+    assert {row[3] for row in rows[1:]} == {'Final', 'Active'}
+
+
+def test_pep_index_query_uses_indexes():
+    index = storage.PepIndex()
+    plan = ' '.join(
+        str(row) for row in index.connection.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM peps WHERE status = ?',
+            ('Accepted',)
+        )
+    )
+    assert 'peps_status' in plan
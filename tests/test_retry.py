@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+
+from requests_cache import CachedSession
+
+from src import fetchers, main, throttling, utils
+from tests.fixture_data.pages import (
+    PEP_STATUSES, expected_pep_results, pep_pages
+)
+
+PEP_COUNT = 20
+FAST_RETRY = throttling.RetryPolicy(backoff=0.01)
+
+
+def test_get_response_retries_server_errors(local_server):
+    server = local_server({'/': 'page'})
+    server.fail('/', times=2, status=503)
+    response = utils.get_response(
+        CachedSession(backend='memory'), server.url, FAST_RETRY
+    )
+    assert response.status_code == 200
+    assert len(server.requests) == 3
+
+
+def test_get_response_honors_retry_after(local_server):
+    server = local_server({'/': 'page'})
+    server.fail('/', times=1, status=429, retry_after='1')
+    start = time.perf_counter()
+    response = utils.get_response(
+        CachedSession(backend='memory'), server.url, FAST_RETRY
+    )
+    assert response.status_code == 200
+    assert time.perf_counter() - start >= 1, (
+        'Перед повтором нужно выждать паузу из заголовка Retry-After.'
+    )
+
+
+def test_get_response_gives_up(local_server, caplog):
+    server = local_server({'/': 'page'})
+    server.fail('/', times=10, status=500)
+    with caplog.at_level(logging.ERROR):
+        response = utils.get_response(
+            CachedSession(backend='memory'), server.url, FAST_RETRY
+        )
+    assert response is None
+    assert len(server.requests) == FAST_RETRY.attempts
+    assert 'не загружена за 4 попыток' in caplog.text
+
+
+def test_get_response_retries_connection_errors(local_server):
+    server = local_server({})
+    url = server.url
+    server.stop()
+    retry = throttling.RetryPolicy(attempts=2, backoff=0)
+    assert utils.get_response(CachedSession(backend='memory'), url, retry) is (
+        None
+    )
+
+
+def test_parse_retry_after():
+    assert throttling.parse_retry_after('3') == 3
+    assert throttling.parse_retry_after(None) is None
+    assert throttling.parse_retry_after('garbage') is None
+    delay = throttling.parse_retry_after(
+        time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(
+            time.time() + 30
+        ))
+    )
+    assert 25 < delay <= 30
+
+
+def test_pep_keeps_flaky_peps(local_server, monkeypatch):
+    server = local_server(pep_pages(PEP_COUNT, base_url='/'))
+    for number in range(1, PEP_COUNT + 1, 3):
+        server.fail(f'/pep-{number:04d}/', times=2, status=503)
+    monkeypatch.setattr(main, 'PEP_DOC_URL', server.url)
+    session = CachedSession(backend='memory')
+    fetcher = fetchers.SyncFetcher(
+        session,
+        workers=4,
+        retry=FAST_RETRY,
+        controller=throttling.HostController(maximum=4),
+    )
+    results = dict(list(main.pep(session, fetcher))[1:])
+    assert results.pop('Total') == PEP_COUNT, (
+        'PEP с временными ошибками не должны выпадать из подсчета.'
+    )
+    assert results == expected_pep_results(PEP_COUNT)
+
+
+def test_pep_skips_error_pages(site_session, tmp_path):
+    pages = pep_pages(5)
+    # Страницы нет на сайте: ответ 404 с пустым телом.
+    del pages['https://peps.python.org/pep-0002/']
+    index = main.PepIndex(tmp_path / 'index.sqlite')
+    results = dict(list(main.pep(site_session(pages), index=index))[1:])
+    assert results.pop('Total') == 4, (
+        'Страницы с ответом 404 не должны попадать в подсчет и индекс.'
+    )
+    statuses = [status for _, status, _ in PEP_STATUSES]
+    assert [row[0] for row in index.query(statuses)[1:]] == [1, 3, 4, 5]
+
+
+def test_host_controller_adapts_limit():
+    controller = throttling.HostController(initial=4, maximum=8)
+    url = 'http://example.com/page'
+    controller.back_off(url)
+    assert controller.get_limit(url) == 2
+    for _ in range(40):
+        controller.speed_up(url)
+    assert controller.get_limit(url) == 8
+    assert controller.get_limit('http://other.com/') == 4
+
+
+def test_host_controller_limits_concurrency():
+    controller = throttling.HostController(initial=2, maximum=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def request():
+        with controller.slot('http://example.com/'):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_host_controller_pauses_host():
+    controller = throttling.HostController()
+    controller.back_off('http://example.com/', delay=0.2)
+    start = time.perf_counter()
+    with controller.slot('http://example.com/page'):
+        pass
+    assert time.perf_counter() - start >= 0.2
@@ -0,0 +1,80 @@
+import sys
+import time
+
+from src import main
+from src.configs import configure_argument_parser
+from tests.fixture_data.pages import pep_pages, whats_new_pages
+
+PEP_COUNT = 20
+VERSIONS = tuple(f'3.{minor}' for minor in range(PEP_COUNT))
+LATENCY = 0.02
+
+
+def patch_base_dir(monkeypatch, tmp_path) -> None:
+    # main выводит результаты через модуль outputs из src, а не src.outputs.
+    monkeypatch.setattr(sys.modules['outputs'], 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(main, 'PEP_INDEX_PATH', tmp_path / 'index.sqlite')
+    monkeypatch.setattr(
+        main, 'PEP_CHECKPOINT_PATH', tmp_path / 'pep_checkpoint.json'
+    )
+
+
+def parse_args(*args):
+    return configure_argument_parser(main.MODE_TO_FUNCTION.keys()).parse_args(
+        args
+    )
+
+
+def site_pages() -> dict:
+    return {**pep_pages(PEP_COUNT), **whats_new_pages(VERSIONS)}
+
+
+def run(site_session, *args, latency: float = 0) -> float:
+    session = site_session(site_pages(), latency)
+    start = time.perf_counter()
+    cli_args = parse_args(*args)
+    # Загрузчик - как при запуске из командной строки.
+    main.run_modes(session, main.get_fetcher(session, cli_args), cli_args)
+    return time.perf_counter() - start
+
+
+def test_several_modes_in_one_run(site_session, monkeypatch, tmp_path):
+    patch_base_dir(monkeypatch, tmp_path)
+    args = parse_args('pep', 'whats-new', 'pep', '-o', 'file')
+    assert args.mode == ['pep', 'whats-new', 'pep']
+
+    run(site_session, 'pep', 'whats-new', 'pep', '-o', 'file')
+    names = sorted(
+        path.name.split('_')[0] for path in (tmp_path / 'results').iterdir()
+    )
+    assert names == ['pep', 'pep-mismatches', 'whats-new']
+
+
+def test_terminal_output_in_mode_order(site_session, monkeypatch, capsys,
+                                       tmp_path):
+    patch_base_dir(monkeypatch, tmp_path)
+    run(site_session, 'whats-new', 'pep')
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith('Ссылка на статью')
+    assert lines.index('Статус Количество') == len(VERSIONS) + 1, (
+        'Результаты режимов не должны перемешиваться в терминале.'
+    )
+    assert lines[-3] == f'Total {PEP_COUNT}'
+    assert lines[-1].startswith('10 https://peps.python.org/pep-0010/'), (
+        'Отчет о расхождениях выводится в терминал после результатов.'
+    )
+
+
+def test_modes_run_concurrently(site_session, monkeypatch, tmp_path):
+    patch_base_dir(monkeypatch, tmp_path)
+    separate = sum(
+        run(site_session, mode, '-o', 'file', latency=LATENCY)
+        for mode in ('pep', 'whats-new')
+    )
+    together = run(
+        site_session, 'pep', 'whats-new', '-o', 'file', latency=LATENCY
+    )
+    assert together < separate * 0.75, (
+        f'Режимы в одном процессе ({together:.2f}s) должны выполняться '
+        f'одновременно, а не друг за другом ({separate:.2f}s).'
+    )
@@ -0,0 +1,85 @@
+import importlib
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from src import fetchers, main
+from tests.fixture_data.pages import pep_pages
+
+PEP_COUNT = 20
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+# Реестр режимов общий для модулей из src, а не src.scraper.
+scraper = importlib.import_module('scraper')
+
+
+@pytest.fixture
+def parsers(monkeypatch):
+    monkeypatch.setattr(scraper, 'PARSERS', dict(scraper.get_parsers()))
+    columns = dict(scraper.COLUMNS)
+    yield scraper.PARSERS
+    scraper.COLUMNS.clear()
+    scraper.COLUMNS.update(columns)
+
+
+def test_builtin_parsers_registered():
+    assert set(main.MODE_TO_FUNCTION) <= set(scraper.get_parsers())
+
+
+def test_builtin_parsers_after_custom():
+    # Свежий интерпретатор: встроенные режимы еще не загружены.
+    code = (
+        'import scraper; '
+        'scraper.register_parser("custom", lambda session, fetcher: []); '
+        'print(" ".join(sorted(scraper.get_parsers())))'
+    )
+    process = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    names = set(process.stdout.split())
+    assert set(main.MODE_TO_FUNCTION) | {'custom'} <= names
+
+
+def test_scraper_runs_builtin_mode(site_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'PEP_INDEX_PATH', tmp_path / 'index.sqlite')
+    session = site_session(pep_pages(PEP_COUNT))
+    expected = list(main.pep(session))
+
+    with scraper.Scraper(session, fetchers.SyncFetcher(session)) as runner:
+        assert list(runner.results('pep')) == expected
+        assert list(runner.results('pep', workers=4)) == expected
+
+
+def test_register_parser(site_session, parsers, monkeypatch, tmp_path):
+    monkeypatch.setattr(importlib.import_module('outputs'), 'BASE_DIR',
+                        tmp_path)
+
+    @scraper.register_parser('pep-titles', columns=(('url', 'string'),))
+    def pep_titles(session, fetcher, limit=3):
+        yield ('Ссылка',)
+        for number in range(1, limit + 1):
+            yield (f'https://peps.python.org/pep-{number:04d}/',)
+
+    assert parsers['pep-titles'] is pep_titles
+    session = site_session({})
+    runner = scraper.Scraper(session, fetchers.SyncFetcher(session), 'jsonl')
+    runner.run('pep-titles', limit=2)
+
+    path, = (tmp_path / 'results').glob('pep-titles_*.jsonl')
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert rows == [
+        {'url': 'https://peps.python.org/pep-0001/'},
+        {'url': 'https://peps.python.org/pep-0002/'},
+    ]
+
+
+def test_unknown_parser(site_session):
+    session = site_session({})
+    with pytest.raises(ValueError):
+        scraper.Scraper(session, fetchers.SyncFetcher(session)).run('nope')
@@ -0,0 +1,63 @@
+from pathlib import Path
+import subprocess
+import sys
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+# Зависимости, которые не должны загружаться до запуска режима.
+HEAVY_MODULES = (
+    'requests', 'requests_cache', 'urllib3', 'bs4', 'lxml', 'tqdm',
+    'prettytable', 'pyarrow', 'httpx', 'redis', 'asyncio',
+    'multiprocessing',
+)
+HELP = (
+    'import configs, main; '
+    'configs.configure_argument_parser(main.MODE_TO_FUNCTION.keys())'
+    '.parse_args(["--help"])'
+)
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Накопленное время импорта каждого модуля по -X importtime, мкс."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded_heavy_modules(times: dict) -> list[str]:
+    return sorted(
+        name for name in times if name.split('.')[0] in HEAVY_MODULES
+    )
+
+
+def test_main_import_is_light():
+    times = import_times('import main')
+    assert loaded_heavy_modules(times) == [], (
+        'Импорт main не должен загружать тяжелые зависимости.'
+    )
+    print(f'import main: {times["main"] / 1000:.1f} ms')
+
+
+def test_help_is_light():
+    assert loaded_heavy_modules(import_times(HELP)) == []
+
+
+def test_heavy_modules_load_on_use():
+    times = import_times(
+        'import main, outputs; '
+        'outputs.pretty_output([("a",), ("b",)]); '
+        'main.get_soup(type("R", (), {"text": "<p></p>"})())'
+    )
+    loaded = {name.split('.')[0] for name in loaded_heavy_modules(times)}
+    assert {'bs4', 'lxml', 'prettytable'} <= loaded
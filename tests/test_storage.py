@@ -0,0 +1,114 @@
+import importlib
+
+from src import extractors, fetchers, main, storage
+from src.utils import get_digest
+from tests.fixture_data.pages import pep_pages
+
+PEP_COUNT = 20
+
+
+def test_page_store_persists(tmp_path):
+    path = tmp_path / 'store.sqlite'
+    store = storage.PageStore(path)
+    store.put('url', 'extractor', 'digest', {'status': 'Final'})
+    store.save()
+
+    reopened = storage.PageStore(path)
+    assert reopened.get('url', 'extractor', 'digest') == {'status': 'Final'}
+    assert reopened.get('url', 'extractor', 'other') is None, (
+        'Для страницы с изменившимся содержимым хранилище '
+        'не должно возвращать поля.'
+    )
+    assert reopened.get('url', 'other', 'digest') is None
+
+
+def test_extract_many_skips_unchanged_pages(site_session, tmp_path):
+    pages = pep_pages(PEP_COUNT)
+    urls = [url for url in pages if url.endswith('/')][1:]
+    parsed = []
+
+    def pep_fields(content):
+        parsed.append(content)
+        return extractors.get_pep_fields(content)
+
+    session = site_session(pages)
+    fetcher = fetchers.SyncFetcher(
+        session, store=storage.PageStore(tmp_path / 'store.sqlite')
+    )
+    first = list(fetcher.extract_many(urls, pep_fields))
+    assert len(parsed) == len(urls)
+
+    parsed.clear()
+    fetcher = fetchers.SyncFetcher(
+        session, store=storage.PageStore(tmp_path / 'store.sqlite')
+    )
+    second = list(fetcher.extract_many(urls, pep_fields))
+    assert first == second
+    assert parsed == [], (
+        'Неизмененные страницы не должны разбираться повторно.'
+    )
+
+
+def test_store_ignores_previous_schema(site_session):
+    pages = pep_pages(2)
+    url = 'https://peps.python.org/pep-0001/'
+    session = site_session(pages)
+    store = storage.PageStore()
+    # Запись прежней версии get_pep_fields - без авторов и хэша.
+    digest = get_digest(session.get(url))
+    store.put(url, 'get_pep_fields', digest, {'status': 'Active'})
+
+    fetcher = fetchers.SyncFetcher(session, store=store)
+    fields, = fetcher.extract_many([url], extractors.get_pep_fields)
+    assert fields['author'] == 'Author 1, Co-Author', (
+        'Поля прежней версии функции извлечения не должны использоваться.'
+    )
+
+
+def test_pep_with_store(site_session):
+    pages = pep_pages(PEP_COUNT)
+    session = site_session(pages)
+    store = storage.PageStore()
+    first = list(
+        main.pep(session, fetchers.SyncFetcher(session, store=store))
+    )
+    assert len(store.pages) == PEP_COUNT
+
+    session = site_session(pages)
+    second = list(
+        main.pep(session, fetchers.SyncFetcher(session, store=store))
+    )
+    assert first == second
+
+
+def test_pep_fields(site_session):
+    pages = pep_pages(2)
+    response = site_session(pages).get('https://peps.python.org/pep-0001/')
+    assert extractors.get_pep_fields(response.content) == {
+        'status': 'Active',
+        'type': 'Process',
+        'author': 'Author 1, Co-Author',
+        'created': '13-Jun-2000',
+        'title': 'PEP 1 – Synthetic PEP 1',
+        'digest': get_digest(response),
+    }
+
+
+def test_pep_in_processes_matches_serial(site_session):
+    pages = pep_pages(PEP_COUNT)
+    session = site_session(pages)
+    expected = list(main.pep(session, fetchers.SyncFetcher(session)))
+    # Иначе поля берутся из памяти процесса без разбора.
+    importlib.import_module('memo').clear_memo()
+
+    store = storage.PageStore()
+    fetcher = fetchers.SyncFetcher(session, store=store, processes=2)
+    main.METRICS.reset()
+    assert list(main.pep(session, fetcher)) == expected
+    assert 'extract' not in main.METRICS.as_dict()['stages'], (
+        'Страницы должны разбираться в дочерних процессах.'
+    )
+    assert len(store.pages) == PEP_COUNT, (
+        'Поля, разобранные в дочерних процессах, должны попадать '
+        'в хранилище.'
+    )
@@ -0,0 +1,36 @@
+from argparse import Namespace
+
+import pytest
+
+from src import main, outputs
+from tests.fixture_data.pages import whats_new_pages
+
+VERSIONS = ('3.12', '3.11', '3.10')
+
+
+def test_whats_new_yields_header_before_crawl(site_session):
+    session = site_session(whats_new_pages(VERSIONS))
+    rows = main.whats_new(session)
+    assert next(rows) == (
+        'Ссылка на статью', 'Заголовок', 'Редактор, Автор'
+    )
+    assert session.mock_adapter.call_count == 1, (
+        'Заголовок должен отдаваться до загрузки статей.'
+    )
+    assert len(list(rows)) == len(VERSIONS)
+
+
+def test_file_output_keeps_rows_of_interrupted_run(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+
+    def interrupted():
+        yield ('Статус', 'Количество')
+        yield ('Active', 1)
+        raise ConnectionError
+
+    with pytest.raises(ConnectionError):
+        outputs.file_output(interrupted(), Namespace(mode='pep'))
+    (path,) = (tmp_path / 'results').iterdir()
+    assert path.read_text(encoding='utf-8').splitlines() == [
+        '"Статус","Количество"', '"Active","1"'
+    ]
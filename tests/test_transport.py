@@ -0,0 +1,70 @@
+import pytest
+import requests
+from requests_cache import CachedSession
+
+from src import configs, transport
+
+PAGES = {f'/page-{number}/': f'page {number}' for number in range(10)}
+
+
+def fetch_all(session, server):
+    for path in PAGES:
+        assert session.get(server.url + path[1:]).ok
+
+
+def test_configure_session_pool(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    session = configs.configure_session(workers=32, timeout=(1, 2))
+    adapter = session.get_adapter('https://peps.python.org/')
+    # configs импортирует transport из src, а не src.transport.
+    assert type(adapter).__name__ == 'TimeoutAdapter'
+    assert adapter._pool_maxsize == 32
+    assert adapter.timeout == (1, 2)
+    assert session.headers['Connection'] == 'keep-alive'
+
+    session = configs.configure_session(pool_size=4, keep_alive=False)
+    assert session.get_adapter('http://a/')._pool_maxsize == 4
+    assert session.headers['Connection'] == 'close'
+
+
+def test_keep_alive_reuses_connections(local_server):
+    server = local_server(PAGES)
+    session = requests.Session()
+    session.mount('http://', transport.TimeoutAdapter())
+    fetch_all(session, server)
+    assert server.connections == 1
+
+    server = local_server(PAGES)
+    session.headers['Connection'] = 'close'
+    fetch_all(session, server)
+    assert server.connections == len(PAGES)
+
+
+def test_default_timeout(local_server):
+    server = local_server(PAGES, latency=0.5)
+    session = CachedSession(backend='memory')
+    session.mount('http://', transport.TimeoutAdapter((1, 0.1)))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(server.url + 'page-1/')
+
+
+def test_http2_adapter(local_server):
+    pytest.importorskip('httpx')
+    pytest.importorskip('h2')
+    server = local_server(PAGES)
+    session = CachedSession(backend='memory')
+    session.mount('http://', transport.Http2Adapter(pool_maxsize=4))
+    response = session.get(server.url + 'page-1/')
+    assert response.text == 'page 1'
+    assert response.headers['ETag']
+    assert session.get(server.url + 'page-1/').from_cache
+
+    with session.get(
+        server.url + 'page-2/', stream=True,
+        headers={'Cache-Control': 'no-store'}
+    ) as response:
+        assert b''.join(response.iter_content(2)) == b'page 2'
+    assert server.connections == 1
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get('http://127.0.0.1:1/')
@@ -1,7 +1,13 @@
+import hashlib
+import importlib
+import json
+import tracemalloc
+
 import pytest
 import requests
 import requests_mock
 import bs4
+from requests_cache import CachedSession
 from conftest import MAIN_DOC_URL
 try:
     from src import utils
@@ -54,3 +60,119 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+ARCHIVE = bytes(range(256)) * 4096
+
+
+@pytest.fixture
+def archive_server(local_server):
+    return local_server({'/archive.zip': ARCHIVE})
+
+
+def test_download_file(archive_server, tmp_path):
+    session = CachedSession(backend='memory')
+    path = tmp_path / 'archive.zip'
+    got = utils.download_file(session, archive_server.url + 'archive.zip', path)
+    assert got == path
+    assert path.read_bytes() == ARCHIVE
+    assert not (tmp_path / 'archive.zip.part').exists()
+    assert not session.cache.contains(url=archive_server.url + 'archive.zip'), (
+        'Архивы не должны сохраняться в кэш HTML-страниц.'
+    )
+
+
+def write_part(tmp_path, content: bytes, etag: str = None) -> None:
+    """Временный файл прерванной загрузки и сохраненный валидатор."""
+    (tmp_path / 'archive.zip.part').write_bytes(content)
+    (tmp_path / 'archive.zip.part.json').write_text(json.dumps({
+        'etag': etag or f'"{hashlib.sha1(ARCHIVE).hexdigest()}"',
+        'last_modified': None,
+        'size': len(ARCHIVE),
+        'sha256': None,
+    }))
+
+
+def download_archive(archive_server, tmp_path, **kwargs):
+    return utils.download_file(
+        CachedSession(backend='memory'),
+        archive_server.url + 'archive.zip',
+        tmp_path / 'archive.zip',
+        **kwargs,
+    )
+
+
+def test_download_file_resume(archive_server, tmp_path, monkeypatch):
+    write_part(tmp_path, ARCHIVE[:len(ARCHIVE) // 2])
+    written = []
+    monkeypatch.setattr(
+        importlib.import_module('metrics').METRICS, 'add_bytes',
+        written.append
+    )
+    path = download_archive(
+        archive_server, tmp_path, sha256=hashlib.sha256(ARCHIVE).hexdigest()
+    )
+    assert path.read_bytes() == ARCHIVE
+    assert sum(written) == len(ARCHIVE) // 2, (
+        'Загружается только недостающая часть файла.'
+    )
+    assert not (tmp_path / 'archive.zip.part.json').exists()
+
+
+def test_download_file_changed_on_server(archive_server, tmp_path):
+    write_part(tmp_path, b'old' * 1000, etag='"old"')
+    path = download_archive(archive_server, tmp_path)
+    assert path.read_bytes() == ARCHIVE, (
+        'Если файл на сервере изменился, загрузка начинается заново.'
+    )
+
+
+def test_download_file_part_without_validator(archive_server, tmp_path):
+    (tmp_path / 'archive.zip.part').write_bytes(b'old' * 1000)
+    path = download_archive(archive_server, tmp_path)
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_header_checksum(archive_server, tmp_path):
+    write_part(tmp_path, bytes(len(ARCHIVE) // 2))
+    with pytest.raises(BaseException) as excinfo:
+        download_archive(archive_server, tmp_path)
+    assert excinfo.typename == 'DownloadError', (
+        'Файл проверяется по контрольной сумме из Repr-Digest.'
+    )
+    assert not (tmp_path / 'archive.zip.part').exists()
+    assert not (tmp_path / 'archive.zip.part.json').exists()
+
+
+def test_download_file_complete_part(archive_server, tmp_path):
+    write_part(tmp_path, ARCHIVE)
+    path = download_archive(archive_server, tmp_path)
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_checksum_mismatch(archive_server, tmp_path):
+    path = tmp_path / 'archive.zip'
+    with pytest.raises(BaseException) as excinfo:
+        utils.download_file(
+            CachedSession(backend='memory'),
+            archive_server.url + 'archive.zip',
+            path,
+            sha256='0' * 64,
+        )
+    assert excinfo.typename == 'DownloadError'
+    assert not path.exists()
+    assert not (tmp_path / 'archive.zip.part').exists()
+
+
+def test_download_file_flat_memory(archive_server, tmp_path):
+    tracemalloc.start()
+    utils.download_file(
+        CachedSession(backend='memory'),
+        archive_server.url + 'archive.zip',
+        tmp_path / 'archive.zip',
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < len(ARCHIVE) / 4, (
+        'Архив не должен целиком загружаться в память.'
+    )
@@ -0,0 +1,50 @@
+import time
+
+from src import main
+from tests.fixture_data.pages import expected_pep_results, pep_pages
+
+PEP_COUNT = 40
+LATENCY = 0.02
+
+
+def test_pep_workers_results_match(site_session):
+    pages = pep_pages(PEP_COUNT)
+    serial = list(main.pep(site_session(pages), workers=1))
+    parallel = list(main.pep(site_session(pages), workers=8))
+    assert serial == parallel, (
+        'Результат функции `pep` не должен зависеть от количества потоков.'
+    )
+    expected = expected_pep_results(PEP_COUNT)
+    assert dict(serial[1:-1]) == expected
+    assert serial[-1] == ('Total', PEP_COUNT)
+
+
+def test_pep_workers_mismatch_order(site_session):
+    pages = pep_pages(PEP_COUNT)
+    serial, parallel = [], []
+    list(main.pep(
+        site_session(pages, latency=LATENCY), workers=1, mismatches=serial
+    ))
+    list(main.pep(
+        site_session(pages, latency=LATENCY), workers=8, mismatches=parallel
+    ))
+    assert serial and serial == parallel, (
+        'Несовпадающие статусы должны идти в порядке общего списка PEP.'
+    )
+
+
+def test_pep_workers_speedup(site_session):
+    pages = pep_pages(PEP_COUNT)
+
+    start = time.perf_counter()
+    list(main.pep(site_session(pages, latency=LATENCY), workers=1))
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    list(main.pep(site_session(pages, latency=LATENCY), workers=8))
+    parallel_time = time.perf_counter() - start
+
+    assert parallel_time < serial_time / 2, (
+        f'Загрузка в 8 потоков ({parallel_time:.2f}s) должна быть заметно '
+        f'быстрее последовательной ({serial_time:.2f}s).'
+    )